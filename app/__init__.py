@@ -1,11 +1,15 @@
 import logging.config
 from flask import Flask, request, redirect
 
-from app.extensions import db, mail, login_manager, notification_manager, socketio, prometheus_metrics, metrics_middleware
+from app.extensions import (db, mail, login_manager, notification_manager, socketio, prometheus_metrics,
+                            metrics_middleware, partners_cache, subscriptions_cache, calendar_cache,
+                            itsm_cache, itsm_mirror, inc_watcher, itsm_pool, numbers_autocomplete, upload_janitor)
+from app.core.utils.json_provider import FastJSONProvider
 
 
 def create_app():
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
 
     from app.config import get_config
     config = get_config()
@@ -13,10 +17,20 @@ def create_app():
 
     logging.config.dictConfig(app.config["LOGGING_CONF"])
 
+    # Пул сессий ITSM подменяет настройки bind'а и должен быть создан до инициализации SQLAlchemy
+    itsm_pool.init_app(app)
     db.init_app(app)
     mail.init_app(app)
     login_manager.init_app(app)
     notification_manager.init_app(app)
+    partners_cache.init_app(app)
+    subscriptions_cache.init_app(app)
+    calendar_cache.init_app(app)
+    itsm_cache.init_app(app)
+    itsm_mirror.init_app(app)
+    inc_watcher.init_app(app)
+    numbers_autocomplete.init_app(app)
+    upload_janitor.init_app(app)
     socketio.init_app(
         app,
         cors_allowed_origins="*",
@@ -43,6 +57,9 @@ def create_app():
 
     from app.api.inc import bp as inc_bp
     app.register_blueprint(inc_bp, url_prefix="/inc")
+
+    from app.cli import register_commands
+    register_commands(app)
     
     @app.before_request
     def redirect_to_domain():
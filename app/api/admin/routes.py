@@ -5,7 +5,10 @@ from app.api.admin import bp
 from app.core.services.auth import role_required
 from app.core.services.feedback import FeedbacksService
 from app.core.services.partners import PartnersService
+from app.core.services.subscriptions import SubscriptionsService
 from app.core.utils import helpers
+from app.core.utils.conditional import conditional_response
+from app.extensions import partners_cache
 
 
 @bp.route("/users_feedbacks", methods=["GET"])
@@ -37,6 +40,7 @@ def partners_panel():
 @bp.route("/api/groups", methods=["GET"])
 @login_required
 @role_required("admin")
+@conditional_response(partners_cache)
 def load_groups():
     result = PartnersService.get_partners_groups()
 
@@ -48,9 +52,29 @@ def load_groups():
 
     return jsonify(result), 200
 
+@bp.route("/api/groups/summary", methods=["GET"])
+@login_required
+@role_required("admin")
+@conditional_response(partners_cache)
+def load_groups_summary():
+    prefix = request.args.get("prefix", "").strip()
+    page = request.args.get("page", type=int)
+    per_page = request.args.get("per_page", type=int)
+
+    result = PartnersService.get_groups_summary(prefix, page, per_page)
+
+    if result["status"] == "error":
+        return jsonify(result), 500
+
+    if result["status"] == "rejected":
+        return jsonify(result), 400
+
+    return jsonify(result), 200
+
 @bp.route("/api/groups/<groupname>/partners", methods=["GET"])
 @login_required
 @role_required("admin")
+@conditional_response(partners_cache)
 def load_group_members(groupname):
     result = PartnersService.get_group_members(groupname)
 
@@ -130,6 +154,14 @@ def upload_from_file():
 
     return jsonify(result), 200
 
+@bp.route("/api/subscriptions/reload", methods=["POST"])
+@login_required
+@role_required("admin")
+def reload_subscriptions_catalog():
+    SubscriptionsService.invalidate_catalog()
+
+    return jsonify({"status": "success", "message": "Каталог подписок будет перезагружен из БД"}), 200
+
 @bp.route("/api/update_sbs_users", methods=["POST"])
 def update_sbs_users():
     result = helpers.process_users_update()
@@ -6,9 +6,13 @@ import logging
 from app.api.crq import bp
 from app.core.services.auth import role_required
 from app.core.services.crq import CrqService
+from app.core.services.crq_import import CrqImportService
 from app.core.services.partners import PartnersService
 from app.core.services.subscriptions import SubscriptionsService
-from app.extensions import socketio, lock_manager
+from app.core.services.uploads import ChunkedUploadService
+from app.core.utils.conditional import conditional_response
+from app.extensions import (socketio, lock_manager, calendar_cache, partners_cache, subscriptions_cache,
+                            numbers_autocomplete)
 
 
 # Пути обработки CRQ
@@ -21,12 +25,14 @@ def crq_sbs():
 @bp.route("/api/calendar", methods=["GET"])
 @login_required
 @role_required("admin")
+@conditional_response(calendar_cache)
 def get_calendar():
     service = request.args.get("service", "td")
     start_date = request.args.get("startDate")
     end_date = request.args.get("endDate")
+    since = request.args.get("since", type=int)
 
-    result = CrqService.get_calendar_data(service, start_date, end_date)
+    result = CrqService.get_calendar_data(service, start_date, end_date, since)
 
     if result["status"] == "error":
         return jsonify(result), 500
@@ -38,8 +44,9 @@ def get_calendar():
 @role_required("admin")
 def get_crq(crq_number: str):
     source = request.args.get("source")
+    force_refresh = request.args.get("refresh", "false").lower() == "true"
 
-    result = CrqService.get_crq_data(crq_number, source)
+    result = CrqService.get_crq_data(crq_number, source, force_refresh)
 
     if result["status"] == "not_found":
         return jsonify(result), 404
@@ -48,6 +55,53 @@ def get_crq(crq_number: str):
 
     return jsonify(result), 200
 
+@bp.route("/api/find/batch", methods=["POST"])
+@login_required
+@role_required("admin")
+def get_crq_batch():
+    data = request.get_json(silent=True) or {}
+
+    result = CrqService.get_crq_data_batch(
+        data.get("crq_numbers"),
+        data.get("source", "processed"),
+        bool(data.get("force_refresh", False))
+    )
+
+    if result["status"] == "rejected":
+        return jsonify(result), 400
+    if result["status"] == "error":
+        return jsonify(result), 500
+
+    return jsonify(result), 200
+
+@bp.route("/api/autocomplete", methods=["GET"])
+@login_required
+@role_required("admin")
+def autocomplete_crq():
+    numbers = numbers_autocomplete.complete("crq", request.args.get("q", ""), request.args.get("limit", 10, type=int))
+
+    return jsonify({"status": "success", "items": numbers}), 200
+
+@bp.route("/api/search", methods=["GET"])
+@login_required
+@role_required("admin")
+def search_crq():
+    result = CrqService.search_crq(
+        query=request.args.get("q", ""),
+        service=request.args.get("service"),
+        from_date=request.args.get("startDate"),
+        to_date=request.args.get("endDate"),
+        cursor=request.args.get("cursor"),
+        limit=request.args.get("limit", type=int)
+    )
+
+    if result["status"] == "rejected":
+        return jsonify(result), 400
+    if result["status"] == "error":
+        return jsonify(result), 500
+
+    return jsonify(result), 200
+
 @bp.route("/api/create", methods=["POST"])
 @login_required
 @role_required("admin")
@@ -66,6 +120,45 @@ def create_crq():
 
     return jsonify(result), 200
 
+@bp.route("/api/import/itsm", methods=["POST"])
+@login_required
+@role_required("admin")
+def import_crqs_from_itsm():
+    data = request.get_json(silent=True) or {}
+
+    result = CrqService.import_from_itsm(data.get("crq_numbers"), data)
+
+    if result["status"] == "rejected":
+        return jsonify(result), 400
+    if result["status"] == "error":
+        return jsonify(result), 500
+
+    return jsonify(result), 200
+
+@bp.route("/api/import", methods=["POST"])
+@login_required
+@role_required("admin")
+def import_crqs():
+    uploaded_file = request.files.get("file")
+    if uploaded_file:
+        stream, filename, content_type = uploaded_file.stream, uploaded_file.filename or "", uploaded_file.mimetype
+    else:
+        stream, filename, content_type = request.stream, "", request.mimetype
+
+    file_format = request.args.get("format")
+    if not file_format:
+        is_json = filename.lower().endswith((".json", ".jsonl")) or "json" in (content_type or "")
+        file_format = "json" if is_json else "csv"
+
+    result = CrqImportService.import_crqs(stream, file_format, request.args.get("onConflict", "skip"))
+
+    if result["status"] == "rejected":
+        return jsonify(result), 400
+    if result["status"] == "error":
+        return jsonify(result), 500
+
+    return jsonify(result), 200
+
 @bp.route("/api/update/<string:crq_number>", methods=["POST"])
 @login_required
 @role_required("admin")
@@ -89,6 +182,7 @@ def update_crq(crq_number: str):
 @bp.route("/api/resources/subscriptions", methods=["GET"])
 @login_required
 @role_required("admin")
+@conditional_response(subscriptions_cache)
 def get_subscriptions():
     subscriptions = SubscriptionsService.get_subs_list()
 
@@ -102,6 +196,7 @@ def get_subscriptions():
 @bp.route("/api/resources/partner-groups", methods=["GET"])
 @login_required
 @role_required("admin")
+@conditional_response(partners_cache)
 def get_partner_groups():
     result = PartnersService.get_partners_groups()
 
@@ -133,6 +228,102 @@ def upload_files():
 
     return jsonify(result), 200
 
+@bp.route("/api/uploads", methods=["POST"])
+@login_required
+@role_required("admin")
+def create_upload():
+    data = request.get_json(silent=True) or {}
+
+    result = ChunkedUploadService.create_upload(data.get("filename"), data.get("size"), current_user.id,
+                                                data.get("sha256"))
+
+    if result["status"] == "rejected":
+        return jsonify(result), 400
+    if result["status"] == "too_large":
+        return jsonify(result), 413
+    if result["status"] == "error":
+        return jsonify(result), 500
+
+    return jsonify(result), 201
+
+@bp.route("/api/uploads/<string:upload_id>", methods=["GET"])
+@login_required
+@role_required("admin")
+def get_upload(upload_id: str):
+    result = ChunkedUploadService.get_upload(upload_id, current_user.id)
+
+    if result["status"] == "not_found":
+        return jsonify(result), 404
+
+    return jsonify(result), 200
+
+@bp.route("/api/uploads/<string:upload_id>", methods=["PATCH"])
+@login_required
+@role_required("admin")
+def append_upload_chunk(upload_id: str):
+    offset = request.headers.get("Upload-Offset", type=int)
+    if offset is None:
+        return jsonify({"status": "rejected", "message": "Необходимо указать заголовок Upload-Offset."}), 400
+
+    result = ChunkedUploadService.append_chunk(upload_id, current_user.id, offset, request.stream,
+                                               request.content_length)
+
+    if result["status"] == "rejected":
+        return jsonify(result), 400
+    if result["status"] == "not_found":
+        return jsonify(result), 404
+    if result["status"] == "conflict":
+        return jsonify(result), 409
+    if result["status"] == "too_large":
+        return jsonify(result), 413
+    if result["status"] == "error":
+        return jsonify(result), 500
+
+    return jsonify(result), 200
+
+@bp.route("/api/uploads/<string:upload_id>/complete", methods=["POST"])
+@login_required
+@role_required("admin")
+def complete_upload(upload_id: str):
+    data = request.get_json(silent=True) or {}
+
+    result = ChunkedUploadService.complete_upload(upload_id, current_user.id, data.get("crqNumber"))
+
+    if result["status"] == "rejected":
+        return jsonify(result), 400
+    if result["status"] == "not_found":
+        return jsonify(result), 404
+    if result["status"] == "conflict":
+        return jsonify(result), 409
+    if result["status"] == "error":
+        return jsonify(result), 500
+
+    return jsonify(result), 200
+
+@bp.route("/api/uploads/<string:upload_id>", methods=["DELETE"])
+@login_required
+@role_required("admin")
+def abort_upload(upload_id: str):
+    result = ChunkedUploadService.abort_upload(upload_id, current_user.id)
+
+    if result["status"] == "not_found":
+        return jsonify(result), 404
+
+    return jsonify(result), 200
+
+@bp.route("/api/files/<int:file_id>/download", methods=["GET"])
+@login_required
+@role_required("admin")
+def download_file(file_id: int):
+    result = CrqService.download_file(file_id)
+
+    if result["status"] == "not_found":
+        return jsonify(result), 404
+    if result["status"] == "error":
+        return jsonify(result), 500
+
+    return result["response"]
+
 @bp.route("/api/files/delete/<int:file_id>", methods=["POST"])
 @login_required
 @role_required("admin")
@@ -1,11 +1,15 @@
+from datetime import datetime, timedelta
 from flask import request, render_template, jsonify
 from flask_login import login_required, current_user
+from flask_socketio import join_room, leave_room
 
 from app.api.inc import bp
-from app.extensions import notification_manager
+from app.extensions import notification_manager, subscriptions_cache, socketio, inc_watcher, numbers_autocomplete
 from app.core.services.auth import role_required
 from app.core.services.inc import IncidentService
 from app.core.services.subscriptions import SubscriptionsService
+from app.core.utils import helpers
+from app.core.utils.conditional import conditional_response
 
 
 @bp.route("/inc_sbs", methods=["GET"])
@@ -17,6 +21,7 @@ def inc_sbs():
 @bp.route("/api/subscriptions", methods=["GET"])
 @login_required
 @role_required("admin")
+@conditional_response(subscriptions_cache)
 def get_subscriptions():
     subscriptions = SubscriptionsService.get_subs_list()
 
@@ -38,7 +43,9 @@ def search_incident():
     if not inc_number:
         return jsonify({"error": "Необходимо указать номер инцидента."}), 400
 
-    result = IncidentService.get_inc_data(inc_number, parse_description=True)
+    force_refresh = bool(data.get("force_refresh", False))
+
+    result = IncidentService.get_inc_data(inc_number, parse_description=True, force_refresh=force_refresh)
 
     if "rejected" in result:
         return jsonify(result), 400
@@ -49,6 +56,72 @@ def search_incident():
 
     return jsonify(result), 200
 
+@bp.route("/api/autocomplete", methods=["GET"])
+@login_required
+@role_required("admin")
+def autocomplete_incident():
+    numbers = numbers_autocomplete.complete("inc", request.args.get("q", ""), request.args.get("limit", 10, type=int))
+
+    return jsonify({"status": "success", "items": numbers}), 200
+
+@bp.route("/api/search/batch", methods=["POST"])
+@login_required
+@role_required("admin")
+def search_incidents_batch():
+    data = request.get_json(silent=True) or {}
+
+    result = IncidentService.get_inc_data_batch(
+        data.get("inc_numbers"),
+        parse_description=True,
+        force_refresh=bool(data.get("force_refresh", False))
+    )
+
+    if result["status"] == "rejected":
+        return jsonify(result), 400
+    if result["status"] == "error":
+        return jsonify(result), 500
+
+    return jsonify(result), 200
+
+@bp.route("/api/incidents", methods=["GET"])
+@login_required
+@role_required("admin")
+def search_incidents_list():
+    try:
+        created_from = helpers.format_datetime(request.args.get("created_from"))
+        created_to = helpers.format_datetime(request.args.get("created_to"))
+        accident_from = helpers.format_datetime(request.args.get("accident_from"))
+        accident_to = helpers.format_datetime(request.args.get("accident_to"))
+    except ValueError:
+        return jsonify({
+            "status": "rejected",
+            "message": "Некорректный формат даты, ожидается YYYY-MM-DDTHH:MM."
+        }), 400
+
+    last_hours = request.args.get("last_hours", type=int)
+    if last_hours and not created_from:
+        created_from = datetime.now() - timedelta(hours=last_hours)
+
+    result = IncidentService.search_incidents(
+        created_from=created_from,
+        created_to=created_to,
+        accident_from=accident_from,
+        accident_to=accident_to,
+        priorities=request.args.getlist("priority", type=int),
+        statuses=request.args.getlist("status"),
+        service=request.args.get("service", "").strip() or None,
+        ci=request.args.get("ci", "").strip() or None,
+        cursor=request.args.get("cursor"),
+        limit=request.args.get("limit", type=int)
+    )
+
+    if result["status"] == "rejected":
+        return jsonify(result), 400
+    if result["status"] == "error":
+        return jsonify(result), 500
+
+    return jsonify(result), 200
+
 @bp.route("/api/message/generate", methods=["POST"])
 @login_required
 @role_required("admin")
@@ -131,4 +204,32 @@ def get_all_tasks():
         return jsonify({
             "status": "error",
             "message": f"Server error: {str(e)}"
-        }), 500
\ No newline at end of file
+        }), 500
+
+@bp.route('/api/drafts', methods=["GET"])
+@login_required
+@role_required("admin")
+def get_drafts():
+    return jsonify({
+        "status": "success",
+        "enabled": inc_watcher.enabled,
+        "drafts": inc_watcher.get_drafts()
+    }), 200
+
+@bp.route('/api/drafts/<inc_id>', methods=["DELETE"])
+@login_required
+@role_required("admin")
+def dismiss_draft(inc_id):
+    inc_watcher.dismiss_draft(inc_id)
+    socketio.emit('inc_draft_dismissed', {'inc_number': inc_id}, room=inc_watcher.room)
+
+    return jsonify({"status": "success"}), 200
+
+@socketio.on('subscribe_inc_drafts')
+def handle_subscribe_inc_drafts():
+    if current_user.is_authenticated:
+        join_room(inc_watcher.room)
+
+@socketio.on('unsubscribe_inc_drafts')
+def handle_unsubscribe_inc_drafts():
+    leave_room(inc_watcher.room)
\ No newline at end of file
@@ -4,6 +4,13 @@ from flask_login import login_required, current_user
 from app.api.main import bp
 from app.core.services.feedback import FeedbacksService
 from app.core.services.subscriptions import SubscriptionsService
+from app.core.utils.conditional import conditional_response
+from app.extensions import subscriptions_cache
+
+
+def _user_subscriptions_state() -> tuple:
+    """Состояние настроек текущего пользователя, влияющее на ответ со списком подписок."""
+    return current_user.id, current_user.subscriptions, current_user.night_notifications_enabled
 
 
 @bp.route("/")
@@ -14,6 +21,7 @@ def subs_dashboard():
 
 @bp.route("/api/subscriptions", methods=["GET"])
 @login_required
+@conditional_response(subscriptions_cache, extra=_user_subscriptions_state)
 def get_subscriptions():
     status = SubscriptionsService.load_user_subscriptions()
 
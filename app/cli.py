@@ -0,0 +1,44 @@
+import os
+
+import click
+from flask import Flask
+from flask.cli import AppGroup
+
+crq_cli = AppGroup("crq", help="Команды обслуживания CRQ.")
+
+
+@crq_cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "file_format", type=click.Choice(["csv", "json"]),
+              help="Формат файла (по умолчанию - по расширению).")
+@click.option("--on-conflict", type=click.Choice(["skip", "update"]), default="skip", show_default=True,
+              help="Действие для CRQ, уже существующих в базе данных.")
+def import_crqs(path: str, file_format: str | None, on_conflict: str) -> None:
+    """Массовый импорт CRQ из CSV/JSON файла PATH."""
+    from app.core.services.crq_import import CrqImportService
+
+    if not file_format:
+        file_format = "json" if os.path.splitext(path)[1].lower() in (".json", ".jsonl") else "csv"
+
+    with open(path, "rb") as f:
+        result = CrqImportService.import_crqs(f, file_format, on_conflict)
+
+    if result["status"] != "success":
+        raise click.ClickException(result["message"])
+
+    data = result["data"]
+    for reject in data["rejected"]:
+        click.echo(f"Строка {reject['line']} ({reject['crq_number'] or '-'}): {' '.join(reject['errors'])}", err=True)
+
+    click.echo(f"Обработано строк: {data['total']}, добавлено: {data['inserted']}, обновлено: {data['updated']}, "
+               f"отклонено: {len(data['rejected'])}")
+
+
+def register_commands(app: Flask) -> None:
+    """
+    Регистрация CLI команд приложения (flask --app run <команда>).
+
+    Args:
+        app: Экземпляр приложения Flask
+    """
+    app.cli.add_command(crq_cli)
@@ -47,6 +47,19 @@ class Config:
     # Конфигурация приложения
     SECRET_KEY = os.getenv("SECRET_KEY")
     UPLOAD_FOLDER = os.path.join(parent, os.getenv("UPLOAD_FOLDER"))
+    # Ограничения загрузки вложений (в байтах, время жизни незавершенной загрузки в секундах):
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(5 * 1024 * 1024)))
+    UPLOAD_MAX_FILE_SIZE = int(os.getenv("UPLOAD_MAX_FILE_SIZE", str(100 * 1024 * 1024)))
+    UPLOAD_MAX_PENDING_SIZE = int(os.getenv("UPLOAD_MAX_PENDING_SIZE", str(2 * 1024 * 1024 * 1024)))
+    UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", "86400"))
+    UPLOAD_TEMP_TTL = int(os.getenv("UPLOAD_TEMP_TTL", "86400"))
+    # Отдача вложений веб-сервером: префикс internal location nginx (X-Accel-Redirect), либо X-Sendfile:
+    UPLOAD_ACCEL_REDIRECT = os.getenv("UPLOAD_ACCEL_REDIRECT")
+    USE_X_SENDFILE = os.getenv("USE_X_SENDFILE") == "True"
+    # Архив вложений CRQ для почтовых рассылок (порог общего размера в байтах, время жизни неиспользуемого архива в секундах):
+    ATTACHMENT_BUNDLE_ENABLED = os.getenv("ATTACHMENT_BUNDLE_ENABLED") == "True"
+    ATTACHMENT_BUNDLE_THRESHOLD = int(os.getenv("ATTACHMENT_BUNDLE_THRESHOLD", str(10 * 1024 * 1024)))
+    ATTACHMENT_BUNDLE_TTL = int(os.getenv("ATTACHMENT_BUNDLE_TTL", str(7 * 86400)))
     LOGGING_CONF = load_logging_config()
     PERMANENT_SESSION_LIFETIME=timedelta(hours=2)
     REDIS_URL = os.getenv("REDIS_URL", "redis://:S3cure_Redis_Pass@172.28.83.219:6379/0")
@@ -58,6 +71,50 @@ class Config:
     }
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Конфигурация пула сессий oracledb для ITSM (таймауты и интервалы в секундах):
+    ITSM_POOL_ENABLED = os.getenv("ITSM_POOL_ENABLED", "True") == "True"
+    ITSM_POOL_MIN = int(os.getenv("ITSM_POOL_MIN", "2"))
+    ITSM_POOL_MAX = int(os.getenv("ITSM_POOL_MAX", "10"))
+    ITSM_POOL_INCREMENT = int(os.getenv("ITSM_POOL_INCREMENT", "1"))
+    ITSM_POOL_STMT_CACHE_SIZE = int(os.getenv("ITSM_POOL_STMT_CACHE_SIZE", "50"))
+    ITSM_POOL_WAIT_TIMEOUT = int(os.getenv("ITSM_POOL_WAIT_TIMEOUT", "10"))
+    ITSM_POOL_IDLE_TIMEOUT = int(os.getenv("ITSM_POOL_IDLE_TIMEOUT", "300"))
+    ITSM_POOL_PING_INTERVAL = int(os.getenv("ITSM_POOL_PING_INTERVAL", "60"))
+    ITSM_POOL_WARMUP = os.getenv("ITSM_POOL_WARMUP", "True") == "True"
+
+    # Конфигурация кэша запросов к ITSM (в секундах / количество записей):
+    ITSM_CACHE_TTL = int(os.getenv("ITSM_CACHE_TTL", "120"))
+    ITSM_CACHE_LOCAL_TTL = int(os.getenv("ITSM_CACHE_LOCAL_TTL", "15"))
+    ITSM_CACHE_SIZE = int(os.getenv("ITSM_CACHE_SIZE", "1024"))
+
+    # Конфигурация локального зеркала таблиц ITSM (интервалы в секундах):
+    ITSM_MIRROR_ENABLED = os.getenv("ITSM_MIRROR_ENABLED") == "True"
+    ITSM_MIRROR_INTERVAL = int(os.getenv("ITSM_MIRROR_INTERVAL", "60"))
+    ITSM_MIRROR_BATCH_SIZE = int(os.getenv("ITSM_MIRROR_BATCH_SIZE", "1000"))
+    ITSM_MIRROR_INITIAL_DAYS = int(os.getenv("ITSM_MIRROR_INITIAL_DAYS", "30"))
+    ITSM_MIRROR_OVERLAP = int(os.getenv("ITSM_MIRROR_OVERLAP", "300"))
+
+    # Конфигурация фоновой подготовки черновиков нотификаций по инцидентам (интервалы в секундах):
+    INC_WATCHER_ENABLED = os.getenv("INC_WATCHER_ENABLED") == "True"
+    INC_WATCHER_INTERVAL = int(os.getenv("INC_WATCHER_INTERVAL", "30"))
+    INC_WATCHER_PRIORITIES = [
+        int(priority) for priority in os.getenv("INC_WATCHER_PRIORITIES", "1,2").split(",") if priority.strip()
+    ]
+    INC_WATCHER_DRAFT_TTL = int(os.getenv("INC_WATCHER_DRAFT_TTL", "86400"))
+
+    # Конфигурация индекса автодополнения номеров CRQ и инцидентов (интервалы в секундах, глубина в днях):
+    AUTOCOMPLETE_ENABLED = os.getenv("AUTOCOMPLETE_ENABLED", "True") == "True"
+    AUTOCOMPLETE_INTERVAL = int(os.getenv("AUTOCOMPLETE_INTERVAL", "60"))
+    AUTOCOMPLETE_FULL_RELOAD = int(os.getenv("AUTOCOMPLETE_FULL_RELOAD", "3600"))
+    AUTOCOMPLETE_CRQ_DAYS = int(os.getenv("AUTOCOMPLETE_CRQ_DAYS", "365"))
+    AUTOCOMPLETE_INC_DAYS = int(os.getenv("AUTOCOMPLETE_INC_DAYS", "30"))
+
+    # Конфигурация фоновой очистки вложений (интервалы в секундах / количество строк и файлов в пакете):
+    UPLOAD_JANITOR_ENABLED = os.getenv("UPLOAD_JANITOR_ENABLED", "True") == "True"
+    UPLOAD_JANITOR_INTERVAL = int(os.getenv("UPLOAD_JANITOR_INTERVAL", "3600"))
+    UPLOAD_JANITOR_BATCH_SIZE = int(os.getenv("UPLOAD_JANITOR_BATCH_SIZE", "500"))
+    UPLOAD_JANITOR_GRACE_PERIOD = int(os.getenv("UPLOAD_JANITOR_GRACE_PERIOD", "3600"))
+
     # Конфигурация для подключения к Active Directory
     AD_SERVER = os.getenv("AD_SERVER")
     AD_DOMAIN = os.getenv("AD_DOMAIN")
@@ -0,0 +1,112 @@
+from datetime import date, datetime, time
+from typing import Any
+from sqlalchemy import case, false, literal, not_, or_
+from sqlalchemy.ext.hybrid import Comparator
+from sqlalchemy.sql import operators
+
+
+class DecodedValueComparator(Comparator):
+    """
+    SQL-компаратор hybrid-свойств, декодирующих сырое числовое поле ITSM через словарь.
+
+    Сравнения на равенство и вхождение переводятся обратно в условия на сырую колонку
+    (C7 IN (...)), поэтому фильтры используют индексы ITSM. Выборка и сортировка по свойству,
+    а так же прочие операторы используют выражение CASE с тем же словарем.
+    """
+
+    def __init__(self, raw_column: Any, mapping: dict[int, Any], default: Any) -> None:
+        """
+        Инициализация компаратора.
+
+        Args:
+            raw_column: Сырая колонка ITSM
+            mapping: Словарь сырых значений в читаемые
+            default: Читаемое значение для отсутствующих в словаре сырых значений
+        """
+        self.raw_column = raw_column
+        self.mapping = mapping
+        self.default = default
+        super().__init__(case(mapping, value=raw_column, else_=literal(default)))
+
+    def operate(self, op: Any, *other: Any, **kwargs: Any) -> Any:
+        if op is operators.eq:
+            return self._matches([other[0]])
+        if op is operators.ne:
+            return self._excludes([other[0]])
+        if op is operators.in_op:
+            return self._matches(other[0])
+        if op is operators.not_in_op:
+            return self._excludes(other[0])
+        return op(self.expression, *other, **kwargs)
+
+    def _matches(self, values: list[Any]) -> Any:
+        """
+        Внутренний метод построения условия совпадения с читаемыми значениями по сырой колонке.
+
+        Args:
+            values: Список читаемых значений
+
+        Returns:
+            Условие SQLAlchemy
+        """
+        raw_values = [raw for raw, decoded in self.mapping.items() if decoded in values]
+        condition = self.raw_column.in_(raw_values) if raw_values else false()
+
+        if self.default in values:
+            condition = or_(condition, self.raw_column.is_(None), self.raw_column.not_in(list(self.mapping)))
+
+        return condition
+
+    def _excludes(self, values: list[Any]) -> Any:
+        """
+        Внутренний метод построения условия несовпадения с читаемыми значениями по сырой колонке.
+
+        Пустое сырое значение декодируется в значение по умолчанию, поэтому явно включается в выборку,
+        если значение по умолчанию не исключено.
+
+        Args:
+            values: Список читаемых значений
+
+        Returns:
+            Условие SQLAlchemy
+        """
+        condition = not_(self._matches(values))
+
+        if self.default not in values:
+            condition = or_(condition, self.raw_column.is_(None))
+
+        return condition
+
+
+class EpochDateComparator(Comparator):
+    """
+    SQL-компаратор hybrid-свойств дат, хранящихся в ITSM как unix-время.
+
+    Значения datetime/date в условиях переводятся в unix-время (в локальной зоне, как и datetime.fromtimestamp),
+    и сравнение выполняется с сырой колонкой, поэтому диапазоны дат используют индексы ITSM.
+    """
+
+    def operate(self, op: Any, *other: Any, **kwargs: Any) -> Any:
+        return op(self.expression, *[self._to_epoch(value) for value in other], **kwargs)
+
+    def reverse_operate(self, op: Any, other: Any, **kwargs: Any) -> Any:
+        return op(self._to_epoch(other), self.expression, **kwargs)
+
+    @classmethod
+    def _to_epoch(cls, value: Any) -> Any:
+        """
+        Внутренний метод перевода значения даты в unix-время.
+
+        Args:
+            value: datetime, date, их список, либо любое другое значение (возвращается без изменений)
+
+        Returns:
+            Значение unix-времени
+        """
+        if isinstance(value, datetime):
+            return int(value.timestamp())
+        if isinstance(value, date):
+            return int(datetime.combine(value, time.min).timestamp())
+        if isinstance(value, (list, tuple)):
+            return [cls._to_epoch(item) for item in value]
+        return value
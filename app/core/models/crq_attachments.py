@@ -11,10 +11,12 @@ class CRQAttachments(db.Model, CRUDMixin, QueryMixin):
     __table_args__ = {"schema": "grafana"}
 
     id = db.Column("id", db.Integer, primary_key=True, nullable=False)
-    crq_number = db.Column("crq_id", db.Integer, db.ForeignKey('grafana.sbs_crq_data.id', ondelete='CASCADE'), nullable=True)
+    crq_number = db.Column("crq_id", db.Integer, db.ForeignKey('grafana.sbs_crq_data.id', ondelete='CASCADE'), nullable=True, index=True)
     original_filename = db.Column("original_filename", db.String(255), nullable=False)
-    encoded_filename = db.Column("encoded_filename", db.String(255), nullable=False)
+    encoded_filename = db.Column("encoded_filename", db.String(255), nullable=False, index=True)
     upload_date = db.Column("upload_date", db.DateTime, nullable=False)
+    content_hash = db.Column("content_hash", db.String(64), nullable=True, index=True)
+    file_size = db.Column("file_size", db.BigInteger, nullable=True)
 
     def __init__(self, **kwargs):
         """Инициализация с поддержкой keyword arguments для PyCharm"""
@@ -28,5 +30,6 @@ class CRQAttachments(db.Model, CRUDMixin, QueryMixin):
             'original_filename': self.original_filename,
             'encoded_filename': self.encoded_filename,
             'upload_date': self.upload_date.isoformat() if self.upload_date else None,
-            'size': None
+            'size': self.file_size,
+            'content_hash': self.content_hash
         }
\ No newline at end of file
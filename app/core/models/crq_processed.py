@@ -1,14 +1,32 @@
 from typing import Any
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 from app.core.models.mixins import CRUDMixin, QueryMixin
 from app.extensions import db
 
 
+# Поисковый вектор CRQ: краткое описание имеет наибольший вес, комментарии - наименьший
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(short_description, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(cause, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(impact_details, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(detailed_description, '')), 'C') || "
+    "setweight(to_tsvector('russian', coalesce(comments, '')), 'D')"
+)
+
+
 class CRQProcessed(db.Model, CRUDMixin, QueryMixin):
     """Модель таблицы sbs_crq_data БД service_monitoring."""
 
     __tablename__ = "sbs_crq_data"
-    __table_args__ = {"schema": "grafana"}
+    __table_args__ = (
+        db.Index("ix_sbs_crq_data_service_start_date", "service", "start_date"),
+        db.Index("ix_sbs_crq_data_search_vector", "search_vector", postgresql_using="gin"),
+        {"schema": "grafana"}
+    )
+    # Без eager_defaults INSERT/UPDATE не дополняются RETURNING вычисляемых колонок: поисковый вектор
+    # не передается в приложение при сохранении CRQ
+    __mapper_args__ = {"eager_defaults": False}
 
     id = db.Column("id", db.Integer, primary_key=True, nullable=False)
     crq_number = db.Column("crq_number", db.String(255), unique=True, nullable=False)
@@ -26,6 +44,10 @@ class CRQProcessed(db.Model, CRUDMixin, QueryMixin):
     sent_date = db.Column("sent_date", db.DateTime, nullable=False)
     comments = db.Column("comments", db.Text, nullable=False)
     crq_type = db.Column("work_type", db.Text, nullable=False)
+    # Отложенная колонка: не загружается вместе с CRQ, используется только в условиях поиска
+    search_vector = db.deferred(db.Column(
+        "search_vector", TSVECTOR, db.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)
+    ))
     attachments = db.relationship('CRQAttachments', backref='crq', lazy=True, cascade='all, delete-orphan')
 
     def to_dict(self, include_attachments: bool = True) -> dict[str, Any]:
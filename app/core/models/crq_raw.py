@@ -2,29 +2,25 @@ from datetime import datetime
 from typing import Any
 from sqlalchemy.ext.hybrid import hybrid_property
 
+from app.core.models.comparators import DecodedValueComparator, EpochDateComparator
 from app.core.models.mixins import CRUDMixin, QueryMixin
 from app.extensions import db
 
+DIRECTION_MAPPING = {
+    0: "Техническая Дирекция",
+    1: "Информационные технологии",
+    2: "В2В",
+    3: "B2C"
+}
 
-class CRQSource(db.Model, CRUDMixin, QueryMixin):
-    """Модель таблицы T2318 БД ITSM."""
+IMPACT_STATUS_MAPPING = {
+    0: "Без прерывания",
+    1: "С прерыванием"
+}
 
-    __bind_key__ = "itsm"
-    __tablename__ = "T2318"
-    __table_args__ = {"schema": "ARADM"}
 
-    crq_number = db.Column("C1000000182", db.String(15), primary_key = True, nullable=False)
-    direction_raw = db.Column("C536870943", db.Numeric, nullable=False)
-    impact_status_raw = db.Column("C536870992", db.Numeric, nullable=False)
-    td_impact_on_service_details = db.Column("C536870937", db.Text, nullable=True)
-    it_impact_on_client_details = db.Column("C700100201", db.Text, nullable=True)
-    it_impact_on_user_details = db.Column("C700100200", db.Text, nullable=True)
-    start_date_unix = db.Column("C536871024", db.BigInteger, nullable=False)
-    end_date_unix = db.Column("C536871025", db.BigInteger, nullable=False)
-    short_description = db.Column("C1000000000", db.String(500), nullable=False)
-    detailed_description = db.Column("C1000000151", db.Text, nullable=False)
-    initiator = db.Column("C536870952", db.String(255), nullable=False)
-    cause = db.Column("C536870946", db.Text, nullable=False)
+class CRQSourceFieldsMixin:
+    """Mixin с конвертацией сырых полей CRQ ITSM, общий для таблицы T2318 и ее локального зеркала."""
 
     @hybrid_property
     def direction(self) -> str:
@@ -35,13 +31,12 @@ class CRQSource(db.Model, CRUDMixin, QueryMixin):
         Return:
             Выбранное значение поля, или "Техническая Дирекция" по-умолчанию.
         """
-        mapping = {
-            0: "Техническая Дирекция",
-            1: "Информационные технологии",
-            2: "В2В",
-            3: "B2C"
-        }
-        return mapping.get(self.direction_raw, "Техническая Дирекция")
+        return DIRECTION_MAPPING.get(self.direction_raw, "Техническая Дирекция")
+
+    @direction.comparator
+    def direction(cls) -> DecodedValueComparator:
+        """SQL-выражение дирекции: условия строятся по сырому полю C536870943."""
+        return DecodedValueComparator(cls.direction_raw, DIRECTION_MAPPING, "Техническая Дирекция")
 
     @hybrid_property
     def impact_status(self) -> str:
@@ -52,11 +47,12 @@ class CRQSource(db.Model, CRUDMixin, QueryMixin):
         Return:
             Выбранное значение поля, или "Без прерывания" по-умолчанию.
         """
-        mapping = {
-            0: "Без прерывания",
-            1: "С прерыванием"
-        }
-        return mapping.get(self.impact_status_raw, "Без прерывания")
+        return IMPACT_STATUS_MAPPING.get(self.impact_status_raw, "Без прерывания")
+
+    @impact_status.comparator
+    def impact_status(cls) -> DecodedValueComparator:
+        """SQL-выражение влияния на сервис: условия строятся по сырому полю C536870992."""
+        return DecodedValueComparator(cls.impact_status_raw, IMPACT_STATUS_MAPPING, "Без прерывания")
 
     @hybrid_property
     def start_date(self) -> datetime | None:
@@ -71,6 +67,11 @@ class CRQSource(db.Model, CRUDMixin, QueryMixin):
             return datetime.fromtimestamp(self.start_date_unix)
         return None
 
+    @start_date.comparator
+    def start_date(cls) -> EpochDateComparator:
+        """SQL-выражение даты: сравнение с datetime выполняется по сырому unix-времени."""
+        return EpochDateComparator(cls.start_date_unix)
+
     @hybrid_property
     def end_date(self) -> datetime | None:
         """
@@ -84,6 +85,11 @@ class CRQSource(db.Model, CRUDMixin, QueryMixin):
             return datetime.fromtimestamp(self.end_date_unix)
         return None
 
+    @end_date.comparator
+    def end_date(cls) -> EpochDateComparator:
+        """SQL-выражение даты: сравнение с datetime выполняется по сырому unix-времени."""
+        return EpochDateComparator(cls.end_date_unix)
+
     def to_dict(self) -> dict[str, Any]:
         """Конвертация инстанса модели в словарь."""
         result = {
@@ -100,4 +106,50 @@ class CRQSource(db.Model, CRUDMixin, QueryMixin):
 
     def has_attachments_support(self) -> bool:
         """Check if this model supports attachments."""
-        return hasattr(self, 'attachments')
\ No newline at end of file
+        return hasattr(self, 'attachments')
+
+
+class CRQSource(db.Model, CRQSourceFieldsMixin, CRUDMixin, QueryMixin):
+    """Модель таблицы T2318 БД ITSM."""
+
+    __bind_key__ = "itsm"
+    __tablename__ = "T2318"
+    __table_args__ = {"schema": "ARADM"}
+
+    crq_number = db.Column("C1000000182", db.String(15), primary_key = True, nullable=False)
+    direction_raw = db.Column("C536870943", db.Numeric, nullable=False)
+    impact_status_raw = db.Column("C536870992", db.Numeric, nullable=False)
+    td_impact_on_service_details = db.Column("C536870937", db.Text, nullable=True)
+    it_impact_on_client_details = db.Column("C700100201", db.Text, nullable=True)
+    it_impact_on_user_details = db.Column("C700100200", db.Text, nullable=True)
+    start_date_unix = db.Column("C536871024", db.BigInteger, nullable=False)
+    end_date_unix = db.Column("C536871025", db.BigInteger, nullable=False)
+    short_description = db.Column("C1000000000", db.String(500), nullable=False)
+    detailed_description = db.Column("C1000000151", db.Text, nullable=False)
+    initiator = db.Column("C536870952", db.String(255), nullable=False)
+    cause = db.Column("C536870946", db.Text, nullable=False)
+    modified_date_unix = db.Column("C6", db.BigInteger, nullable=True)
+
+
+class CRQSourceMirror(db.Model, CRQSourceFieldsMixin, CRUDMixin, QueryMixin):
+    """Модель таблицы sbs_itsm_crq_mirror БД service_monitoring - локального зеркала T2318 ITSM."""
+
+    __tablename__ = "sbs_itsm_crq_mirror"
+    __table_args__ = (
+        db.Index("ix_sbs_itsm_crq_mirror_modified", "modified_date_unix"),
+        {"schema": "grafana"}
+    )
+
+    crq_number = db.Column("crq_number", db.String(15), primary_key=True, nullable=False)
+    direction_raw = db.Column("direction_raw", db.Numeric, nullable=False)
+    impact_status_raw = db.Column("impact_status_raw", db.Numeric, nullable=False)
+    td_impact_on_service_details = db.Column("td_impact_on_service_details", db.Text, nullable=True)
+    it_impact_on_client_details = db.Column("it_impact_on_client_details", db.Text, nullable=True)
+    it_impact_on_user_details = db.Column("it_impact_on_user_details", db.Text, nullable=True)
+    start_date_unix = db.Column("start_date_unix", db.BigInteger, nullable=False)
+    end_date_unix = db.Column("end_date_unix", db.BigInteger, nullable=False)
+    short_description = db.Column("short_description", db.String(500), nullable=False)
+    detailed_description = db.Column("detailed_description", db.Text, nullable=False)
+    initiator = db.Column("initiator", db.String(255), nullable=False)
+    cause = db.Column("cause", db.Text, nullable=False)
+    modified_date_unix = db.Column("modified_date_unix", db.BigInteger, nullable=True)
@@ -2,28 +2,31 @@ from datetime import datetime
 from typing import Optional
 from sqlalchemy.ext.hybrid import hybrid_property
 
+from app.core.models.comparators import DecodedValueComparator, EpochDateComparator
 from app.core.models.mixins import CRUDMixin, QueryMixin
 from app.extensions import db
 
+PRIORITY_MAPPING = {
+    4: 5,
+    3: 4,
+    2: 3,
+    1: 2,
+    0: 1
+}
 
-class Incidents(db.Model, CRUDMixin, QueryMixin):
-    """Модель таблицы T1447 БД ITSM."""
+STATUS_MAPPING = {
+    0: "Новый",
+    1: "Назначен",
+    2: "Выполняется",
+    3: "В ожидании",
+    4: "Решен",
+    5: "Закрыт",
+    6: "Отменен"
+}
 
-    __bind_key__ = "itsm"
-    __tablename__ = "T1447"
-    __table_args__ = {"schema": "ARADM"}
 
-    inc_id = db.Column("C1000000161", db.String(15), nullable=False, primary_key=True)
-    priority_raw = db.Column("C536870963", db.Numeric, nullable=True)
-    status_raw = db.Column("C7", db.Numeric, nullable=True)
-    short_description = db.Column("C1000000000", db.String(1000), nullable=True)
-    detailed_description = db.Column("C1000000151", db.Text, nullable=True)
-    service = db.Column("C303497300", db.String(255), nullable=True)
-    ci = db.Column("C303497400", db.String(255), nullable=True)
-    creation_date_unix = db.Column("C3", db.BigInteger, nullable=True)
-    solution_date_unix = db.Column("C536871032", db.BigInteger, nullable=True)
-    accident_start_date_unix = db.Column("C536870937", db.BigInteger, nullable=True)
-    accident_end_date_unix = db.Column("C536870938", db.BigInteger, nullable=True)
+class IncidentsFieldsMixin:
+    """Mixin с конвертацией сырых полей инцидента ITSM, общий для таблицы T1447 и ее локального зеркала."""
 
     @hybrid_property
     def priority(self) -> int:
@@ -34,14 +37,12 @@ class Incidents(db.Model, CRUDMixin, QueryMixin):
         Return:
             Выбранное значение поля, или "5" по-умолчанию.
         """
-        mapping = {
-            4: 5,
-            3: 4,
-            2: 3,
-            1: 2,
-            0: 1
-        }
-        return mapping.get(self.priority_raw, 5)
+        return PRIORITY_MAPPING.get(self.priority_raw, 5)
+
+    @priority.comparator
+    def priority(cls) -> DecodedValueComparator:
+        """SQL-выражение приоритета: условия строятся по сырому полю C536870963."""
+        return DecodedValueComparator(cls.priority_raw, PRIORITY_MAPPING, 5)
 
     @hybrid_property
     def status(self) -> str:
@@ -52,16 +53,12 @@ class Incidents(db.Model, CRUDMixin, QueryMixin):
         Return:
             Выбранное значение поля, или "Назначен" по-умолчанию.
         """
-        mapping = {
-            0: "Новый",
-            1: "Назначен",
-            2: "Выполняется",
-            3: "В ожидании",
-            4: "Решен",
-            5: "Закрыт",
-            6: "Отменен"
-        }
-        return mapping.get(self.status_raw, "Назначен")
+        return STATUS_MAPPING.get(self.status_raw, "Назначен")
+
+    @status.comparator
+    def status(cls) -> DecodedValueComparator:
+        """SQL-выражение статуса: условия строятся по сырому полю C7."""
+        return DecodedValueComparator(cls.status_raw, STATUS_MAPPING, "Назначен")
 
     @hybrid_property
     def creation_date(self) -> Optional[datetime]:
@@ -76,6 +73,11 @@ class Incidents(db.Model, CRUDMixin, QueryMixin):
             return datetime.fromtimestamp(self.creation_date_unix)
         return None
 
+    @creation_date.comparator
+    def creation_date(cls) -> EpochDateComparator:
+        """SQL-выражение даты: сравнение с datetime выполняется по сырому unix-времени."""
+        return EpochDateComparator(cls.creation_date_unix)
+
     @hybrid_property
     def solution_date(self) -> Optional[datetime]:
         """
@@ -89,6 +91,11 @@ class Incidents(db.Model, CRUDMixin, QueryMixin):
             return datetime.fromtimestamp(self.solution_date_unix)
         return None
 
+    @solution_date.comparator
+    def solution_date(cls) -> EpochDateComparator:
+        """SQL-выражение даты: сравнение с datetime выполняется по сырому unix-времени."""
+        return EpochDateComparator(cls.solution_date_unix)
+
     @hybrid_property
     def accident_start_date(self) -> Optional[datetime]:
         """
@@ -102,6 +109,11 @@ class Incidents(db.Model, CRUDMixin, QueryMixin):
             return datetime.fromtimestamp(self.accident_start_date_unix)
         return None
 
+    @accident_start_date.comparator
+    def accident_start_date(cls) -> EpochDateComparator:
+        """SQL-выражение даты: сравнение с datetime выполняется по сырому unix-времени."""
+        return EpochDateComparator(cls.accident_start_date_unix)
+
     @hybrid_property
     def accident_end_date(self) -> Optional[datetime]:
         """
@@ -113,4 +125,53 @@ class Incidents(db.Model, CRUDMixin, QueryMixin):
         """
         if self.accident_end_date_unix:
             return datetime.fromtimestamp(self.accident_end_date_unix)
-        return None
\ No newline at end of file
+        return None
+
+    @accident_end_date.comparator
+    def accident_end_date(cls) -> EpochDateComparator:
+        """SQL-выражение даты: сравнение с datetime выполняется по сырому unix-времени."""
+        return EpochDateComparator(cls.accident_end_date_unix)
+
+
+class Incidents(db.Model, IncidentsFieldsMixin, CRUDMixin, QueryMixin):
+    """Модель таблицы T1447 БД ITSM."""
+
+    __bind_key__ = "itsm"
+    __tablename__ = "T1447"
+    __table_args__ = {"schema": "ARADM"}
+
+    inc_id = db.Column("C1000000161", db.String(15), nullable=False, primary_key=True)
+    priority_raw = db.Column("C536870963", db.Numeric, nullable=True)
+    status_raw = db.Column("C7", db.Numeric, nullable=True)
+    short_description = db.Column("C1000000000", db.String(1000), nullable=True)
+    detailed_description = db.Column("C1000000151", db.Text, nullable=True)
+    service = db.Column("C303497300", db.String(255), nullable=True)
+    ci = db.Column("C303497400", db.String(255), nullable=True)
+    creation_date_unix = db.Column("C3", db.BigInteger, nullable=True)
+    solution_date_unix = db.Column("C536871032", db.BigInteger, nullable=True)
+    accident_start_date_unix = db.Column("C536870937", db.BigInteger, nullable=True)
+    accident_end_date_unix = db.Column("C536870938", db.BigInteger, nullable=True)
+    modified_date_unix = db.Column("C6", db.BigInteger, nullable=True)
+
+
+class IncidentsMirror(db.Model, IncidentsFieldsMixin, CRUDMixin, QueryMixin):
+    """Модель таблицы sbs_itsm_inc_mirror БД service_monitoring - локального зеркала T1447 ITSM."""
+
+    __tablename__ = "sbs_itsm_inc_mirror"
+    __table_args__ = (
+        db.Index("ix_sbs_itsm_inc_mirror_modified", "modified_date_unix"),
+        {"schema": "grafana"}
+    )
+
+    inc_id = db.Column("inc_id", db.String(15), nullable=False, primary_key=True)
+    priority_raw = db.Column("priority_raw", db.Numeric, nullable=True)
+    status_raw = db.Column("status_raw", db.Numeric, nullable=True)
+    short_description = db.Column("short_description", db.String(1000), nullable=True)
+    detailed_description = db.Column("detailed_description", db.Text, nullable=True)
+    service = db.Column("service", db.String(255), nullable=True)
+    ci = db.Column("ci", db.String(255), nullable=True)
+    creation_date_unix = db.Column("creation_date_unix", db.BigInteger, nullable=True)
+    solution_date_unix = db.Column("solution_date_unix", db.BigInteger, nullable=True)
+    accident_start_date_unix = db.Column("accident_start_date_unix", db.BigInteger, nullable=True)
+    accident_end_date_unix = db.Column("accident_end_date_unix", db.BigInteger, nullable=True)
+    modified_date_unix = db.Column("modified_date_unix", db.BigInteger, nullable=True)
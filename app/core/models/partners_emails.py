@@ -6,7 +6,10 @@ class PartnersEmails(db.Model, CRUDMixin, QueryMixin):
     """Модель таблицы sbs_partners БД service_monitoring."""
 
     __tablename__ = 'sbs_partners'
-    __table_args__ = {'schema': 'grafana'}
+    __table_args__ = (
+        db.UniqueConstraint("group_id", "email", name="uq_sbs_partners_group_email"),
+        {'schema': 'grafana'}
+    )
 
     partner_id = db.Column("id", db.Integer, primary_key=True, nullable=False)
     partner_email = db.Column("email", db.String(100), nullable=False)
@@ -12,4 +12,8 @@ class PartnerGroups(db.Model, CRUDMixin, QueryMixin):
 
     partner_group_id = db.Column("id", db.Integer, primary_key=True, nullable=False)
     partner_group_name = db.Column("groupname", db.String(100), unique=True, nullable=False)
-    created_at = db.Column("created_at", db.DateTime, nullable=False)
\ No newline at end of file
+    created_at = db.Column("created_at", db.DateTime, nullable=False)
+    # Время последнего изменения состава группы. Колонка отложенная: обычные запросы групп не обращаются к ней,
+    # в существующих БД ее необходимо добавить вручную:
+    # ALTER TABLE grafana.sbs_partners_groups ADD COLUMN updated_at timestamp;
+    updated_at = db.deferred(db.Column("updated_at", db.DateTime, nullable=True))
\ No newline at end of file
@@ -26,6 +26,9 @@ class PrometheusMetrics:
         self._active_users: Gauge | None = None
         self._crq_operations_total: Counter | None = None
         self._inc_operations_total: Counter | None = None
+        self._itsm_pool_wait_duration: Histogram | None = None
+        self._itsm_pool_checkouts_total: Counter | None = None
+        self._itsm_pool_sessions: Gauge | None = None
 
         if app is not None:
             self.init_app(app)
@@ -88,6 +91,26 @@ class PrometheusMetrics:
             ['operation', 'status']
         )
 
+        self._itsm_pool_wait_duration = Histogram(
+            'sbs_itsm_pool_wait_seconds',
+            'Time spent waiting for an ITSM pool session',
+            buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+        )
+
+        self._itsm_pool_checkouts_total = Counter(
+            'sbs_itsm_pool_checkouts_total',
+            'Total number of ITSM pool session checkouts',
+            ['status']
+        )
+
+        # Пул сессий создается в каждом процессе, поэтому значения суммируются по живым процессам
+        self._itsm_pool_sessions = Gauge(
+            'sbs_itsm_pool_sessions',
+            'Number of ITSM pool sessions',
+            ['state'],
+            multiprocess_mode='livesum'
+        )
+
     def record_http_request(self, method: str, endpoint: str, status_code: int,
                             duration: float, module: str = 'unknown') -> None:
         """
@@ -176,6 +199,34 @@ class PrometheusMetrics:
         if self._inc_operations_total:
             self._inc_operations_total.labels(operation=operation, status=status).inc()
 
+    def record_itsm_pool_checkout(self, duration: float, status: str) -> None:
+        """
+        Метод записи метрик получения сессии из пула ITSM.
+
+        Args:
+            duration: Время ожидания сессии в секундах
+            status: Результат получения сессии (success, timeout, error)
+        """
+        if self._itsm_pool_wait_duration:
+            self._itsm_pool_wait_duration.observe(duration)
+
+        if self._itsm_pool_checkouts_total:
+            self._itsm_pool_checkouts_total.labels(status=status).inc()
+
+    def set_itsm_pool_state(self, busy: int, opened: int, max_sessions: int) -> None:
+        """
+        Метод записи текущего состояния пула сессий ITSM.
+
+        Args:
+            busy: Количество занятых сессий
+            opened: Количество открытых сессий
+            max_sessions: Максимальное количество сессий
+        """
+        if self._itsm_pool_sessions:
+            self._itsm_pool_sessions.labels(state='busy').set(busy)
+            self._itsm_pool_sessions.labels(state='opened').set(opened)
+            self._itsm_pool_sessions.labels(state='max').set(max_sessions)
+
     def set_active_users(self, count: int) -> None:
         """
         Метод подсчета количества активных пользователей приложения.
@@ -0,0 +1,257 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+import zipfile
+from typing import Iterable
+
+from eventlet import patcher, tpool
+from flask import current_app, Flask
+
+from app.core.models.crq_attachments import CRQAttachments
+from app.core.models.crq_processed import CRQProcessed
+from app.core.services.attachment_store import AttachmentStore
+
+BUNDLES_DIRECTORY = ".bundles"
+
+# Форматы, которые уже сжаты: повторное сжатие только тратит процессорное время
+COMPRESSED_EXTENSIONS = {
+    ".7z", ".bz2", ".docx", ".gz", ".jpeg", ".jpg", ".mp3", ".mp4", ".png", ".pptx", ".rar", ".xlsx", ".xz", ".zip"
+}
+
+
+class AttachmentBundleService:
+    """
+    Класс сервиса архивов вложений CRQ для почтовых рассылок.
+
+    При сохранении CRQ в фоне собирается ZIP-архив всех его вложений, если их общий размер превышает
+    ATTACHMENT_BUNDLE_THRESHOLD. Архив хранится в <UPLOAD_FOLDER>/.bundles под хэшем набора вложений
+    (содержимое и имена файлов), поэтому повторное сохранение CRQ без изменения вложений архив не пересобирает,
+    а одинаковые наборы вложений разных CRQ используют один архив. Почтовая рассылка прикрепляет архив
+    вместо отдельных файлов. Неиспользуемые архивы удаляет фоновая очистка вложений.
+
+    Сжатие архива не отдает управление hub'у eventlet, поэтому архив записывается в системном потоке (tpool),
+    чтобы сборка не останавливала обработку HTTP-запросов и Socket.IO.
+    """
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """Метод проверки, включены ли архивы вложений"""
+        return current_app.config.get("ATTACHMENT_BUNDLE_ENABLED", False)
+
+    @staticmethod
+    def should_bundle(attachments: list[CRQAttachments]) -> bool:
+        """
+        Метод проверки, нужно ли отправлять вложения одним архивом.
+
+        Args:
+            attachments: Вложения CRQ
+
+        Returns:
+            True, если архивы включены, вложений больше одного и их общий размер превышает порог
+        """
+        if not AttachmentBundleService.is_enabled() or len(attachments) < 2:
+            return False
+
+        threshold = current_app.config.get("ATTACHMENT_BUNDLE_THRESHOLD", 10 * 1024 * 1024)
+        return AttachmentBundleService._total_size(attachments) > threshold
+
+    @staticmethod
+    def get_bundle(attachments: list[CRQAttachments]) -> str:
+        """
+        Метод получения архива вложений (со сборкой, если архив еще не собран).
+
+        Args:
+            attachments: Вложения CRQ
+
+        Returns:
+            Путь к архиву
+        """
+        bundle_path = os.path.join(_bundles_dir(), f"{AttachmentBundleService.bundle_hash(attachments)}.zip")
+
+        if os.path.exists(bundle_path):
+            # Время изменения - время последнего использования архива для фоновой очистки
+            os.utime(bundle_path)
+            return bundle_path
+
+        entries = [
+            (AttachmentStore.file_path(attachment.encoded_filename), arcname)
+            for arcname, attachment in _unique_names(attachments)
+        ]
+        if patcher.is_monkey_patched("thread"):
+            tpool.execute(_write_bundle, bundle_path, entries)
+        else:
+            _write_bundle(bundle_path, entries)
+
+        logging.info(f"Собран архив вложений {os.path.basename(bundle_path)}: {len(attachments)} файлов, "
+                     f"{os.path.getsize(bundle_path)} байт")
+
+        return bundle_path
+
+    @staticmethod
+    def bundle_hash(attachments: list[CRQAttachments]) -> str:
+        """
+        Метод вычисления хэша набора вложений.
+
+        Args:
+            attachments: Вложения CRQ
+
+        Returns:
+            SHA-256 отсортированных пар (содержимое, имя файла)
+        """
+        hasher = hashlib.sha256()
+        for key in sorted(f"{attachment.encoded_filename}\x00{attachment.original_filename}"
+                          for attachment in attachments):
+            hasher.update(key.encode("utf-8"))
+            hasher.update(b"\x01")
+
+        return hasher.hexdigest()
+
+    @staticmethod
+    def schedule_build(crq_id: int) -> None:
+        """
+        Метод фоновой сборки архива вложений CRQ (вызывается после коммита сохранения CRQ).
+
+        Args:
+            crq_id: ID CRQ
+        """
+        if not AttachmentBundleService.is_enabled():
+            return
+
+        threading.Thread(
+            target=AttachmentBundleService._build_in_background,
+            args=(current_app._get_current_object(), crq_id),
+            daemon=True,
+            name="AttachmentBundle"
+        ).start()
+
+    @staticmethod
+    def cleanup_stale(ttl: int) -> int:
+        """
+        Метод удаления архивов, не использовавшихся дольше ttl секунд.
+
+        Args:
+            ttl: Время жизни неиспользуемого архива в секундах
+
+        Returns:
+            Количество удаленных архивов
+        """
+        cutoff = time.time() - ttl
+        removed = 0
+
+        for entry in list(os.scandir(_bundles_dir())):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+
+        return removed
+
+    @staticmethod
+    def _build_in_background(app: Flask, crq_id: int) -> None:
+        """
+        Внутренний метод сборки архива в фоновом потоке.
+
+        Args:
+            app: Экземпляр приложения Flask
+            crq_id: ID CRQ
+        """
+        from app.extensions import db
+
+        with app.app_context():
+            try:
+                crq = CRQProcessed.get_by_id(crq_id)
+                if crq and AttachmentBundleService.should_bundle(crq.attachments):
+                    AttachmentBundleService.get_bundle(crq.attachments)
+            except Exception as e:
+                logging.error(f"Ошибка сборки архива вложений CRQ {crq_id}: {e}")
+            finally:
+                db.session.remove()
+
+    @staticmethod
+    def _total_size(attachments: list[CRQAttachments]) -> int:
+        """
+        Внутренний метод подсчета общего размера вложений.
+
+        Args:
+            attachments: Вложения CRQ
+
+        Returns:
+            Общий размер в байтах (для вложений без сохраненного размера - по размеру файла)
+        """
+        total = 0
+        for attachment in attachments:
+            if attachment.file_size is not None:
+                total += attachment.file_size
+                continue
+            try:
+                total += os.path.getsize(AttachmentStore.file_path(attachment.encoded_filename))
+            except OSError:
+                pass
+
+        return total
+
+
+def _bundles_dir() -> str:
+    """Метод получения (и создания при отсутствии) каталога архивов вложений."""
+    bundles_dir = os.path.join(current_app.config["UPLOAD_FOLDER"], BUNDLES_DIRECTORY)
+    os.makedirs(bundles_dir, exist_ok=True)
+    return bundles_dir
+
+
+def _write_bundle(bundle_path: str, entries: list[tuple[str, str]]) -> None:
+    """
+    Метод записи ZIP-архива (выполняется вне контекста приложения, в том числе в системном потоке tpool).
+
+    Args:
+        bundle_path: Путь к архиву
+        entries: Лист пар (путь к файлу, имя файла в архиве)
+    """
+    temp_path = f"{bundle_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as bundle:
+            for file_path, arcname in entries:
+                _, extension = os.path.splitext(arcname)
+                bundle.write(
+                    file_path,
+                    arcname=arcname,
+                    compress_type=(
+                        zipfile.ZIP_STORED if extension.lower() in COMPRESSED_EXTENSIONS else zipfile.ZIP_DEFLATED
+                    )
+                )
+        os.replace(temp_path, bundle_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _unique_names(attachments: Iterable[CRQAttachments]) -> list[tuple[str, CRQAttachments]]:
+    """
+    Метод получения уникальных имен файлов в архиве.
+
+    Args:
+        attachments: Вложения CRQ
+
+    Returns:
+        Лист пар (имя файла в архиве, вложение), одинаковые имена дополняются номером: file (2).pdf
+    """
+    used: set[str] = set()
+    result = []
+
+    for attachment in sorted(attachments, key=lambda item: (item.original_filename, item.encoded_filename)):
+        name = os.path.basename(attachment.original_filename.replace("\\", "/")) or attachment.encoded_filename
+        stem, extension = os.path.splitext(name)
+        counter = 1
+        while name.lower() in used:
+            counter += 1
+            name = f"{stem} ({counter}){extension}"
+
+        used.add(name.lower())
+        result.append((name, attachment))
+
+    return result
@@ -0,0 +1,219 @@
+import logging
+import mimetypes
+import os
+import threading
+from urllib.parse import quote
+
+from flask import current_app, send_file, Flask, Response
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.core.models.crq_attachments import CRQAttachments
+from app.extensions import db
+
+
+class AttachmentStore:
+    """
+    Класс контентно-адресуемого хранилища файлов вложений CRQ.
+
+    Файл хранится в UPLOAD_FOLDER один раз под именем, равным SHA-256 содержимого, и на него ссылаются все строки
+    CRQAttachments с этим encoded_filename. Количество ссылок не хранится отдельно, а вычисляется по CRQAttachments,
+    поэтому файл удаляется только вместе с последней ссылающейся строкой. Размещение и освобождение файла выполняются
+    под транзакционной advisory-блокировкой Postgres по имени файла, поэтому параллельная загрузка того же содержимого
+    не может сослаться на удаляемый файл. Файлы, загруженные до появления хранилища (имя UUID), обрабатываются так же.
+
+    Освобождение файлов удаленных вложений откладывается до коммита транзакции (release_after_commit) и выполняется
+    в фоновом потоке, поэтому откат транзакции не оставляет вложений без файлов.
+    """
+
+    session_key: str = "attachment_store_release"
+
+    @staticmethod
+    def file_path(encoded_filename: str) -> str:
+        """
+        Метод получения пути к файлу хранилища.
+
+        Args:
+            encoded_filename: Имя файла в хранилище
+
+        Returns:
+            Путь к файлу
+        """
+        return os.path.join(current_app.config["UPLOAD_FOLDER"], encoded_filename)
+
+    @staticmethod
+    def store(temp_path: str, content_hash: str) -> str:
+        """
+        Метод размещения загруженного файла в хранилище.
+
+        Если файл с тем же содержимым уже сохранен, временный файл удаляется, и возвращается имя существующего.
+        Блокировка удерживается до конца транзакции, в которой создается ссылка на файл.
+
+        Args:
+            temp_path: Путь к полностью загруженному временному файлу
+            content_hash: SHA-256 содержимого
+
+        Returns:
+            Имя файла в хранилище
+        """
+        encoded_filename = content_hash.lower()
+        AttachmentStore._lock(encoded_filename)
+
+        file_path = AttachmentStore.file_path(encoded_filename)
+        if os.path.exists(file_path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, file_path)
+
+        return encoded_filename
+
+    @staticmethod
+    def release(encoded_filenames: set[str]) -> list[str]:
+        """
+        Метод удаления файлов, на которые не осталось ссылок.
+
+        Вызывается после удаления строк CRQAttachments: в той же транзакции после flush, либо после ее коммита
+        (см. release_after_commit).
+
+        Args:
+            encoded_filenames: Имена файлов удаленных вложений
+
+        Returns:
+            Лист удаленных файлов
+        """
+        if not encoded_filenames:
+            return []
+
+        for encoded_filename in sorted(encoded_filenames):
+            AttachmentStore._lock(encoded_filename)
+
+        referenced = set(db.session.execute(
+            db.select(CRQAttachments.encoded_filename)
+            .where(CRQAttachments.encoded_filename.in_(encoded_filenames))
+            .distinct()
+        ).scalars().all())
+
+        removed = []
+        for encoded_filename in sorted(encoded_filenames - referenced):
+            file_path = AttachmentStore.file_path(encoded_filename)
+            try:
+                os.remove(file_path)
+                removed.append(encoded_filename)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.warning(f"Не удалось удалить файл {file_path}: {e}")
+
+        return removed
+
+    @staticmethod
+    def release_after_commit(encoded_filenames: set[str]) -> None:
+        """
+        Метод планирования освобождения файлов удаленных вложений после коммита текущей транзакции.
+
+        При откате транзакции запланированные файлы не освобождаются.
+
+        Args:
+            encoded_filenames: Имена файлов удаленных вложений
+        """
+        if encoded_filenames:
+            db.session.info.setdefault(AttachmentStore.session_key, set()).update(encoded_filenames)
+
+    @staticmethod
+    def _release_in_background(app: Flask, encoded_filenames: set[str]) -> None:
+        """
+        Внутренний метод освобождения файлов в отдельной транзакции фонового потока.
+
+        Args:
+            app: Экземпляр приложения Flask
+            encoded_filenames: Имена файлов удаленных вложений
+        """
+        with app.app_context():
+            try:
+                removed = AttachmentStore.release(encoded_filenames)
+                db.session.commit()
+                if removed:
+                    logging.info(f"Удалено файлов вложений без ссылок: {len(removed)}")
+            except Exception as e:
+                db.session.rollback()
+                logging.error(f"Ошибка освобождения файлов вложений: {e}")
+            finally:
+                db.session.remove()
+
+    @staticmethod
+    def send(attachment: CRQAttachments) -> Response:
+        """
+        Метод формирования ответа со скачиваемым файлом вложения.
+
+        Если задан UPLOAD_ACCEL_REDIRECT, ответ не содержит тела: файл из internal location отдает nginx
+        (X-Accel-Redirect), он же обрабатывает Range и условные запросы. Иначе файл отдается через send_file:
+        с поддержкой Range, ETag и Last-Modified, через X-Sendfile при USE_X_SENDFILE, либо через sendfile()
+        сервера приложений. ETag вложения - SHA-256 содержимого, поэтому он не меняется при переносе файла.
+
+        Args:
+            attachment: Вложение
+
+        Returns:
+            Ответ на HTTP-запрос
+
+        Raises:
+            FileNotFoundError: Файл вложения отсутствует в хранилище
+        """
+        file_path = AttachmentStore.file_path(attachment.encoded_filename)
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(attachment.encoded_filename)
+
+        accel_redirect = current_app.config.get("UPLOAD_ACCEL_REDIRECT")
+        if accel_redirect:
+            mimetype = mimetypes.guess_type(attachment.original_filename)[0] or "application/octet-stream"
+            response = Response(status=200, mimetype=mimetype)
+            response.headers["X-Accel-Redirect"] = f"{accel_redirect.rstrip('/')}/{quote(attachment.encoded_filename)}"
+            response.headers["Content-Disposition"] = (
+                f"attachment; filename*=UTF-8''{quote(attachment.original_filename)}"
+            )
+        else:
+            response = send_file(
+                file_path,
+                as_attachment=True,
+                download_name=attachment.original_filename,
+                etag=attachment.content_hash or True,
+                last_modified=attachment.upload_date,
+                conditional=True
+            )
+
+        # Вложения доступны только авторизованным пользователям: кэширование разрешено только в браузере
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+
+        return response
+
+    @staticmethod
+    def _lock(encoded_filename: str) -> None:
+        """
+        Внутренний метод взятия транзакционной advisory-блокировки по имени файла.
+
+        Args:
+            encoded_filename: Имя файла в хранилище
+        """
+        db.session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": encoded_filename})
+
+
+@event.listens_for(Session, "after_commit")
+def _start_pending_release(session: Session) -> None:
+    """Запуск освобождения файлов, запланированных в закоммиченной транзакции"""
+    encoded_filenames = session.info.pop(AttachmentStore.session_key, None)
+    if not encoded_filenames:
+        return
+
+    threading.Thread(
+        target=AttachmentStore._release_in_background,
+        args=(current_app._get_current_object(), encoded_filenames),
+        daemon=True,
+        name="AttachmentStoreRelease"
+    ).start()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_release(session: Session) -> None:
+    """Отмена освобождения файлов, запланированных в откаченной транзакции"""
+    session.info.pop(AttachmentStore.session_key, None)
@@ -0,0 +1,256 @@
+import logging
+import threading
+import time
+import heapq
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from string import ascii_uppercase
+
+from flask import Flask
+
+
+@dataclass(frozen=True)
+class _PrefixIndex:
+    """
+    Неизменяемый снимок префиксного индекса номеров.
+
+    Номера хранятся в двух отсортированных списках: по полному номеру (CRQ000000123456)
+    и по значащей части номера без букв и ведущих нулей (123456), поэтому поиск по любому
+    из вариантов ввода - два бинарных поиска и срез. Значащие части разной длины в срезе упорядочены
+    лексикографически ("9" после "123456"), поэтому новейшие номера выбираются из среза по (длина, значение).
+    """
+
+    numbers: list[str] = field(default_factory=list)
+    short_keys: list[tuple[str, str]] = field(default_factory=list)
+
+    def merge(self, new_numbers: list[str]) -> "_PrefixIndex":
+        """
+        Метод построения нового снимка с добавленными номерами.
+
+        Args:
+            new_numbers: Номера для добавления
+
+        Returns:
+            Новый снимок индекса
+        """
+        known = set(self.numbers)
+        added = sorted({number for number in new_numbers if number and number not in known})
+        if not added:
+            return self
+
+        return _PrefixIndex(
+            numbers=sorted(self.numbers + added),
+            short_keys=sorted(self.short_keys + [(_short_key(number), number) for number in added])
+        )
+
+    def search(self, prefix: str, limit: int) -> list[str]:
+        """
+        Метод поиска номеров по префиксу.
+
+        Args:
+            prefix: Префикс полного номера, либо цифры значащей части номера
+            limit: Максимальное количество номеров
+
+        Returns:
+            Лист номеров, от больших (новых) к меньшим
+        """
+        if prefix.isdigit():
+            key = prefix.lstrip("0") or "0"
+            start = bisect_left(self.short_keys, (key,))
+            end = bisect_right(self.short_keys, (key + "\uffff",))
+            newest = heapq.nlargest(limit, self.short_keys[start:end], key=lambda item: (len(item[0]), item[0]))
+            return [number for _, number in newest]
+
+        start = bisect_left(self.numbers, prefix)
+        end = bisect_right(self.numbers, prefix + "\uffff")
+        return list(reversed(self.numbers[max(start, end - limit):end]))
+
+
+def _short_key(number: str) -> str:
+    """
+    Метод получения значащей части номера (без буквенного префикса и ведущих нулей).
+
+    Args:
+        number: Номер CRQ или инцидента
+
+    Returns:
+        Значащая часть номера
+    """
+    return number.lstrip(ascii_uppercase).lstrip("0") or "0"
+
+
+class NumbersAutocomplete:
+    """
+    Менеджер автодополнения номеров CRQ и инцидентов - Flask Extension.
+
+    Номера недавних обработанных CRQ (sbs_crq_data) и недавних инцидентов (зеркало ITSM, либо ITSM,
+    если зеркало выключено) хранятся в памяти процесса в виде префиксного индекса. Фоновый поток
+    периодически догружает только новые номера (по id CRQ и дате создания инцидента) и раз в
+    AUTOCOMPLETE_FULL_RELOAD секунд перестраивает индекс целиком, чтобы удалить устаревшие и удаленные номера.
+    Поиск не обращается к БД.
+    """
+
+    def __init__(self) -> None:
+        self.app: Flask | None = None
+        self.enabled: bool = False
+        self.interval: int = 60
+        self.full_reload: int = 3600
+        self.crq_days: int = 365
+        self.inc_days: int = 30
+        self.max_limit: int = 20
+
+        self.indexes: dict[str, _PrefixIndex] = {"crq": _PrefixIndex(), "inc": _PrefixIndex()}
+        self._crq_last_id: int = 0
+        self._inc_last_created: int = 0
+        self._reloaded_at: float = 0.0
+
+        self.worker_thread: threading.Thread | None = None
+        self._shutdown_event: threading.Event = threading.Event()
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Инициализация расширения в контексте Flask app.
+
+        Args:
+            app: Экземпляр приложения Flask
+        """
+        self.app = app
+        self.enabled = app.config.get("AUTOCOMPLETE_ENABLED", False)
+        self.interval = app.config.get("AUTOCOMPLETE_INTERVAL", self.interval)
+        self.full_reload = app.config.get("AUTOCOMPLETE_FULL_RELOAD", self.full_reload)
+        self.crq_days = app.config.get("AUTOCOMPLETE_CRQ_DAYS", self.crq_days)
+        self.inc_days = app.config.get("AUTOCOMPLETE_INC_DAYS", self.inc_days)
+        app.extensions["numbers_autocomplete"] = self
+
+        if self.enabled:
+            self.start_worker()
+
+    def start_worker(self) -> None:
+        """Запуск потока обновления индекса в фоновом режиме"""
+        if self.worker_thread and self.worker_thread.is_alive():
+            return
+
+        self._shutdown_event.clear()
+        self.worker_thread = threading.Thread(
+            target=self._worker_loop,
+            daemon=True,
+            name="NumbersAutocomplete"
+        )
+        self.worker_thread.start()
+        logging.info("Поток обновления индекса автодополнения номеров запущен")
+
+    def stop_worker(self) -> None:
+        """Завершение работы потока обновления индекса"""
+        self._shutdown_event.set()
+        if self.worker_thread and self.worker_thread.is_alive():
+            self.worker_thread.join(timeout=10)
+
+    def complete(self, kind: str, prefix: str, limit: int = 10) -> list[str]:
+        """
+        Метод поиска номеров по префиксу.
+
+        Args:
+            kind: Тип номеров - crq/inc
+            prefix: Введенная часть номера (полный префикс, либо цифры номера)
+            limit: Максимальное количество номеров
+
+        Returns:
+            Лист подходящих номеров, от новых к старым
+        """
+        prefix = (prefix or "").strip().upper()
+        index = self.indexes.get(kind)
+        if not prefix or index is None:
+            return []
+
+        limit = max(1, min(limit, self.max_limit))
+        numbers = index.search(prefix, limit)
+
+        # Номер с буквенным префиксом, но без ведущих нулей (CRQ123456) ищется по значащей части
+        digits = _short_key(prefix)
+        if not numbers and digits != prefix and digits.isdigit():
+            numbers = index.search(digits, limit)
+
+        return numbers
+
+    def refresh(self) -> None:
+        """Метод обновления индекса: догрузка новых номеров, либо полное перестроение по истечении интервала"""
+        full_reload = time.time() - self._reloaded_at >= self.full_reload
+        if full_reload:
+            crq_index, inc_index, crq_last_id, inc_last_created = _PrefixIndex(), _PrefixIndex(), 0, 0
+        else:
+            crq_index, inc_index = self.indexes["crq"], self.indexes["inc"]
+            crq_last_id, inc_last_created = self._crq_last_id, self._inc_last_created
+
+        crq_numbers, crq_last_id = self._load_crq_numbers(crq_last_id)
+        inc_numbers, inc_last_created = self._load_inc_numbers(inc_last_created)
+
+        # Снимки заменяются целиком, поэтому поиск в других потоках читает индекс без блокировок
+        self.indexes = {"crq": crq_index.merge(crq_numbers), "inc": inc_index.merge(inc_numbers)}
+        self._crq_last_id, self._inc_last_created = crq_last_id, inc_last_created
+        if full_reload:
+            self._reloaded_at = time.time()
+
+    def _load_crq_numbers(self, last_id: int) -> tuple[list[str], int]:
+        """
+        Внутренний метод загрузки номеров CRQ, добавленных после последней загрузки.
+
+        Args:
+            last_id: Максимальный id CRQ предыдущей загрузки
+
+        Returns:
+            Лист номеров CRQ и новое значение максимального id
+        """
+        from app.core.models.crq_processed import CRQProcessed
+        from app.extensions import db
+
+        rows = db.session.execute(
+            db.select(CRQProcessed.id, CRQProcessed.crq_number)
+            .where(
+                CRQProcessed.id > last_id,
+                CRQProcessed.start_date >= datetime.now() - timedelta(days=self.crq_days)
+            )
+            .order_by(CRQProcessed.id.asc())
+        ).all()
+
+        return [row.crq_number for row in rows], rows[-1].id if rows else last_id
+
+    def _load_inc_numbers(self, last_created: int) -> tuple[list[str], int]:
+        """
+        Внутренний метод загрузки номеров инцидентов, созданных после последней загрузки.
+
+        Args:
+            last_created: Максимальная дата создания инцидента (unix-время) предыдущей загрузки
+
+        Returns:
+            Лист номеров инцидентов и новое значение максимальной даты создания
+        """
+        from app.core.models.inc_raw import Incidents, IncidentsMirror
+        from app.extensions import db, itsm_mirror
+
+        model = IncidentsMirror if itsm_mirror.is_fresh() else Incidents
+        since = max(last_created, int(time.time()) - self.inc_days * 86400)
+
+        rows = db.session.execute(
+            db.select(model.inc_id, model.creation_date_unix)
+            .where(model.creation_date_unix >= since)
+            .order_by(model.creation_date_unix.asc())
+        ).all()
+
+        return [row.inc_id for row in rows], rows[-1].creation_date_unix if rows else last_created
+
+    def _worker_loop(self) -> None:
+        """Основной цикл потока обновления индекса"""
+        while not self._shutdown_event.is_set():
+            try:
+                with self.app.app_context():
+                    from app.extensions import db
+
+                    try:
+                        self.refresh()
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                logging.error(f"Ошибка обновления индекса автодополнения номеров: {e}")
+
+            self._shutdown_event.wait(self.interval)
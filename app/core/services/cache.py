@@ -0,0 +1,454 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Callable
+
+import redis
+from flask import Flask
+from sqlalchemy import inspect as sa_inspect
+
+CHANGES_LOG_LIMIT = 10000
+
+# Атомарно увеличивает версию, записывает измененные объекты в журнал (sorted set, score - версия)
+# и обрезает журнал до лимита, запоминая максимальную удаленную версию как нижнюю границу журнала.
+RECORD_CHANGES_LUA = """
+local version = redis.call('INCR', KEYS[1])
+for i = 2, #ARGV do
+    redis.call('ZADD', KEYS[2], version, ARGV[i])
+end
+local excess = redis.call('ZCARD', KEYS[2]) - tonumber(ARGV[1])
+if excess > 0 then
+    local removed = redis.call('ZRANGE', KEYS[2], excess - 1, excess - 1, 'WITHSCORES')
+    redis.call('SET', KEYS[3], removed[2])
+    redis.call('ZREMRANGEBYRANK', KEYS[2], 0, excess - 1)
+end
+return version
+"""
+
+
+class VersionedCache:
+    """
+    Класс процесс-локального кэша с версионной меткой в Redis.
+
+    Данные хранятся в памяти процесса, а в Redis хранится только счетчик версии пространства имен.
+    Инвалидация увеличивает счетчик, и остальные процессы сбрасывают свои локальные данные
+    при следующем обращении к кэшу. Опциональный TTL ограничивает время жизни записи на случай
+    изменений в БД в обход приложения.
+    """
+
+    def __init__(self, namespace: str, ttl: int | None = None) -> None:
+        """
+        Инициализация кэша.
+
+        Args:
+            namespace: Пространство имен кэша (используется в ключе версии Redis)
+            ttl: Время жизни записи в секундах (None - без ограничения)
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.version_key = f"sbs_cache_version:{namespace}"
+        self.changes_key = f"sbs_cache_changes:{namespace}"
+        self.changes_floor_key = f"sbs_cache_changes_floor:{namespace}"
+        self.redis_client: redis.Redis | None = None
+        self._record_changes_script = None
+
+        self._entries: dict[Any, tuple[Any, float]] = {}
+        self._local_version: int = 0
+        self._loaded_version: int = 0
+        self._local_changes: dict[str, int] = {}
+        self._local_changes_floor: int = 0
+        self._lock: threading.RLock = threading.RLock()
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Инициализация расширения в контексте Flask app.
+
+        Args:
+            app: Экземпляр приложения Flask
+        """
+        try:
+            self.redis_client = redis.from_url(
+                app.config["REDIS_URL"],
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True,
+                health_check_interval=30
+            )
+            self.redis_client.ping()
+            self._record_changes_script = self.redis_client.register_script(RECORD_CHANGES_LUA)
+        except Exception as e:
+            logging.error(f"Кэш '{self.namespace}' работает без Redis, межпроцессная инвалидация отключена: {e}")
+            self.redis_client = None
+
+        app.extensions[f"{self.namespace}_cache"] = self
+
+    @property
+    def version(self) -> int:
+        """Текущая версия кэша (из Redis, либо локальная при недоступности Redis)."""
+        if self.redis_client is not None:
+            try:
+                return int(self.redis_client.get(self.version_key) or 0)
+            except redis.RedisError as e:
+                logging.warning(f"Ошибка чтения версии кэша '{self.namespace}': {e}")
+        return self._local_version
+
+    def get_or_load(self, key: Any, loader: Callable[[], Any]) -> Any:
+        """
+        Метод получения значения из кэша с загрузкой при промахе.
+
+        Args:
+            key: Ключ значения
+            loader: Функция загрузки значения из источника данных
+
+        Returns:
+            Закэшированное или только что загруженное значение
+        """
+        current_version = self.version
+
+        with self._lock:
+            if current_version != self._loaded_version:
+                self._entries.clear()
+                self._loaded_version = current_version
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, loaded_at = entry
+                if self.ttl is None or time.monotonic() - loaded_at < self.ttl:
+                    return value
+
+        value = loader()
+
+        with self._lock:
+            if self._loaded_version == current_version:
+                self._entries[key] = (value, time.monotonic())
+
+        return value
+
+    def invalidate(self, changed: list[str] | None = None) -> int:
+        """
+        Метод инвалидации кэша во всех процессах.
+
+        Args:
+            changed: Идентификаторы измененных объектов для журнала изменений (опционально)
+
+        Returns:
+            Новая версия кэша
+        """
+        with self._lock:
+            self._entries.clear()
+            self._local_version += 1
+            new_version = self._local_version
+
+            if changed:
+                for member in changed:
+                    self._local_changes[member] = new_version
+                self._trim_local_changes()
+
+        if self.redis_client is not None:
+            try:
+                if changed:
+                    return int(self._record_changes_script(
+                        keys=[self.version_key, self.changes_key, self.changes_floor_key],
+                        args=[CHANGES_LOG_LIMIT, *changed]
+                    ))
+                return int(self.redis_client.incr(self.version_key))
+            except redis.RedisError as e:
+                logging.error(f"Ошибка инвалидации кэша '{self.namespace}' в Redis: {e}")
+
+        return new_version
+
+    def changes_since(self, version: int) -> list[str] | None:
+        """
+        Метод получения идентификаторов объектов, измененных после указанной версии.
+
+        Args:
+            version: Версия, известная клиенту
+
+        Returns:
+            Список идентификаторов, или None, если журнал не покрывает запрошенную версию
+            и клиенту требуется полная перезагрузка
+        """
+        if self.redis_client is not None:
+            try:
+                floor = int(self.redis_client.get(self.changes_floor_key) or 0)
+                if version < floor or version > self.version:
+                    return None
+                return list(self.redis_client.zrangebyscore(self.changes_key, f"({version}", "+inf"))
+            except redis.RedisError as e:
+                logging.warning(f"Ошибка чтения журнала изменений кэша '{self.namespace}': {e}")
+                return None
+
+        with self._lock:
+            if version < self._local_changes_floor or version > self._local_version:
+                return None
+            return [member for member, changed_at in self._local_changes.items() if changed_at > version]
+
+    def _trim_local_changes(self) -> None:
+        """Внутренний метод ограничения размера локального журнала изменений."""
+        excess = len(self._local_changes) - CHANGES_LOG_LIMIT
+        if excess <= 0:
+            return
+
+        oldest = sorted(self._local_changes.items(), key=lambda item: item[1])[:excess]
+        for member, _ in oldest:
+            del self._local_changes[member]
+        self._local_changes_floor = max(self._local_changes_floor, oldest[-1][1])
+
+
+class RecordCache:
+    """
+    Класс read-through кэша отдельных записей внешних источников (ITSM) по их номеру.
+
+    Первый уровень - LRU в памяти процесса с коротким TTL, второй - общий для всех процессов слой в Redis
+    с основным TTL. В кэше хранятся значения колонок записи, при чтении из них собирается
+    отсоединенный от сессии инстанс модели, поэтому hybrid-свойства модели продолжают работать.
+    Загруженная из источника запись возвращается так же, из значений кэша, поэтому ответ не зависит
+    от того, была ли запись в кэше. Отсутствующие записи не кэшируются.
+    """
+
+    def __init__(self, namespace: str, ttl: int = 120, local_ttl: int = 15, max_size: int = 1024) -> None:
+        """
+        Инициализация кэша.
+
+        Args:
+            namespace: Пространство имен кэша (используется в ключах Redis)
+            ttl: Время жизни записи в Redis в секундах
+            local_ttl: Время жизни записи в памяти процесса в секундах
+            max_size: Максимальное количество записей в памяти процесса
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.max_size = max_size
+        self.redis_client: redis.Redis | None = None
+
+        self._entries: OrderedDict[str, tuple[dict[str, Any], float]] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Инициализация расширения в контексте Flask app.
+
+        Args:
+            app: Экземпляр приложения Flask
+        """
+        prefix = self.namespace.upper()
+        self.ttl = app.config.get(f"{prefix}_CACHE_TTL", self.ttl)
+        self.local_ttl = min(app.config.get(f"{prefix}_CACHE_LOCAL_TTL", self.local_ttl), self.ttl)
+        self.max_size = app.config.get(f"{prefix}_CACHE_SIZE", self.max_size)
+
+        try:
+            self.redis_client = redis.from_url(
+                app.config["REDIS_URL"],
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True,
+                health_check_interval=30
+            )
+            self.redis_client.ping()
+        except Exception as e:
+            logging.error(f"Кэш '{self.namespace}' работает без Redis, используется только память процесса: {e}")
+            self.redis_client = None
+
+        app.extensions[f"{self.namespace}_cache"] = self
+
+    def get_record(self, model: type, record_id: Any, loader: Callable[[], Any] | None = None,
+                   force_refresh: bool = False) -> Any | None:
+        """
+        Метод получения записи модели по номеру с загрузкой из источника при промахе.
+
+        Args:
+            model: Класс модели SQLAlchemy
+            record_id: Номер (первичный ключ) записи
+            loader: Функция загрузки инстанса из источника (по умолчанию model.get_by_id)
+            force_refresh: Игнорировать закэшированное значение и перечитать запись из источника
+
+        Returns:
+            Инстанс модели, или None если запись не найдена
+        """
+        key = f"{model.__tablename__}:{record_id}"
+
+        if not force_refresh:
+            values = self._get_local(key)
+            if values is None:
+                values = self._get_shared(key)
+                if values is not None:
+                    self._set_local(key, values)
+
+            if values is not None:
+                return model(**values)
+
+        instance = loader() if loader else model.get_by_id(record_id)
+        if instance is None:
+            self.invalidate(model, record_id)
+            return None
+
+        values = self._snapshot(instance)
+        self._set_local(key, values)
+        self._set_shared(key, values)
+
+        return model(**values)
+
+    def get_records(self, model: type, record_ids: list[Any], loader: Callable[[list[Any]], list[Any]],
+                    force_refresh: bool = False) -> dict[Any, Any]:
+        """
+        Метод пакетного получения записей модели по номерам.
+
+        Закэшированные записи берутся из памяти процесса и одним запросом MGET из Redis,
+        остальные загружаются из источника одним вызовом loader.
+
+        Args:
+            model: Класс модели SQLAlchemy
+            record_ids: Номера (первичные ключи) записей
+            loader: Функция загрузки инстансов из источника по списку номеров
+            force_refresh: Игнорировать закэшированные значения и перечитать записи из источника
+
+        Returns:
+            Словарь найденных инстансов по номеру записи
+        """
+        mapper = sa_inspect(model)
+        pk_key = mapper.get_property_by_column(mapper.primary_key[0]).key
+        keys = {record_id: f"{model.__tablename__}:{record_id}" for record_id in record_ids}
+        found: dict[Any, Any] = {}
+
+        if not force_refresh:
+            missing_keys = []
+            for record_id, key in keys.items():
+                values = self._get_local(key)
+                if values is not None:
+                    found[record_id] = model(**values)
+                else:
+                    missing_keys.append(key)
+
+            for key, values in self._get_shared_many(missing_keys).items():
+                self._set_local(key, values)
+                found[values[pk_key]] = model(**values)
+
+        missing_ids = [record_id for record_id in record_ids if record_id not in found]
+        if not missing_ids:
+            return found
+
+        for instance in loader(missing_ids):
+            values = self._snapshot(instance)
+            key = keys.get(values[pk_key], f"{model.__tablename__}:{values[pk_key]}")
+            self._set_local(key, values)
+            self._set_shared(key, values)
+            found[values[pk_key]] = model(**values)
+
+        return found
+
+    def invalidate(self, model: type, record_id: Any) -> None:
+        """
+        Метод удаления записи из кэша.
+
+        Args:
+            model: Класс модели SQLAlchemy
+            record_id: Номер (первичный ключ) записи
+        """
+        key = f"{model.__tablename__}:{record_id}"
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+        if self.redis_client is not None:
+            try:
+                self.redis_client.delete(self._redis_key(key))
+            except redis.RedisError as e:
+                logging.warning(f"Ошибка удаления записи кэша '{self.namespace}' из Redis: {e}")
+
+    def _redis_key(self, key: str) -> str:
+        """Внутренний метод получения ключа записи в Redis."""
+        return f"sbs_record_cache:{self.namespace}:{key}"
+
+    def _get_local(self, key: str) -> dict[str, Any] | None:
+        """Внутренний метод чтения записи из памяти процесса."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            values, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return values
+
+    def _set_local(self, key: str, values: dict[str, Any]) -> None:
+        """Внутренний метод записи в память процесса с вытеснением давно не использованных записей."""
+        with self._lock:
+            self._entries[key] = (values, time.monotonic() + self.local_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _get_shared(self, key: str) -> dict[str, Any] | None:
+        """Внутренний метод чтения записи из Redis."""
+        if self.redis_client is None:
+            return None
+
+        try:
+            raw = self.redis_client.get(self._redis_key(key))
+            return json.loads(raw) if raw else None
+        except (redis.RedisError, ValueError) as e:
+            logging.warning(f"Ошибка чтения записи кэша '{self.namespace}' из Redis: {e}")
+            return None
+
+    def _get_shared_many(self, keys: list[str]) -> dict[str, dict[str, Any]]:
+        """Внутренний метод чтения нескольких записей из Redis одним запросом."""
+        if self.redis_client is None or not keys:
+            return {}
+
+        try:
+            raw_values = self.redis_client.mget([self._redis_key(key) for key in keys])
+            return {key: json.loads(raw) for key, raw in zip(keys, raw_values) if raw}
+        except (redis.RedisError, ValueError) as e:
+            logging.warning(f"Ошибка чтения записей кэша '{self.namespace}' из Redis: {e}")
+            return {}
+
+    def _set_shared(self, key: str, values: dict[str, Any]) -> None:
+        """Внутренний метод записи в Redis."""
+        if self.redis_client is None:
+            return
+
+        try:
+            self.redis_client.set(self._redis_key(key), json.dumps(values), ex=self.ttl)
+        except (redis.RedisError, TypeError) as e:
+            logging.warning(f"Ошибка записи в кэш '{self.namespace}' Redis: {e}")
+
+    @staticmethod
+    def detach(instance: Any) -> Any:
+        """
+        Метод получения отсоединенной от сессии копии инстанса с нормализованными значениями колонок.
+
+        Используется для записей, читаемых в обход кэша (зеркало ITSM), чтобы ответ не зависел от источника записи.
+
+        Args:
+            instance: Инстанс модели SQLAlchemy
+
+        Returns:
+            Новый инстанс той же модели
+        """
+        return type(instance)(**RecordCache._snapshot(instance))
+
+    @staticmethod
+    def _snapshot(instance: Any) -> dict[str, Any]:
+        """
+        Внутренний метод получения значений колонок инстанса в JSON-совместимом виде.
+
+        Числа Oracle NUMBER (Decimal) приводятся к int/float, чтобы маппинги hybrid-свойств
+        давали тот же результат на восстановленном инстансе.
+        """
+        values = {}
+        for attr in sa_inspect(instance).mapper.column_attrs:
+            value = getattr(instance, attr.key)
+            if isinstance(value, Decimal):
+                value = int(value) if value == value.to_integral_value() else float(value)
+            values[attr.key] = value
+        return values
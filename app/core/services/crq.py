@@ -1,92 +1,113 @@
+import html
 import logging
-import os
-import uuid
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from typing import Any
-from sqlalchemy import func
-from flask import current_app
+from sqlalchemy import and_, any_, bindparam, cast, func, literal_column, or_, Float, String
+from sqlalchemy.dialects.postgresql import ARRAY, JSON, REGCONFIG, aggregate_order_by, insert
+from sqlalchemy.orm import selectinload
 from werkzeug.datastructures import ImmutableMultiDict, FileStorage
 
 from app.core.monitoring.decorators import track_operation
 from app.core.models.crq_attachments import CRQAttachments
 from app.core.models.crq_processed import CRQProcessed
-from app.core.models.crq_raw import CRQSource
-from app.core.models.subscriptions import Subscriptions
+from app.core.models.crq_raw import CRQSource, CRQSourceMirror
 from app.core.models.users import Users
-from app.core.models.partners_emails import PartnersEmails
-from app.core.models.partners_groups import PartnerGroups
-from app.extensions import db, notification_manager
+from app.core.services.partners import PartnersService
+from app.core.services.subscriptions import SubscriptionsService
+from app.core.services.attachment_bundle import AttachmentBundleService
+from app.core.services.attachment_store import AttachmentStore
+from app.core.services.uploads import save_uploaded_file
+from app.extensions import db, notification_manager, calendar_cache, itsm_cache, itsm_mirror, upload_janitor
 from app.core.utils import helpers
 
+BATCH_LOOKUP_MAX_NUMBERS = 500
+# Значения полей формы CRQ, соответствующие расшифрованным полям CRQ ITSM
+ITSM_DIRECTION_VALUES = {"Техническая Дирекция": "ТД", "Информационные технологии": "ДИТ"}
+ITSM_IMPACT_VALUES = {"Без прерывания": "Нет", "С прерыванием": "Да"}
+ITSM_IMPORT_DEFAULT_STATUS = "Новое"
+ITSM_IMPORT_DEFAULT_WORK_TYPE = "Плановые работы"
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+SEARCH_CONFIG = "russian"
+# Маркеры подсветки ts_headline: заменяются на <mark> после экранирования текста CRQ
+HIGHLIGHT_START, HIGHLIGHT_STOP = "\x02", "\x03"
+HEADLINE_OPTIONS = (
+    f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+    "MaxFragments=2, MaxWords=25, MinWords=10, FragmentDelimiter=\" ... \""
+)
+
 
 class CrqService:
     """Класс сервиса обработки операций над плановыми работами."""
 
     @track_operation("calendar-query", "crq")
     @staticmethod
-    def get_calendar_data(service: str = "td", from_date: str = None, to_date: str = None) -> dict[str, Any]:
+    def get_calendar_data(service: str = "td", from_date: str = None, to_date: str = None,
+                          since: int | None = None) -> dict[str, Any]:
         """
         Метод получения списка CRQ по указанным фильтрам.
 
+        Данные загружаются помесячно через кэш календаря. При передаче since возвращаются только CRQ,
+        измененные после указанной версии; если журнал изменений не покрывает эту версию,
+        возвращается полный набор данных.
+
         Args:
             service: Сервис, к которому относятся данные работы - ТД/ДИТ
             from_date: Начальная дата периода
             to_date: Конечная дата периода
+            since: Версия календаря, известная клиенту (опционально)
 
         Returns:
-            Лист плановых работ
+            Лист плановых работ и текущая версия календаря
         """
         try:
             service_value = 'ТД' if service.lower() == 'td' else 'ДИТ'
 
-            crq_list = CRQProcessed.query.filter(
-                func.date(CRQProcessed.start_date).between(
-                    datetime.strptime(from_date, '%Y-%m-%d'), datetime.strptime(to_date, '%Y-%m-%d')
-                ),CRQProcessed.direction == service_value
-            ).all()
+            period_start = datetime.strptime(from_date, '%Y-%m-%d')
+            period_end = datetime.strptime(to_date, '%Y-%m-%d') + timedelta(days=1)
 
-            grouped_crq_list = {}
-            all_dates_set = set()
+            version = calendar_cache.version
 
-            for crq in crq_list:
-                crq_date = crq.start_date.date().isoformat()
-                all_dates_set.add(crq_date)
+            if since is not None:
+                changed_crq_numbers = calendar_cache.changes_since(since)
+                if changed_crq_numbers is not None:
+                    changed_crq_list = []
+                    if changed_crq_numbers:
+                        changed_crq_list = CrqService._query_calendar_items(
+                            CRQProcessed.crq_number.in_(changed_crq_numbers),
+                            CRQProcessed.direction == service_value,
+                            CRQProcessed.start_date >= period_start,
+                            CRQProcessed.start_date < period_end
+                        )
 
-                if crq_date not in grouped_crq_list:
-                    grouped_crq_list[crq_date] = []
+                    found_crq_numbers = {crq_data['crq_number'] for crq_data in changed_crq_list}
 
-                attachment_info = []
-                for attachment in crq.attachments:
-                    attachment_info.append({
-                        'id': attachment.id,
-                        'name': attachment.original_filename
-                    })
+                    return {
+                        'status': 'success',
+                        'mode': 'delta',
+                        'version': version,
+                        'changed': changed_crq_list,
+                        'removed': sorted(set(changed_crq_numbers) - found_crq_numbers)
+                    }
 
-                crq_data = {
-                    'crq_number': crq.crq_number,
-                    'status': crq.status,
-                    'work_type': crq.crq_type,
-                    'service': crq.direction,
-                    'impact': crq.impact_status,
-                    'short_description': crq.short_description,
-                    'detailed_description': crq.detailed_description,
-                    'cause': crq.cause,
-                    'impact_details': crq.impact_details,
-                    'comments': crq.comments,
-                    'start_date': crq.start_date.strftime('%Y-%m-%d %H:%M'),
-                    'end_date': crq.end_date.strftime('%Y-%m-%d %H:%M'),
-                    'sub_name': crq.sub_type,
-                    'initiator': crq.initiator,
-                    'attachment': attachment_info
-                }
+            grouped_crq_list = {}
 
-                grouped_crq_list[crq_date].append(crq_data)
+            for year, month in _iter_months(period_start, period_end):
+                month_crq_list = calendar_cache.get_or_load(
+                    (service_value, year, month),
+                    lambda y=year, m=month: CrqService._load_calendar_month(service_value, y, m)
+                )
 
-            sorted_dates_list = sorted(list(all_dates_set))
+                for crq_data in month_crq_list:
+                    crq_date = crq_data['start_date'][:10]
+                    if period_start.date() <= date.fromisoformat(crq_date) < period_end.date():
+                        grouped_crq_list.setdefault(crq_date, []).append(crq_data)
 
             return {
                 'status': 'success',
-                'dates': sorted_dates_list,
+                'mode': 'full',
+                'version': version,
+                'dates': sorted(grouped_crq_list),
                 'grouped_crq_list': grouped_crq_list
             }
 
@@ -99,13 +120,17 @@ class CrqService:
 
     @track_operation("crq-search", "crq")
     @staticmethod
-    def get_crq_data(crq_number: str, source: str) -> dict[str, Any]:
+    def get_crq_data(crq_number: str, source: str, force_refresh: bool = False) -> dict[str, Any]:
         """
         Метод получения данных о CRQ.
 
+        CRQ из ITSM (source="raw") читаются из локального зеркала, а при его отсутствии или устаревании -
+        из ITSM через кэш запросов.
+
         Args:
             crq_number: Номер CRQ
             source: Тип источника данных
+            force_refresh: Перечитать CRQ из ITSM в обход зеркала и кэша
 
         Returns:
             Словарь с данными CRQ или информацией об ошибке
@@ -123,7 +148,13 @@ class CrqService:
                     "message": f"Неизвестный источник данных: {source}. Доступные: {list(model_mapping.keys())}"
                 }
 
-            crq = model_class.get_by_filter(crq_number=crq_number)
+            if model_class is CRQSource:
+                crq = None if force_refresh else itsm_mirror.get_record(CRQSourceMirror, crq_number)
+                if not crq:
+                    crq = itsm_cache.get_record(CRQSource, crq_number, force_refresh=force_refresh)
+            else:
+                crq = model_class.get_by_filter(crq_number=crq_number)
+
             if not crq:
                 return {
                     "status": "not_found",
@@ -145,6 +176,183 @@ class CrqService:
                 "message": str(e)
             }
 
+    @track_operation("crq-batch-search", "crq")
+    @staticmethod
+    def get_crq_data_batch(crq_numbers: list[str] | str, source: str, force_refresh: bool = False) -> dict[str, Any]:
+        """
+        Метод пакетного получения данных о нескольких CRQ одним запросом к источнику.
+
+        Args:
+            crq_numbers: Список номеров CRQ, либо строка с номерами
+            source: Тип источника данных
+            force_refresh: Перечитать CRQ из ITSM в обход зеркала и кэша
+
+        Returns:
+            Словарь с данными найденных CRQ по номеру и списками найденных/ненайденных номеров
+        """
+        try:
+            if source not in ("processed", "raw"):
+                return {
+                    "status": "rejected",
+                    "message": f"Неизвестный источник данных: {source}. Доступные: ['processed', 'raw']"
+                }
+
+            numbers = helpers.parse_numbers_list(crq_numbers)
+            if not numbers:
+                return {
+                    "status": "rejected",
+                    "message": "Необходимо указать номера CRQ."
+                }
+            if len(numbers) > BATCH_LOOKUP_MAX_NUMBERS:
+                return {
+                    "status": "rejected",
+                    "message": f"Превышено максимальное количество номеров в запросе: {BATCH_LOOKUP_MAX_NUMBERS}."
+                }
+
+            if source == "raw":
+                found = CrqService._load_itsm_crqs(numbers, force_refresh)
+                results = {number: crq.to_dict() for number, crq in found.items()}
+            else:
+                crq_list = db.session.execute(
+                    db.select(CRQProcessed)
+                    .options(selectinload(CRQProcessed.attachments))
+                    .where(CRQProcessed.crq_number.in_(numbers))
+                ).scalars().all()
+                results = {crq.crq_number: crq.to_dict(include_attachments=True) for crq in crq_list}
+
+            return {
+                "status": "success",
+                "source": source,
+                "results": {number: results[number] for number in numbers if number in results},
+                "found": [number for number in numbers if number in results],
+                "not_found": [number for number in numbers if number not in results]
+            }
+        except Exception as e:
+            logging.error(f"Ошибка пакетного поиска CRQ: {e}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
+    @track_operation("crq-text-search", "crq")
+    @staticmethod
+    def search_crq(query: str, service: str | None = None, from_date: str | None = None, to_date: str | None = None,
+                   cursor: str | None = None, limit: int | None = None) -> dict[str, Any]:
+        """
+        Метод полнотекстового поиска по обработанным CRQ.
+
+        Поиск выполняется по поисковому вектору sbs_crq_data (краткое и детальное описание, причина, влияние,
+        комментарии) с русской морфологией и синтаксисом запросов websearch ("кабель -оптика", "фраза в кавычках").
+        Результаты сортируются по релевантности с keyset-пагинацией по (ранг, id); подсветка совпадений
+        вычисляется только для записей текущей страницы.
+
+        Args:
+            query: Поисковый запрос
+            service: Сервис, к которому относятся работы - td/dit (опционально)
+            from_date: Начальная дата периода начала работ в формате YYYY-MM-DD (опционально)
+            to_date: Конечная дата периода начала работ в формате YYYY-MM-DD (опционально)
+            cursor: Курсор следующей страницы из предыдущего ответа
+            limit: Количество CRQ на странице
+
+        Returns:
+            Объект типа словарь со списком найденных CRQ и курсором следующей страницы
+        """
+        try:
+            query = (query or "").strip()
+            if not query:
+                return {
+                    "status": "rejected",
+                    "message": "Необходимо указать поисковый запрос."
+                }
+
+            limit = limit or SEARCH_DEFAULT_LIMIT
+            if not 1 <= limit <= SEARCH_MAX_LIMIT:
+                return {
+                    "status": "rejected",
+                    "message": f"Количество CRQ на странице должно быть от 1 до {SEARCH_MAX_LIMIT}."
+                }
+
+            try:
+                after = helpers.decode_cursor(cursor, ((int, float), int))
+                period_start = datetime.strptime(from_date, '%Y-%m-%d') if from_date else None
+                period_end = datetime.strptime(to_date, '%Y-%m-%d') + timedelta(days=1) if to_date else None
+            except ValueError as e:
+                return {
+                    "status": "rejected",
+                    "message": str(e)
+                }
+
+            ts_query = func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), query)
+            # ts_rank_cd возвращает real: ранг приводится к double precision, чтобы значение из курсора (float)
+            # сравнивалось с ним без потери точности
+            rank = cast(func.ts_rank_cd(CRQProcessed.search_vector, ts_query), Float(53))
+
+            conditions = [CRQProcessed.search_vector.op("@@")(ts_query)]
+            if service:
+                conditions.append(CRQProcessed.direction == ('ТД' if service.lower() == 'td' else 'ДИТ'))
+            if period_start:
+                conditions.append(CRQProcessed.start_date >= period_start)
+            if period_end:
+                conditions.append(CRQProcessed.start_date < period_end)
+            if after:
+                conditions.append(or_(rank < after[0], and_(rank == after[0], CRQProcessed.id < after[1])))
+
+            page = (
+                db.select(CRQProcessed.id, rank.label("rank"))
+                .where(*conditions)
+                .order_by(rank.desc(), CRQProcessed.id.desc())
+                .limit(limit + 1)
+                .subquery()
+            )
+
+            rows = db.session.execute(
+                db.select(
+                    CRQProcessed,
+                    page.c.rank,
+                    func.ts_headline(
+                        cast(SEARCH_CONFIG, REGCONFIG), CRQProcessed.short_description, ts_query,
+                        "HighlightAll=true, " + HEADLINE_OPTIONS
+                    ).label("title_headline"),
+                    func.ts_headline(
+                        cast(SEARCH_CONFIG, REGCONFIG),
+                        func.concat_ws(
+                            " ", CRQProcessed.detailed_description, CRQProcessed.cause,
+                            CRQProcessed.impact_details, CRQProcessed.comments
+                        ),
+                        ts_query,
+                        HEADLINE_OPTIONS
+                    ).label("text_headline")
+                )
+                .join(page, page.c.id == CRQProcessed.id)
+                .order_by(page.c.rank.desc(), CRQProcessed.id.desc())
+            ).all()
+
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+
+            items = []
+            for row in rows:
+                item = row.CRQProcessed.to_dict(include_attachments=False)
+                item["rank"] = row.rank
+                item["highlights"] = {
+                    "short_description": _format_headline(row.title_headline),
+                    "text": _format_headline(row.text_headline)
+                }
+                items.append(item)
+
+            return {
+                "status": "success",
+                "items": items,
+                "next_cursor": helpers.encode_cursor([rows[-1].rank, rows[-1].CRQProcessed.id]) if has_more else None,
+                "limit": limit
+            }
+        except Exception as e:
+            logging.error(f"Ошибка полнотекстового поиска CRQ: {e}")
+            return {
+                "status": "error",
+                "message": "Ошибка полнотекстового поиска CRQ."
+            }
+
     @track_operation("crq-create", "crq")
     @staticmethod
     def add_crq_with_files(incoming_crq_data: dict[str, Any],
@@ -204,6 +412,8 @@ class CrqService:
                 CrqService._link_existing_files_without_commit(crq.id, file_ids)
 
             db.session.commit()
+            calendar_cache.invalidate([crq.crq_number])
+            AttachmentBundleService.schedule_build(crq.id)
 
             return {
                 "status": "success",
@@ -222,6 +432,111 @@ class CrqService:
                 "message": str(e)
             }
 
+    @track_operation("crq-itsm-import", "crq")
+    @staticmethod
+    def import_from_itsm(crq_numbers: list[str] | str,
+                         incoming_crq_data: dict[str, Any] | None = None) -> dict[str, Any]:
+        """
+        Метод создания CRQ по данным ITSM без передачи полей CRQ через браузер.
+
+        Поля CRQ (дирекция, влияние, даты, описания, инициатор, причина) переносятся из CRQ ITSM (зеркало,
+        либо ITSM через кэш запросов); поля, которых нет в ITSM (статус, тематики рассылки, тип работ, комментарий),
+        берутся из формы или заполняются значениями по умолчанию. Все CRQ создаются одним запросом в одной транзакции,
+        уже существующие CRQ пропускаются. CRQ, дирекция или влияние которых не соответствуют значениям формы
+        (например, дирекция B2C), не создаются и возвращаются в списке отклоненных.
+
+        Args:
+            crq_numbers: Список номеров CRQ, либо строка с номерами
+            incoming_crq_data: Поля формы CRQ для всех создаваемых CRQ (crq_status, sub_names, crq_work_type,
+                crq_comment) (опционально)
+
+        Returns:
+            Объект типа словарь с созданными CRQ, списками уже существующих и не найденных в ITSM номеров
+            и ошибками отклоненных CRQ
+        """
+        try:
+            numbers = helpers.parse_numbers_list(crq_numbers)
+            if not numbers:
+                return {
+                    "status": "rejected",
+                    "message": "Необходимо указать номера CRQ."
+                }
+            if len(numbers) > BATCH_LOOKUP_MAX_NUMBERS:
+                return {
+                    "status": "rejected",
+                    "message": f"Превышено максимальное количество номеров в запросе: {BATCH_LOOKUP_MAX_NUMBERS}."
+                }
+
+            incoming_crq_data = incoming_crq_data or {}
+            sent_date = datetime.now()
+            found = CrqService._load_itsm_crqs(numbers)
+
+            rows = []
+            rejected = []
+            for number in numbers:
+                if number not in found:
+                    continue
+
+                errors = []
+                if found[number].direction not in ITSM_DIRECTION_VALUES:
+                    errors.append(f"Дирекция ITSM \"{found[number].direction}\" не соответствует ТД/ДИТ.")
+                if found[number].impact_status not in ITSM_IMPACT_VALUES:
+                    errors.append(f"Влияние ITSM \"{found[number].impact_status}\" не соответствует Да/Нет.")
+                if errors:
+                    rejected.append({"crq_number": number, "errors": errors})
+                    continue
+
+                row = CrqService._map_itsm_crq(found[number], incoming_crq_data, sent_date)
+                # Одно слишком длинное значение прервало бы вставку всех CRQ пакета
+                for attribute, value in row.items():
+                    column_type = CRQProcessed.__mapper__.columns[attribute].type
+                    if isinstance(column_type, String) and column_type.length and isinstance(value, str) \
+                            and len(value) > column_type.length:
+                        errors.append(f"Поле {attribute} длиннее {column_type.length} символов.")
+                if errors:
+                    rejected.append({"crq_number": number, "errors": errors})
+                    continue
+
+                rows.append(row)
+
+            created = []
+            if rows:
+                created = db.session.scalars(
+                    insert(CRQProcessed)
+                    .on_conflict_do_nothing(index_elements=[CRQProcessed.crq_number])
+                    .returning(CRQProcessed),
+                    rows
+                ).all()
+
+            # Сериализация до коммита: коммит сбрасывает состояние инстансов, и чтение каждого вызвало бы SELECT
+            created_crq_list = [crq.to_dict(include_attachments=False) for crq in created]
+            created_numbers = {crq_data["crq_number"] for crq_data in created_crq_list}
+            if rows:
+                db.session.commit()
+
+            staged_numbers = {row["crq_number"] for row in rows}
+            if created_numbers:
+                calendar_cache.invalidate(list(created_numbers))
+
+            return {
+                "status": "success",
+                "data": {
+                    "created": created_crq_list,
+                    "existing": [number for number in numbers
+                                 if number in staged_numbers and number not in created_numbers],
+                    "not_found": [number for number in numbers if number not in found],
+                    "rejected": rejected
+                }
+            }
+
+        except Exception as e:
+            logging.error(f"Ошибка создания CRQ по данным ITSM: {e}")
+            db.session.rollback()
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
     @track_operation("crq-update", "crq")
     @staticmethod
     def update_crq(crq_number: str, incoming_crq_data: dict[str, Any],
@@ -302,6 +617,8 @@ class CrqService:
                 uploaded_files = CrqService._process_files_without_commit(existing_crq.id, files)
 
             db.session.commit()
+            calendar_cache.invalidate([existing_crq.crq_number])
+            AttachmentBundleService.schedule_build(existing_crq.id)
 
             return {
                 "status": "success",
@@ -343,6 +660,8 @@ class CrqService:
 
             uploaded_files = CrqService._process_files_without_commit(crq.id, files)
             db.session.commit()
+            calendar_cache.invalidate([crq.crq_number])
+            AttachmentBundleService.schedule_build(crq.id)
 
             return {
                 "status": "success",
@@ -376,21 +695,18 @@ class CrqService:
                     "message": "Отсутствуют файлы для загрузки."
                 }
 
-            upload_folder = current_app.config["UPLOAD_FOLDER"]
             uploaded_files = []
 
             for file in files.getlist('files'):
-                original_filename = file.filename
-                _, extension = os.path.splitext(original_filename)
-                encoded_filename = f"{uuid.uuid4()}{extension}"
-                file_path = os.path.join(upload_folder, encoded_filename)
-                file.save(file_path)
+                encoded_filename, content_hash, file_size = save_uploaded_file(file)
 
                 saved_file = CRQAttachments.create(
                     crq_number=None,
-                    original_filename=original_filename,
+                    original_filename=file.filename,
                     encoded_filename=encoded_filename,
-                    upload_date=datetime.now()
+                    upload_date=datetime.now(),
+                    content_hash=content_hash,
+                    file_size=file_size
                 )
                 uploaded_files.append(saved_file.to_dict())
 
@@ -409,6 +725,44 @@ class CrqService:
                 "message": str(e)
             }
 
+    @track_operation("file-download", "crq")
+    @staticmethod
+    def download_file(file_id: int) -> dict[str, Any]:
+        """
+        Метод получения файла вложения для скачивания.
+
+        Args:
+            file_id: ID файла
+
+        Returns:
+            Объект типа словарь с ответом на HTTP-запрос, содержащим файл
+        """
+        try:
+            file_obj = CRQAttachments.get_by_id(file_id)
+            if not file_obj:
+                return {
+                    "status": "not_found",
+                    "message": "Файл не найден."
+                }
+
+            return {
+                "status": "success",
+                "response": AttachmentStore.send(file_obj)
+            }
+
+        except FileNotFoundError:
+            logging.error(f"Файл вложения {file_id} отсутствует в хранилище")
+            return {
+                "status": "not_found",
+                "message": "Файл отсутствует в хранилище."
+            }
+        except Exception as e:
+            logging.error(f"Ошибка получения файла: {e}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
     @track_operation("file-delete", "crq")
     @staticmethod
     def delete_file(file_id: int) -> dict[str, Any]:
@@ -429,14 +783,16 @@ class CrqService:
                     "message": "Файл не найден."
                 }
 
-            upload_folder = current_app.config["UPLOAD_FOLDER"]
-            file_path = os.path.join(upload_folder, file_obj.encoded_filename)
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            linked_crq_number = file_obj.crq.crq_number if file_obj.crq else None
+            encoded_filename = file_obj.encoded_filename
 
             CRQAttachments.delete(file_obj)
+            AttachmentStore.release_after_commit({encoded_filename})
             db.session.commit()
 
+            if linked_crq_number:
+                calendar_cache.invalidate([linked_crq_number])
+
             return {
                 "status": "success",
                 "message": "Файл удален"
@@ -453,29 +809,15 @@ class CrqService:
     @track_operation("files-delete-temp", "crq")
     @staticmethod
     def cleanup_temporary_files() -> None:
-        """Метод очистки временных файлов (файлы без привязки к CRQ старше определенного времени)"""
-        try:
-            from datetime import timedelta
-
-            cutoff_time = datetime.now() - timedelta(hours=24)
-
-            temp_files = CRQAttachments.query.filter(
-                CRQAttachments.crq_number.is_(None),
-                CRQAttachments.upload_date < cutoff_time
-            ).all()
-
-            upload_folder = current_app.config["UPLOAD_FOLDER"]
-
-            for file_obj in temp_files:
-                file_path = os.path.join(upload_folder, file_obj.encoded_filename)
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-
-                db.session.delete(file_obj)
-
-            db.session.commit()
-            logging.info(f"Очищено {len(temp_files)} временных файлов")
+        """
+        Метод внеочередной очистки временных файлов (файлы без привязки к CRQ старше UPLOAD_TEMP_TTL),
+        файлов без ссылок и истекших незавершенных загрузок.
 
+        Очистка выполняется так же, как фоновая (пакетами, под распределенной блокировкой);
+        если фоновая очистка уже выполняется другим процессом, повторно она не запускается.
+        """
+        try:
+            upload_janitor.run()
         except Exception as e:
             logging.error(f"Ошибка очистки временных файлов: {e}")
             db.session.rollback()
@@ -587,17 +929,13 @@ class CrqService:
                         "email_template_path": prepared_template_data.get("template"),
                     })
             else:
-                partner_group = PartnerGroups.get_by_filter(partner_group_name=prepared_crq_data.get("partnerGroup"))
-                if not partner_group:
+                users = PartnersService.get_group_recipients(prepared_crq_data.get("partnerGroup"))
+                if users is None:
                     return {
                         "status": "not_found",
                         "message": "Группа не найдена."
                     }
 
-                users = PartnersEmails.get_all_by_filter_ordered(
-                    'partner_email', 'asc',
-                    partner_group_id=partner_group.partner_group_id
-                )
                 if not users:
                     return {
                         "status": "not_found",
@@ -636,6 +974,165 @@ class CrqService:
                 "message": f"Ошибка постановки задачи в очередь: {e}"
             }
 
+    @staticmethod
+    def _load_calendar_month(service_value: str, year: int, month: int) -> list[dict[str, Any]]:
+        """
+        Внутренний метод загрузки CRQ календаря за один месяц.
+
+        Args:
+            service_value: Значение поля service (ТД/ДИТ)
+            year: Год
+            month: Месяц
+
+        Returns:
+            Лист CRQ в формате календаря, отсортированный по дате начала
+        """
+        month_start = datetime(year, month, 1)
+        month_end = datetime(year + month // 12, month % 12 + 1, 1)
+
+        return CrqService._query_calendar_items(
+            CRQProcessed.direction == service_value,
+            CRQProcessed.start_date >= month_start,
+            CRQProcessed.start_date < month_end
+        )
+
+    @staticmethod
+    def _query_calendar_items(*conditions: Any) -> list[dict[str, Any]]:
+        """
+        Внутренний метод выборки CRQ в формате календаря одним запросом.
+
+        Выбираются только отображаемые колонки, вложения агрегируются в JSON подзапросом.
+
+        Args:
+            conditions: Условия фильтрации выборки
+
+        Returns:
+            Лист CRQ в формате календаря, отсортированный по дате начала
+        """
+        attachments_subquery = (
+            db.select(
+                func.coalesce(
+                    func.json_agg(aggregate_order_by(
+                        func.json_build_object(
+                            literal_column("'id'"), CRQAttachments.id,
+                            literal_column("'name'"), CRQAttachments.original_filename
+                        ),
+                        CRQAttachments.id
+                    )),
+                    literal_column("'[]'::json"),
+                    type_=JSON
+                )
+            )
+            .where(CRQAttachments.crq_number == CRQProcessed.id)
+            .correlate(CRQProcessed)
+            .scalar_subquery()
+        )
+
+        crq_list = db.session.execute(
+            db.select(
+                CRQProcessed.crq_number,
+                CRQProcessed.status,
+                CRQProcessed.crq_type,
+                CRQProcessed.direction,
+                CRQProcessed.impact_status,
+                CRQProcessed.short_description,
+                CRQProcessed.detailed_description,
+                CRQProcessed.cause,
+                CRQProcessed.impact_details,
+                CRQProcessed.comments,
+                CRQProcessed.start_date,
+                CRQProcessed.end_date,
+                CRQProcessed.sub_type,
+                CRQProcessed.initiator,
+                attachments_subquery.label("attachments")
+            )
+            .where(*conditions)
+            .order_by(CRQProcessed.start_date.asc())
+        ).all()
+
+        return [
+            {
+                'crq_number': crq.crq_number,
+                'status': crq.status,
+                'work_type': crq.crq_type,
+                'service': crq.direction,
+                'impact': crq.impact_status,
+                'short_description': crq.short_description,
+                'detailed_description': crq.detailed_description,
+                'cause': crq.cause,
+                'impact_details': crq.impact_details,
+                'comments': crq.comments,
+                'start_date': crq.start_date.strftime('%Y-%m-%d %H:%M'),
+                'end_date': crq.end_date.strftime('%Y-%m-%d %H:%M'),
+                'sub_name': crq.sub_type,
+                'initiator': crq.initiator,
+                'attachment': crq.attachments
+            } for crq in crq_list
+        ]
+
+    @staticmethod
+    def _load_itsm_crqs(numbers: list[str], force_refresh: bool = False) -> dict[str, Any]:
+        """
+        Внутренний метод пакетного получения CRQ ITSM: из локального зеркала, а недостающих - из ITSM через кэш.
+
+        Args:
+            numbers: Номера CRQ
+            force_refresh: Перечитать CRQ из ITSM в обход зеркала и кэша
+
+        Returns:
+            Словарь найденных CRQ по номеру
+        """
+        found = {} if force_refresh else itsm_mirror.get_records(CRQSourceMirror, numbers)
+        found |= itsm_cache.get_records(
+            CRQSource,
+            [number for number in numbers if number not in found],
+            loader=lambda missing: db.session.execute(
+                db.select(CRQSource).where(CRQSource.crq_number.in_(missing))
+            ).scalars().all(),
+            force_refresh=force_refresh
+        )
+
+        return found
+
+    @staticmethod
+    def _map_itsm_crq(crq: Any, incoming_crq_data: dict[str, Any], sent_date: datetime) -> dict[str, Any]:
+        """
+        Внутренний метод преобразования CRQ ITSM в поля CRQProcessed (так же, как их заполняет форма нового CRQ).
+
+        Args:
+            crq: CRQ ITSM в виде инстанса модели CRQSource/CRQSourceMirror
+            incoming_crq_data: Поля формы CRQ, отсутствующие в ITSM
+            sent_date: Дата создания CRQ
+
+        Returns:
+            Словарь значений атрибутов CRQProcessed
+        """
+        impact_parts = []
+        if crq.it_impact_on_user_details:
+            impact_parts.append(f"Влияние на пользователей: {crq.it_impact_on_user_details}")
+        if crq.it_impact_on_client_details:
+            impact_parts.append(f"Влияние на клиентов: {crq.it_impact_on_client_details}")
+        if crq.td_impact_on_service_details:
+            impact_parts.append(f"Влияние ТД: {crq.td_impact_on_service_details}")
+
+        return {
+            "crq_number": crq.crq_number,
+            "direction": ITSM_DIRECTION_VALUES[crq.direction],
+            "impact_status": ITSM_IMPACT_VALUES[crq.impact_status],
+            "impact_details": "\n\n".join(impact_parts) if impact_parts else None,
+            "start_date": crq.start_date,
+            "end_date": crq.end_date,
+            "short_description": crq.short_description,
+            "detailed_description": crq.detailed_description,
+            "initiator": crq.initiator,
+            "status": incoming_crq_data.get("crq_status") or ITSM_IMPORT_DEFAULT_STATUS,
+            "sub_type": incoming_crq_data.get("sub_names") or "",
+            "cause": crq.cause,
+            "sent_date": sent_date,
+            "comments": incoming_crq_data.get("crq_comment", ""),
+            "crq_type": incoming_crq_data.get("crq_work_type") or ITSM_IMPORT_DEFAULT_WORK_TYPE
+        }
+
     @staticmethod
     def _process_files_without_commit(crq_id: int, files: ImmutableMultiDict[str, FileStorage]) -> list[dict[str, Any]]:
         """
@@ -648,21 +1145,18 @@ class CrqService:
         Returns:
             Список обработанных файлов в виде словарей
         """
-        upload_folder = current_app.config["UPLOAD_FOLDER"]
         uploaded_files = []
 
         for file in files.getlist('files'):
-            original_filename = file.filename
-            _, extension = os.path.splitext(original_filename)
-            encoded_filename = f"{uuid.uuid4()}{extension}"
-            file_path = os.path.join(upload_folder, encoded_filename)
-            file.save(file_path)
+            encoded_filename, content_hash, file_size = save_uploaded_file(file)
 
             attachment = CRQAttachments(
                 crq_number=crq_id,
-                original_filename=original_filename,
+                original_filename=file.filename,
                 encoded_filename=encoded_filename,
-                upload_date=datetime.now()
+                upload_date=datetime.now(),
+                content_hash=content_hash,
+                file_size=file_size
             )
             db.session.add(attachment)
             db.session.flush()
@@ -674,39 +1168,45 @@ class CrqService:
     @staticmethod
     def _link_existing_files_without_commit(crq_id: int, file_ids: list[int]) -> None:
         """
-        Привязывает существующие временные файлы к CRQ без коммита
+        Привязывает существующие временные файлы к CRQ без коммита (одним запросом)
 
         Args:
             crq_id: ID созданного CRQ
             file_ids: Список ID файлов для привязки
         """
-        for file_id in file_ids:
-            file_obj = CRQAttachments.get_by_id(file_id)
-            if file_obj and file_obj.crq_number is None:
-                file_obj.crq_number = crq_id
-                db.session.add(file_obj)
+        if not file_ids:
+            return
+
+        db.session.execute(
+            db.update(CRQAttachments)
+            .where(
+                CRQAttachments.id == any_(bindparam("file_ids", list(file_ids), type_=ARRAY(db.Integer))),
+                CRQAttachments.crq_number.is_(None)
+            )
+            .values(crq_number=crq_id)
+        )
 
     @staticmethod
     def _delete_files_without_commit(file_ids: set[int]) -> None:
         """
-        Внутренний метод удаления файлов без коммита.
+        Внутренний метод удаления файлов без коммита (одним запросом).
+
+        Файлы удаляются из хранилища в фоне после коммита транзакции и только если на них не ссылаются
+        другие вложения; при откате транзакции файлы не затрагиваются.
 
         Args:
             file_ids: Множество ID файлов для удаления
         """
-        upload_folder = current_app.config["UPLOAD_FOLDER"]
+        if not file_ids:
+            return
 
-        for file_id in file_ids:
-            file_obj = CRQAttachments.get_by_id(file_id)
-            if file_obj:
-                file_path = os.path.join(upload_folder, file_obj.encoded_filename)
-                if os.path.exists(file_path):
-                    try:
-                        os.remove(file_path)
-                    except OSError as e:
-                        logging.warning(f"Не удалось удалить файл {file_path}: {e}")
+        encoded_filenames = db.session.execute(
+            db.delete(CRQAttachments)
+            .where(CRQAttachments.id == any_(bindparam("file_ids", list(file_ids), type_=ARRAY(db.Integer))))
+            .returning(CRQAttachments.encoded_filename)
+        ).scalars().all()
 
-                db.session.delete(file_obj)
+        AttachmentStore.release_after_commit(set(encoded_filenames))
 
     @staticmethod
     def _get_receivers_list(selected_subs: list[str]) -> list[Users]:
@@ -720,16 +1220,14 @@ class CrqService:
             Лист получателей рассылки, или пустой лист в случае ошибки
         """
         try:
-            selected_subs_data = Subscriptions.query.filter(
-                Subscriptions.sub_name.in_(selected_subs)
-            ).all()
+            selected_subs_ids = [
+                str(sub_id) for sub_id in SubscriptionsService.get_catalog().ids_for_names(selected_subs)
+            ]
 
-            if not selected_subs_data:
+            if not selected_subs_ids:
                 logging.warning(f"Отсутствующие подписки: {selected_subs}")
                 return []
 
-            selected_subs_ids = [str(sub.sub_id) for sub in selected_subs_data]
-
             from sqlalchemy import text
 
             users = Users.query.filter(
@@ -739,4 +1237,42 @@ class CrqService:
             return users
 
         except Exception as e:
-            raise Exception(f"Ошибка получения списка получателей: {e}")
\ No newline at end of file
+            raise Exception(f"Ошибка получения списка получателей: {e}")
+
+
+def _iter_months(period_start: datetime, period_end: datetime) -> list[tuple[int, int]]:
+    """
+    Метод получения списка месяцев, пересекающихся с периодом.
+
+    Args:
+        period_start: Начало периода (включительно)
+        period_end: Конец периода (не включительно)
+
+    Returns:
+        Лист пар (год, месяц)
+    """
+    months = []
+    year, month = period_start.year, period_start.month
+
+    while datetime(year, month, 1) < period_end:
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    return months
+
+def _format_headline(headline: str | None) -> str | None:
+    """
+    Метод преобразования фрагмента ts_headline в безопасный HTML.
+
+    Текст CRQ экранируется, а маркеры совпадений заменяются на тег <mark>.
+
+    Args:
+        headline: Фрагмент текста с маркерами совпадений
+
+    Returns:
+        Фрагмент в виде HTML, или None если фрагмент отсутствует
+    """
+    if headline is None:
+        return None
+
+    return html.escape(headline).replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
@@ -0,0 +1,393 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Any, BinaryIO, Iterator
+
+from sqlalchemy import DateTime, String, text
+
+from app.core.models.crq_processed import CRQProcessed
+from app.core.monitoring.decorators import track_operation
+from app.extensions import db, calendar_cache
+
+IMPORT_STAGING_TABLE = "sbs_crq_import"
+IMPORT_DATETIME_FORMATS = ("%d.%m.%Y %H:%M", "%d.%m.%Y %H:%M:%S", "%d.%m.%Y")
+IMPORT_CONFLICT_MODES = ("skip", "update")
+
+# Имена полей формы создания CRQ (/crq/api/create), принимаемые наравне с именами атрибутов модели
+IMPORT_FIELD_ALIASES = {
+    "crq_number": "crq_number",
+    "crq_direction": "direction",
+    "crq_impact": "impact_status",
+    "crq_impact_details": "impact_details",
+    "crq_start_date": "start_date",
+    "crq_end_date": "end_date",
+    "crq_short_description": "short_description",
+    "crq_detailed_description": "detailed_description",
+    "crq_initiator_name": "initiator",
+    "crq_status": "status",
+    "sub_names": "sub_type",
+    "crq_cause": "cause",
+    "crq_comment": "comments",
+    "crq_work_type": "crq_type"
+}
+
+# Поля, заполняемые импортом, а не файлом
+IMPORT_GENERATED_FIELDS = ("sent_date",)
+IMPORT_OPTIONAL_FIELDS = ("impact_details", "comments")
+
+
+class CrqImportService:
+    """
+    Класс сервиса массового импорта CRQ из CSV/JSON.
+
+    Файл читается построчно: каждая строка проверяется по метаданным модели CRQProcessed (обязательность, длина,
+    формат даты) и сразу передается в Postgres через COPY во временную таблицу; в памяти хранятся только номера
+    принятых CRQ и ошибки отклоненных строк. Затем CRQ переносятся в sbs_crq_data одним
+    INSERT ... SELECT ... ON CONFLICT (crq_number): существующие CRQ пропускаются, либо обновляются.
+    Вычисляемый поисковый вектор (search_vector) не загружается - его заполняет Postgres.
+    """
+
+    @track_operation("crq-import", "crq")
+    @staticmethod
+    def import_crqs(stream: BinaryIO, file_format: str, on_conflict: str = "skip") -> dict[str, Any]:
+        """
+        Метод импорта CRQ.
+
+        Args:
+            stream: Поток файла импорта (UTF-8)
+            file_format: Формат файла - csv/json (JSON-массив объектов, либо JSON Lines)
+            on_conflict: Действие для существующих CRQ - skip (пропустить)/update (обновить)
+
+        Returns:
+            Объект типа словарь с количеством обработанных, добавленных, обновленных и пропущенных CRQ
+            и ошибками по строкам
+        """
+        if file_format not in ("csv", "json"):
+            return {
+                "status": "rejected",
+                "message": "Поддерживаются только форматы CSV и JSON."
+            }
+        if on_conflict not in IMPORT_CONFLICT_MODES:
+            return {
+                "status": "rejected",
+                "message": "Действие для существующих CRQ должно быть skip или update."
+            }
+
+        columns = _import_columns()
+        sent_date = datetime.now()
+        staged: dict[str, int] = {}
+        rejected: list[dict[str, Any]] = []
+        total = 0
+
+        try:
+            db.session.execute(text(
+                f"CREATE TEMP TABLE {IMPORT_STAGING_TABLE} ON COMMIT DROP AS "
+                f"SELECT 0 AS line, {', '.join(column.name for column in columns)} "
+                f"FROM {CRQProcessed.__table__.fullname} WITH NO DATA"
+            ))
+
+            driver_connection = db.session.connection().connection.driver_connection
+            with driver_connection.cursor() as cursor:
+                copy_sql = (f"COPY {IMPORT_STAGING_TABLE} (line, {', '.join(column.name for column in columns)}) "
+                            f"FROM STDIN")
+                with cursor.copy(copy_sql) as copy:
+                    for line, record in _read_records(stream, file_format):
+                        total += 1
+                        values, errors = _validate_record(record, columns, sent_date)
+
+                        crq_number = values.get("crq_number")
+                        if not errors and crq_number in staged:
+                            errors.append(f"CRQ повторяется в файле (строка {staged[crq_number]}).")
+                        if errors:
+                            rejected.append({"line": line, "crq_number": crq_number, "errors": errors})
+                            continue
+
+                        staged[crq_number] = line
+                        copy.write_row([line] + [values[column.name] for column in columns])
+
+            inserted, updated = CrqImportService._merge_staged(columns, on_conflict)
+            db.session.commit()
+
+        except (ValueError, csv.Error) as e:
+            db.session.rollback()
+            return {
+                "status": "rejected",
+                "message": f"Не удалось прочитать файл импорта: {e}"
+            }
+        except Exception as e:
+            logging.error(f"Ошибка импорта CRQ: {e}")
+            db.session.rollback()
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
+        skipped = sorted(set(staged) - set(inserted) - set(updated), key=staged.get)
+        for crq_number in skipped:
+            rejected.append({
+                "line": staged[crq_number],
+                "crq_number": crq_number,
+                "errors": ["CRQ с таким ID уже существует в базе данных."]
+            })
+        rejected.sort(key=lambda reject: reject["line"])
+
+        if inserted or updated:
+            calendar_cache.invalidate(inserted + updated)
+
+        logging.info(f"Импорт CRQ: строк - {total}, добавлено - {len(inserted)}, обновлено - {len(updated)}, "
+                     f"отклонено - {len(rejected)}")
+
+        return {
+            "status": "success",
+            "data": {
+                "total": total,
+                "inserted": len(inserted),
+                "updated": len(updated),
+                "rejected": rejected
+            }
+        }
+
+    @staticmethod
+    def _merge_staged(columns: list[Any], on_conflict: str) -> tuple[list[str], list[str]]:
+        """
+        Внутренний метод переноса CRQ из временной таблицы в sbs_crq_data.
+
+        Args:
+            columns: Загружаемые колонки sbs_crq_data
+            on_conflict: Действие для существующих CRQ - skip/update
+
+        Returns:
+            Номера добавленных и обновленных CRQ
+        """
+        column_list = ", ".join(column.name for column in columns)
+
+        if on_conflict == "update":
+            assignments = ", ".join(
+                f"{column.name} = EXCLUDED.{column.name}"
+                for column in columns if column.name not in ("crq_number", "sent_date")
+            )
+            conflict_clause = f"ON CONFLICT (crq_number) DO UPDATE SET {assignments}"
+        else:
+            conflict_clause = "ON CONFLICT (crq_number) DO NOTHING"
+
+        # xmax = 0 только у вставленных строк, у обновленных в нем ID текущей транзакции
+        rows = db.session.execute(text(
+            f"INSERT INTO {CRQProcessed.__table__.fullname} ({column_list}) "
+            f"SELECT {column_list} FROM {IMPORT_STAGING_TABLE} ORDER BY line "
+            f"{conflict_clause} "
+            f"RETURNING crq_number, (xmax = 0) AS inserted"
+        )).all()
+
+        inserted = [row.crq_number for row in rows if row.inserted]
+        updated = [row.crq_number for row in rows if not row.inserted]
+
+        return inserted, updated
+
+
+def _import_columns() -> list[Any]:
+    """
+    Метод получения загружаемых колонок sbs_crq_data (без ID и вычисляемых колонок).
+
+    Returns:
+        Лист колонок таблицы
+    """
+    return [
+        column for column in CRQProcessed.__table__.columns
+        if column.name != "id" and column.computed is None
+    ]
+
+
+def _read_records(stream: BinaryIO, file_format: str) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Метод построчного чтения записей файла импорта.
+
+    Args:
+        stream: Поток файла импорта
+        file_format: Формат файла - csv/json
+
+    Returns:
+        Итератор пар (номер строки/записи, запись); вместо нераспознанной строки JSON Lines - ошибка ее разбора
+
+    Raises:
+        ValueError: Файл не соответствует формату
+    """
+    reader = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if file_format == "csv":
+        sample = reader.read(4096)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        rows = csv.DictReader(_chain_sample(sample, reader), dialect=dialect)
+        for row in rows:
+            yield rows.line_num, row
+        return
+
+    first_char = reader.read(1)
+    while first_char and first_char.isspace():
+        first_char = reader.read(1)
+
+    if first_char == "[":
+        # JSON-массив разбирается целиком: для построчной обработки используется формат JSON Lines
+        records = json.loads(first_char + reader.read())
+        if not isinstance(records, list):
+            raise ValueError("Ожидается массив объектов.")
+        for index, record in enumerate(records, start=1):
+            yield index, record
+        return
+
+    for line_number, line in enumerate(_chain_sample(first_char, reader), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, e
+
+
+def _chain_sample(sample: str, reader: io.TextIOWrapper) -> Iterator[str]:
+    """
+    Метод построчного чтения потока с уже прочитанным началом.
+
+    Args:
+        sample: Прочитанное начало потока
+        reader: Текстовый поток
+
+    Returns:
+        Итератор строк
+    """
+    rest = reader.readline()
+    yield from io.StringIO(sample + rest)
+    yield from reader
+
+
+def _validate_record(record: Any, columns: list[Any], sent_date: datetime) -> tuple[dict[str, Any], list[str]]:
+    """
+    Метод проверки и нормализации записи импорта по метаданным колонок sbs_crq_data.
+
+    Args:
+        record: Запись файла импорта
+        columns: Загружаемые колонки sbs_crq_data
+        sent_date: Дата импорта
+
+    Returns:
+        Значения колонок и лист ошибок
+    """
+    if isinstance(record, json.JSONDecodeError):
+        return {}, [f"Некорректный JSON: {record.msg} (позиция {record.pos})."]
+    if not isinstance(record, dict):
+        return {}, ["Запись должна быть объектом."]
+
+    attributes = {column.key: attribute for attribute, column in CRQProcessed.__mapper__.columns.items()}
+    values: dict[str, Any] = {}
+    errors: list[str] = []
+
+    fields = {}
+    for key, value in record.items():
+        if key is None:
+            continue
+        key = key.strip()
+        attribute = IMPORT_FIELD_ALIASES.get(key, key)
+        fields[attribute if attribute in attributes.values() else key] = value
+
+    for column in columns:
+        attribute = attributes[column.key]
+        if attribute in IMPORT_GENERATED_FIELDS:
+            values[column.name] = sent_date
+            continue
+
+        value = fields.get(attribute, fields.get(column.name))
+        if attribute == "sub_type":
+            value = _format_subscriptions(value)
+        if isinstance(value, str):
+            value = value.strip()
+
+        if value is None or value == "":
+            if attribute in IMPORT_OPTIONAL_FIELDS or column.nullable:
+                values[column.name] = "" if not column.nullable else None
+                continue
+            errors.append(f"Не заполнено поле {attribute}.")
+            continue
+
+        if isinstance(column.type, DateTime):
+            parsed = _parse_datetime(value)
+            if parsed is None:
+                errors.append(f"Поле {attribute} содержит некорректную дату: {value}.")
+                continue
+            value = parsed
+        else:
+            value = str(value)
+            if isinstance(column.type, String) and column.type.length and len(value) > column.type.length:
+                errors.append(f"Поле {attribute} длиннее {column.type.length} символов.")
+                continue
+
+        values[column.name] = value
+
+    start_date, end_date = values.get("start_date"), values.get("end_date")
+    if isinstance(start_date, datetime) and isinstance(end_date, datetime) and end_date < start_date:
+        errors.append("Дата окончания раньше даты начала.")
+
+    return values, errors
+
+
+def _parse_datetime(value: Any) -> datetime | None:
+    """
+    Метод разбора даты импорта (ISO 8601, либо ДД.ММ.ГГГГ ЧЧ:ММ).
+
+    Даты с часовым поясом переводятся в локальное время сервера, в котором хранятся даты CRQ.
+
+    Args:
+        value: Значение поля
+
+    Returns:
+        Дата, или None если значение не является датой
+    """
+    if isinstance(value, datetime):
+        return value
+
+    try:
+        parsed = datetime.fromisoformat(str(value))
+        return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+    except ValueError:
+        pass
+
+    for date_format in IMPORT_DATETIME_FORMATS:
+        try:
+            return datetime.strptime(str(value), date_format)
+        except ValueError:
+            continue
+
+    return None
+
+
+def _format_subscriptions(value: Any) -> Any:
+    """
+    Метод приведения тематик рассылки к формату, в котором их сохраняет форма CRQ ({тематика1,тематика2}).
+
+    Args:
+        value: Лист тематик, строка тематик через ";", либо строка в формате массива Postgres
+
+    Returns:
+        Строка в формате массива Postgres
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        if not value or value.startswith("{"):
+            return value
+        value = value.split(";")
+
+    if not isinstance(value, list):
+        return value
+
+    items = []
+    for item in (str(item).strip() for item in value):
+        if not item:
+            continue
+        if any(char in item for char in ' ,{}"\\') or item.upper() == "NULL":
+            item = '"' + item.replace("\\", "\\\\").replace('"', '\\"') + '"'
+        items.append(item)
+
+    return "{" + ",".join(items) + "}" if items else ""
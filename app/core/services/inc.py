@@ -1,13 +1,20 @@
 import logging
 import json
+from datetime import datetime
 from typing import Any
+from sqlalchemy import and_, or_, text
 
 from app.core.monitoring.decorators import track_operation
-from app.core.models.inc_raw import Incidents
-from app.core.models.subscriptions import Subscriptions
+from app.core.models.inc_raw import Incidents, IncidentsMirror, STATUS_MAPPING
 from app.core.models.users import Users
+from app.core.services.subscriptions import SubscriptionsService
 from app.core.utils import helpers
-from app.extensions import notification_manager
+from app.extensions import db, notification_manager, itsm_cache, itsm_mirror
+
+BATCH_LOOKUP_MAX_NUMBERS = 500
+SEARCH_DEFAULT_LIMIT = 50
+SEARCH_MAX_LIMIT = 200
+DRAFT_DATETIME_FORMAT = "%Y-%m-%dT%H:%M"
 
 
 class IncidentService:
@@ -15,27 +22,37 @@ class IncidentService:
 
     @track_operation("inc-query-all", "inc")
     @staticmethod
-    def get_incident_by_id(inc_id: str) -> Incidents:
+    def get_incident_by_id(inc_id: str, force_refresh: bool = False) -> Incidents | IncidentsMirror | None:
         """
         Метод получения инстанса инцидента по номеру.
 
+        Инцидент читается из локального зеркала ITSM, а при его отсутствии или устаревании -
+        из ITSM через кэш запросов.
+
         Args:
             inc_id: Номер инцидента
+            force_refresh: Перечитать инцидент из ITSM в обход зеркала и кэша
 
         Returns:
-            Инцидент в виде инстанса модели Incidents
+            Инцидент в виде инстанса модели Incidents или IncidentsMirror
         """
-        return Incidents.get_by_filter(inc_id=inc_id)
+        if not force_refresh:
+            inc = itsm_mirror.get_record(IncidentsMirror, inc_id)
+            if inc:
+                return inc
+
+        return itsm_cache.get_record(Incidents, inc_id, force_refresh=force_refresh)
 
     @track_operation("inc-search", "inc")
     @staticmethod
-    def get_inc_data(ind_id: str, parse_description: bool = None) -> dict[str, Any]:
+    def get_inc_data(ind_id: str, parse_description: bool = None, force_refresh: bool = False) -> dict[str, Any]:
         """
         Метод получения данных из инцидента в виде списка с/без парсингом поля детального описания.
 
         Args:
             ind_id: Номер инцидента
             parse_description: Необходимо ли парсить детальное описание на 'Влияние' и 'Причину'
+            force_refresh: Перечитать инцидент из ITSM в обход кэша
 
         Returns:
             Объект типа словарь с данными об инциденте
@@ -48,7 +65,7 @@ class IncidentService:
                     "message": "Необходимо указать номер инцидента."
                 }
 
-            inc = IncidentService.get_incident_by_id(ind_id)
+            inc = IncidentService.get_incident_by_id(ind_id, force_refresh=force_refresh)
 
             if not inc:
                 return {
@@ -56,44 +73,318 @@ class IncidentService:
                     "message": "Инцидент не найден в базе данных"
                 }
 
-            inc_details = {
-                "incNumber": inc.inc_id,
-                "incPriority": inc.priority,
-                "incStatus": inc.status,
-                "incImpactShortDetails": inc.short_description,
-                "incImpactDetails": inc.detailed_description,
-                "incRequestCreated": helpers.safe_format_datetime(inc.creation_date),
-                "incSolutionTime": helpers.safe_format_datetime(inc.solution_date),
-                "incImpactStartDate": helpers.safe_format_datetime(inc.accident_start_date),
-                "incEndDate": helpers.safe_format_datetime(inc.accident_end_date),
-                "incCI": inc.ci,
-                "incService": inc.service
-            }
+            return IncidentService._build_inc_data(inc, parse_description)
+        except Exception as e:
+            logging.error(f"Ошибка поиска инцидента: {e}")
+            return {"error": "Ошибка поиска инцидента."}
+
+    @track_operation("inc-batch-search", "inc")
+    @staticmethod
+    def get_inc_data_batch(inc_numbers: list[str] | str, parse_description: bool = None,
+                           force_refresh: bool = False) -> dict[str, Any]:
+        """
+        Метод пакетного получения данных о нескольких инцидентах одним запросом к ITSM.
+
+        Args:
+            inc_numbers: Список номеров инцидентов, либо строка с номерами
+            parse_description: Необходимо ли парсить детальное описание на 'Влияние' и 'Причину'
+            force_refresh: Перечитать инциденты из ITSM в обход зеркала и кэша
 
-            if parse_description:
-                patterns = {
-                    "influence": r"^(.*?)\sДлительность:",
-                    "reason": r"Причина:\s(.*?)\sЧто сделано:",
+        Returns:
+            Словарь с данными найденных инцидентов по номеру и списками найденных/ненайденных номеров
+        """
+        try:
+            numbers = helpers.parse_numbers_list(inc_numbers)
+            if not numbers:
+                return {
+                    "status": "rejected",
+                    "message": "Необходимо указать номера инцидентов."
+                }
+            if len(numbers) > BATCH_LOOKUP_MAX_NUMBERS:
+                return {
+                    "status": "rejected",
+                    "message": f"Превышено максимальное количество номеров в запросе: {BATCH_LOOKUP_MAX_NUMBERS}."
                 }
 
-                parsed_dtls = helpers.parse_text(inc.detailed_description, patterns)
-                influence = parsed_dtls.get("influence") if parsed_dtls.get("influence") else inc.detailed_description
-                reason = parsed_dtls.get("reason") if parsed_dtls.get("reason") else "Выясняется"
+            found = {} if force_refresh else itsm_mirror.get_records(IncidentsMirror, numbers)
+            found |= itsm_cache.get_records(
+                Incidents,
+                [number for number in numbers if number not in found],
+                loader=lambda missing: db.session.execute(
+                    db.select(Incidents).where(Incidents.inc_id.in_(missing))
+                ).scalars().all(),
+                force_refresh=force_refresh
+            )
 
+            return {
+                "status": "success",
+                "results": {
+                    number: IncidentService._build_inc_data(found[number], parse_description)
+                    for number in numbers if number in found
+                },
+                "found": [number for number in numbers if number in found],
+                "not_found": [number for number in numbers if number not in found]
+            }
+        except Exception as e:
+            logging.error(f"Ошибка пакетного поиска инцидентов: {e}")
+            return {
+                "status": "error",
+                "message": "Ошибка пакетного поиска инцидентов."
+            }
+
+    @track_operation("inc-search-list", "inc")
+    @staticmethod
+    def search_incidents(created_from: datetime | None = None, created_to: datetime | None = None,
+                         accident_from: datetime | None = None, accident_to: datetime | None = None,
+                         priorities: list[int] | None = None, statuses: list[str] | None = None,
+                         service: str | None = None, ci: str | None = None,
+                         cursor: str | None = None, limit: int | None = None) -> dict[str, Any]:
+        """
+        Метод поиска инцидентов ITSM по периоду, приоритету, статусу и сервису/КЕ.
+
+        Инциденты возвращаются от новых к старым с keyset-пагинацией по (дата создания, номер),
+        поэтому запрос следующей страницы не зависит от ее номера. Если зеркало ITSM актуально
+        и покрывает период поиска, поиск выполняется по зеркалу.
+
+        Args:
+            created_from: Начало периода по дате создания
+            created_to: Окончание периода по дате создания
+            accident_from: Начало периода по дате начала аварии
+            accident_to: Окончание периода по дате начала аварии
+            priorities: Список приоритетов (1-5)
+            statuses: Список статусов
+            service: Часть названия сервиса
+            ci: Часть названия КЕ
+            cursor: Курсор следующей страницы из предыдущего ответа
+            limit: Количество инцидентов на странице
+
+        Returns:
+            Объект типа словарь со списком инцидентов и курсором следующей страницы
+        """
+        try:
+            limit = limit or SEARCH_DEFAULT_LIMIT
+            if not 1 <= limit <= SEARCH_MAX_LIMIT:
                 return {
-                    "inc_details": inc_details,
-                    "influence": influence,
-                    "reason": reason
+                    "status": "rejected",
+                    "message": f"Количество инцидентов на странице должно быть от 1 до {SEARCH_MAX_LIMIT}."
                 }
-            else:
+            if priorities and any(priority not in range(1, 6) for priority in priorities):
+                return {
+                    "status": "rejected",
+                    "message": "Приоритет должен быть в диапазоне от 1 до 5."
+                }
+            if statuses and any(status not in STATUS_MAPPING.values() for status in statuses):
                 return {
-                    "inc_details": inc_details,
-                    "influence": inc.detailed_description,
-                    "reason": "Не указана"
+                    "status": "rejected",
+                    "message": f"Неизвестный статус. Доступные: {list(STATUS_MAPPING.values())}"
+                }
+            if not any([created_from, accident_from, priorities, statuses, service, ci]):
+                return {
+                    "status": "rejected",
+                    "message": "Необходимо указать хотя бы один фильтр поиска."
                 }
+
+            try:
+                after = helpers.decode_cursor(cursor, (int, str))
+            except ValueError as e:
+                return {
+                    "status": "rejected",
+                    "message": str(e)
+                }
+
+            # Полнота зеркала гарантирована только по дате создания (инцидент, созданный после начала окна зеркала,
+            # изменялся не раньше), поэтому поиск только по дате начала аварии выполняется в ITSM
+            model = IncidentsMirror if itsm_mirror.covers(created_from) else Incidents
+
+            conditions = [model.creation_date_unix.is_not(None)]
+            if created_from:
+                conditions.append(model.creation_date >= created_from)
+            if created_to:
+                conditions.append(model.creation_date <= created_to)
+            if accident_from:
+                conditions.append(model.accident_start_date >= accident_from)
+            if accident_to:
+                conditions.append(model.accident_start_date <= accident_to)
+            if priorities:
+                conditions.append(model.priority.in_(priorities))
+            if statuses:
+                conditions.append(model.status.in_(statuses))
+            if service:
+                conditions.append(model.service.icontains(service, autoescape=True))
+            if ci:
+                conditions.append(model.ci.icontains(ci, autoescape=True))
+            if after:
+                conditions.append(or_(
+                    model.creation_date_unix < after[0],
+                    and_(model.creation_date_unix == after[0], model.inc_id < after[1])
+                ))
+
+            incidents = db.session.execute(
+                db.select(model)
+                .where(*conditions)
+                .order_by(model.creation_date_unix.desc(), model.inc_id.desc())
+                .limit(limit + 1)
+            ).scalars().all()
+
+            has_more = len(incidents) > limit
+            incidents = incidents[:limit]
+
+            return {
+                "status": "success",
+                "items": [IncidentService._build_inc_data(inc)["inc_details"] for inc in incidents],
+                "next_cursor": helpers.encode_cursor(
+                    [incidents[-1].creation_date_unix, incidents[-1].inc_id]
+                ) if has_more else None,
+                "limit": limit
+            }
         except Exception as e:
-            logging.error(f"Ошибка поиска инцидента: {e}")
-            return {"error": "Ошибка поиска инцидента."}
+            logging.error(f"Ошибка поиска списка инцидентов: {e}")
+            return {
+                "status": "error",
+                "message": "Ошибка поиска списка инцидентов."
+            }
+
+    @staticmethod
+    def build_notification_draft(inc: Incidents | IncidentsMirror, previous_status: str | None = None) -> dict[str, Any]:
+        """
+        Метод подготовки черновика нотификации по инциденту без участия оператора.
+
+        Статус рассылки определяется по статусу инцидента: новый для сервиса инцидент - "Зарегистрирован",
+        решенный - "Решен", прочие изменения - "Дополнение". Оператор может изменить его перед отправкой.
+
+        Args:
+            inc: Инцидент в виде инстанса модели Incidents или IncidentsMirror
+            previous_status: Статус инцидента при предыдущей обработке (None - инцидент обрабатывается впервые)
+
+        Returns:
+            Объект типа словарь с данными формы, текстом СМС, темой письма и аудиторией рассылки
+        """
+        inc_data = IncidentService._build_inc_data(inc, parse_description=True)
+
+        if inc.status in ("Решен", "Закрыт"):
+            inc_state = "Решен"
+        elif previous_status is None:
+            inc_state = "Зарегистрирован"
+        else:
+            inc_state = "Дополнение"
+
+        data = {
+            "inc_number": inc.inc_id,
+            "inc_state": inc_state,
+            "inc_priority": str(inc.priority),
+            "inc_creation_time": helpers.safe_format_datetime(inc.creation_date, fmt=DRAFT_DATETIME_FORMAT),
+            "inc_impact_start_time": helpers.safe_format_datetime(inc.accident_start_date, fmt=DRAFT_DATETIME_FORMAT),
+            "inc_impact_end_time": helpers.safe_format_datetime(inc.accident_end_date, fmt=DRAFT_DATETIME_FORMAT),
+            "inc_resolution_time": helpers.safe_format_datetime(inc.solution_date, fmt=DRAFT_DATETIME_FORMAT),
+            "inc_impact": inc_data.get("influence"),
+            "inc_reason": inc_data.get("reason")
+        }
+
+        template = IncidentService._generate_template(data, inc)
+
+        return {
+            "inc_number": inc.inc_id,
+            "inc_state": inc_state,
+            "inc_status": inc.status,
+            "inc_priority": inc.priority,
+            "inc_data": inc_data,
+            "form_data": data,
+            "message": template.get("message"),
+            "email_subject": template.get("email_subject"),
+            "audience": IncidentService.get_incident_audience(inc.priority),
+            "created_at": datetime.now().isoformat(timespec="seconds")
+        }
+
+    @staticmethod
+    def get_incident_audience(inc_priority: int | str) -> dict[str, Any]:
+        """
+        Метод подсчета аудитории рассылки по инциденту указанного приоритета.
+
+        Количество подписчиков по каждой тематике и общее количество уникальных получателей
+        считаются одним запросом (GROUPING SETS).
+
+        Args:
+            inc_priority: Приоритет инцидента
+
+        Returns:
+            Объект типа словарь с количеством получателей по тематикам и общим количеством
+        """
+        rows = db.session.execute(
+            text("""
+                SELECT elem ->> 'sub_id' AS sub_id, count(DISTINCT u.id) AS recipients
+                FROM grafana.sbs_users u
+                CROSS JOIN LATERAL jsonb_array_elements(u.subscriptions -> 'incidents_subs') elem
+                WHERE elem -> 'sub_details' -> 'priorities' @> CAST(:inc_priority_json AS jsonb)
+                GROUP BY GROUPING SETS ((elem ->> 'sub_id'), ())
+            """),
+            {"inc_priority_json": json.dumps([str(inc_priority)])}
+        ).all()
+
+        names_by_id = SubscriptionsService.get_catalog().names_by_id
+        subscriptions = []
+        total = 0
+
+        for row in rows:
+            if row.sub_id is None:
+                total = row.recipients
+                continue
+
+            sub_name = names_by_id.get(int(row.sub_id)) if row.sub_id.isdigit() else None
+            if sub_name:
+                subscriptions.append({"name": sub_name, "recipients": row.recipients})
+
+        return {
+            "subscriptions": sorted(subscriptions, key=lambda item: item["name"]),
+            "total": total
+        }
+
+    @staticmethod
+    def _build_inc_data(inc: Incidents, parse_description: bool = None) -> dict[str, Any]:
+        """
+        Внутренний метод формирования данных инцидента для формы нотификации.
+
+        Args:
+            inc: Инцидент в виде инстанса модели Incidents
+            parse_description: Необходимо ли парсить детальное описание на 'Влияние' и 'Причину'
+
+        Returns:
+            Объект типа словарь с данными об инциденте
+        """
+        inc_details = {
+            "incNumber": inc.inc_id,
+            "incPriority": inc.priority,
+            "incStatus": inc.status,
+            "incImpactShortDetails": inc.short_description,
+            "incImpactDetails": inc.detailed_description,
+            "incRequestCreated": helpers.safe_format_datetime(inc.creation_date),
+            "incSolutionTime": helpers.safe_format_datetime(inc.solution_date),
+            "incImpactStartDate": helpers.safe_format_datetime(inc.accident_start_date),
+            "incEndDate": helpers.safe_format_datetime(inc.accident_end_date),
+            "incCI": inc.ci,
+            "incService": inc.service
+        }
+
+        if parse_description:
+            patterns = {
+                "influence": r"^(.*?)\sДлительность:",
+                "reason": r"Причина:\s(.*?)\sЧто сделано:",
+            }
+
+            parsed_dtls = helpers.parse_text(inc.detailed_description, patterns)
+            influence = parsed_dtls.get("influence") if parsed_dtls.get("influence") else inc.detailed_description
+            reason = parsed_dtls.get("reason") if parsed_dtls.get("reason") else "Выясняется"
+
+            return {
+                "inc_details": inc_details,
+                "influence": influence,
+                "reason": reason
+            }
+        else:
+            return {
+                "inc_details": inc_details,
+                "influence": inc.detailed_description,
+                "reason": "Не указана"
+            }
 
     @staticmethod
     def prepare_notification(data: dict[str, Any]) -> dict[str, Any]:
@@ -115,7 +406,7 @@ class IncidentService:
                         "message": f"Поле '{field}' обязательно для заполнения."
                     }
 
-            inc = Incidents.get_by_id(data.get("inc_number"))
+            inc = IncidentService.get_incident_by_id(data.get("inc_number"))
             if not inc:
                 return {
                     "status": "not_found",
@@ -360,16 +651,14 @@ class IncidentService:
             Лист получателей рассылки, или пустой лист в случае ошибки
         """
         try:
-            selected_subs_data = Subscriptions.query.filter(
-                Subscriptions.sub_name.in_(selected_subs)
-            ).all()
+            selected_subs_ids = [
+                str(sub_id) for sub_id in SubscriptionsService.get_catalog().ids_for_names(selected_subs)
+            ]
 
-            if not selected_subs_data:
+            if not selected_subs_ids:
                 logging.warning(f"Отсутствующие подписки: {selected_subs}")
                 return []
 
-            selected_subs_ids = [str(sub.sub_id) for sub in selected_subs_data]
-
             from sqlalchemy import text
 
             conditions = []
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any
+
+import redis
+from flask import Flask
+
+
+class IncidentWatcher:
+    """
+    Менеджер фоновой подготовки черновиков нотификаций по инцидентам - Flask Extension.
+
+    Фоновый поток периодически забирает из ITSM (T1447) инциденты отслеживаемых приоритетов, измененные после
+    водяной отметки (поле C6 "Modified Date"), и для новых или изменившихся инцидентов готовит черновик нотификации:
+    данные формы, текст СМС, тему письма и аудиторию рассылки. Черновики хранятся в Redis и отправляются
+    на страницу рассылки по инцидентам через Socket.IO (комната "inc_drafts").
+    Одновременно опрос выполняет только один процесс (блокировка в Redis).
+    """
+
+    def __init__(self) -> None:
+        self.app: Flask | None = None
+        self.enabled: bool = False
+        self.interval: int = 30
+        self.priorities: list[int] = [1, 2]
+        self.draft_ttl: int = 86400
+        self.batch_size: int = 500
+        self.redis_client: redis.Redis | None = None
+
+        self.poll_lock_key: str = "sbs_inc_watcher_lock"
+        self.watermark_key: str = "sbs_inc_watcher_watermark"
+        self.seen_key: str = "sbs_inc_watcher_seen"
+        self.drafts_index_key: str = "sbs_inc_drafts"
+        self.draft_prefix: str = "sbs_inc_draft:"
+        self.room: str = "inc_drafts"
+
+        self.worker_thread: threading.Thread | None = None
+        self._shutdown_event: threading.Event = threading.Event()
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Инициализация расширения в контексте Flask app.
+
+        Args:
+            app: Экземпляр приложения Flask
+        """
+        self.app = app
+        self.enabled = app.config.get("INC_WATCHER_ENABLED", False)
+        self.interval = app.config.get("INC_WATCHER_INTERVAL", self.interval)
+        self.priorities = app.config.get("INC_WATCHER_PRIORITIES", self.priorities)
+        self.draft_ttl = app.config.get("INC_WATCHER_DRAFT_TTL", self.draft_ttl)
+        app.extensions["inc_watcher"] = self
+
+        try:
+            self.redis_client = redis.from_url(
+                app.config["REDIS_URL"],
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True,
+                health_check_interval=30
+            )
+            self.redis_client.ping()
+        except Exception as e:
+            logging.error(f"Подготовка черновиков нотификаций по инцидентам недоступна без Redis: {e}")
+            self.redis_client = None
+            return
+
+        if self.enabled:
+            self.start_worker()
+
+    def start_worker(self) -> None:
+        """Запуск потока опроса ITSM в фоновом режиме"""
+        if self.worker_thread and self.worker_thread.is_alive():
+            return
+
+        self._shutdown_event.clear()
+        self.worker_thread = threading.Thread(
+            target=self._worker_loop,
+            daemon=True,
+            name="IncidentWatcher"
+        )
+        self.worker_thread.start()
+        logging.info("Поток подготовки черновиков нотификаций по инцидентам запущен")
+
+    def stop_worker(self) -> None:
+        """Завершение работы потока опроса ITSM"""
+        self._shutdown_event.set()
+        if self.worker_thread and self.worker_thread.is_alive():
+            self.worker_thread.join(timeout=10)
+
+    def get_drafts(self) -> list[dict[str, Any]]:
+        """
+        Метод получения актуальных черновиков нотификаций.
+
+        Returns:
+            Лист черновиков, от новых к старым (пустой, если Redis недоступен)
+        """
+        if self.redis_client is None:
+            return []
+
+        try:
+            self.redis_client.zremrangebyscore(self.drafts_index_key, "-inf", time.time() - self.draft_ttl)
+            inc_ids = self.redis_client.zrevrange(self.drafts_index_key, 0, -1)
+            if not inc_ids:
+                return []
+
+            values = self.redis_client.mget([f"{self.draft_prefix}{inc_id}" for inc_id in inc_ids])
+            return [json.loads(value) for value in values if value]
+        except redis.RedisError as e:
+            logging.error(f"Ошибка чтения черновиков нотификаций по инцидентам: {e}")
+            return []
+
+    def dismiss_draft(self, inc_id: str) -> None:
+        """
+        Метод удаления черновика нотификации (после отправки рассылки или отказа оператора).
+
+        Args:
+            inc_id: Номер инцидента
+        """
+        if self.redis_client is None:
+            return
+
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.delete(f"{self.draft_prefix}{inc_id}")
+            pipe.zrem(self.drafts_index_key, inc_id)
+            pipe.execute()
+        except redis.RedisError as e:
+            logging.error(f"Ошибка удаления черновика нотификации по инциденту {inc_id}: {e}")
+
+    def poll(self) -> int | None:
+        """
+        Метод однократного опроса ITSM под распределенной блокировкой.
+
+        Returns:
+            Количество подготовленных черновиков, или None, если опрос выполняет другой процесс
+        """
+        lock = self.redis_client.lock(self.poll_lock_key, timeout=max(self.interval * 5, 300))
+        if not lock.acquire(blocking=False):
+            return None
+
+        try:
+            return self._poll_changes()
+        finally:
+            try:
+                lock.release()
+            except redis.exceptions.LockError:
+                logging.warning("Блокировка опроса ITSM истекла до завершения подготовки черновиков")
+
+    def _poll_changes(self) -> int:
+        """
+        Внутренний метод выборки измененных инцидентов и подготовки черновиков.
+
+        Инцидент считается изменившимся, если с предыдущей обработки изменились статус, приоритет
+        или детальное описание; прочие изменения записи в ITSM черновик не порождают.
+
+        Returns:
+            Количество подготовленных черновиков
+        """
+        from app.core.models.inc_raw import Incidents
+        from app.core.services.inc import IncidentService
+        from app.extensions import db, socketio
+
+        watermark = self.redis_client.get(self.watermark_key)
+        watermark = int(watermark) if watermark else int(time.time()) - self.interval
+
+        incidents = db.session.execute(
+            db.select(Incidents)
+            .where(Incidents.modified_date_unix >= watermark, Incidents.priority.in_(self.priorities))
+            .order_by(Incidents.modified_date_unix.asc(), Incidents.inc_id.asc())
+            .limit(self.batch_size)
+        ).scalars().all()
+
+        if not incidents:
+            return 0
+
+        seen = self.redis_client.hmget(self.seen_key, [inc.inc_id for inc in incidents])
+        prepared = 0
+
+        for inc, seen_value in zip(incidents, seen):
+            previous = json.loads(seen_value) if seen_value else None
+            fingerprint = self._fingerprint(inc)
+
+            if previous and previous.get("fingerprint") == fingerprint:
+                continue
+
+            try:
+                draft = IncidentService.build_notification_draft(inc, previous.get("status") if previous else None)
+            except Exception as e:
+                logging.error(f"Ошибка подготовки черновика нотификации по инциденту {inc.inc_id}: {e}")
+                continue
+
+            pipe = self.redis_client.pipeline()
+            pipe.set(f"{self.draft_prefix}{inc.inc_id}", json.dumps(draft, ensure_ascii=False), ex=self.draft_ttl)
+            pipe.zadd(self.drafts_index_key, {inc.inc_id: time.time()})
+            pipe.hset(self.seen_key, inc.inc_id, json.dumps({"status": inc.status, "fingerprint": fingerprint}))
+            pipe.expire(self.seen_key, self.draft_ttl * 7)
+            pipe.execute()
+
+            socketio.emit("inc_draft", draft, room=self.room)
+            prepared += 1
+
+        # Записи с той же датой изменения, что и последняя, перечитываются в следующем цикле и отсекаются по отпечатку
+        self.redis_client.set(self.watermark_key, incidents[-1].modified_date_unix)
+
+        if prepared:
+            logging.info(f"Подготовлено черновиков нотификаций по инцидентам: {prepared}")
+
+        return prepared
+
+    @staticmethod
+    def _fingerprint(inc: Any) -> str:
+        """
+        Внутренний метод вычисления отпечатка значимых для нотификации полей инцидента.
+
+        Args:
+            inc: Инцидент в виде инстанса модели Incidents
+
+        Returns:
+            Хэш статуса, приоритета и детального описания
+        """
+        payload = f"{inc.status}|{inc.priority}|{inc.detailed_description or ''}"
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _worker_loop(self) -> None:
+        """Основной цикл потока опроса ITSM"""
+        while not self._shutdown_event.is_set():
+            try:
+                with self.app.app_context():
+                    from app.extensions import db
+
+                    try:
+                        self.poll()
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                logging.error(f"Ошибка опроса ITSM для подготовки черновиков нотификаций: {e}")
+
+            self._shutdown_event.wait(self.interval)
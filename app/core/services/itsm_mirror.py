@@ -0,0 +1,295 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any
+
+import redis
+from flask import Flask
+
+
+class ITSMMirrorManager:
+    """
+    Менеджер локального зеркала таблиц ITSM (T2318, T1447) в Postgres - Flask Extension.
+
+    Фоновый поток периодически забирает из ITSM записи, измененные после водяной отметки
+    (максимальное значение поля C6 "Modified Date" в зеркале), и пачками upsert'ит их в локальные таблицы.
+    Одновременно синхронизацию выполняет только один процесс (блокировка в Redis).
+    Поиск читает зеркало, пока оно не устарело; при отсутствии записи или устаревшем зеркале
+    вызывающий код обращается к ITSM напрямую.
+    """
+
+    def __init__(self) -> None:
+        self.app: Flask | None = None
+        self.enabled: bool = False
+        self.interval: int = 60
+        self.batch_size: int = 1000
+        self.initial_days: int = 30
+        self.overlap: int = 300
+        self.redis_client: redis.Redis | None = None
+        self.sync_lock_key: str = "sbs_itsm_mirror_lock"
+        self.synced_at_key: str = "sbs_itsm_mirror_synced_at"
+
+        self.worker_thread: threading.Thread | None = None
+        self._shutdown_event: threading.Event = threading.Event()
+        self._local_synced_at: float = 0.0
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Инициализация расширения в контексте Flask app.
+
+        Args:
+            app: Экземпляр приложения Flask
+        """
+        self.app = app
+        self.enabled = app.config.get("ITSM_MIRROR_ENABLED", False)
+        self.interval = app.config.get("ITSM_MIRROR_INTERVAL", self.interval)
+        self.batch_size = app.config.get("ITSM_MIRROR_BATCH_SIZE", self.batch_size)
+        self.initial_days = app.config.get("ITSM_MIRROR_INITIAL_DAYS", self.initial_days)
+        self.overlap = app.config.get("ITSM_MIRROR_OVERLAP", self.overlap)
+        app.extensions["itsm_mirror"] = self
+
+        if not self.enabled:
+            return
+
+        try:
+            self.redis_client = redis.from_url(
+                app.config["REDIS_URL"],
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True,
+                health_check_interval=30
+            )
+            self.redis_client.ping()
+        except Exception as e:
+            logging.error(f"Зеркало ITSM работает без Redis, синхронизация выполняется без блокировки: {e}")
+            self.redis_client = None
+
+        self.start_worker()
+
+    def start_worker(self) -> None:
+        """Запуск потока синхронизации в фоновом режиме"""
+        if self.worker_thread and self.worker_thread.is_alive():
+            return
+
+        self._shutdown_event.clear()
+        self.worker_thread = threading.Thread(
+            target=self._worker_loop,
+            daemon=True,
+            name="ITSMMirrorSync"
+        )
+        self.worker_thread.start()
+        logging.info("Поток синхронизации зеркала ITSM запущен")
+
+    def stop_worker(self) -> None:
+        """Завершение работы потока синхронизации"""
+        self._shutdown_event.set()
+        if self.worker_thread and self.worker_thread.is_alive():
+            self.worker_thread.join(timeout=10)
+
+    def is_fresh(self) -> bool:
+        """Признак того, что зеркало включено и успешно синхронизировалось не позднее трех интервалов назад."""
+        if not self.enabled:
+            return False
+
+        synced_at = self._local_synced_at
+        if self.redis_client is not None:
+            try:
+                synced_at = float(self.redis_client.get(self.synced_at_key) or 0)
+            except redis.RedisError as e:
+                logging.warning(f"Ошибка чтения времени синхронизации зеркала ITSM: {e}")
+
+        return time.time() - synced_at < self.interval * 3
+
+    def covers(self, since: datetime | None) -> bool:
+        """
+        Признак того, что зеркало актуально и содержит записи, начиная с указанного момента.
+
+        Записи, не изменявшиеся с момента первичной загрузки, попадают в зеркало только за последние
+        ITSM_MIRROR_INITIAL_DAYS дней, поэтому более ранние периоды ищутся в ITSM.
+
+        Args:
+            since: Нижняя граница периода поиска (None - без ограничения)
+
+        Returns:
+            True, если поиск можно выполнить по зеркалу
+        """
+        if since is None or not self.is_fresh():
+            return False
+        return since.timestamp() >= time.time() - self.initial_days * 86400
+
+    def get_record(self, mirror_model: type, record_id: Any) -> Any | None:
+        """
+        Метод получения записи из зеркала.
+
+        Args:
+            mirror_model: Класс модели зеркала
+            record_id: Номер (первичный ключ) записи
+
+        Returns:
+            Отсоединенный инстанс модели зеркала (числа NUMBER приведены к int/float, как в кэше записей ITSM),
+            или None если зеркало устарело или запись не найдена
+        """
+        from app.core.services.cache import RecordCache
+
+        if not self.is_fresh():
+            return None
+
+        try:
+            record = mirror_model.get_by_id(record_id)
+            return RecordCache.detach(record) if record is not None else None
+        except Exception as e:
+            logging.error(f"Ошибка чтения зеркала ITSM {mirror_model.__tablename__}: {e}")
+            return None
+
+    def get_records(self, mirror_model: type, record_ids: list[Any]) -> dict[Any, Any]:
+        """
+        Метод пакетного получения записей из зеркала одним запросом.
+
+        Args:
+            mirror_model: Класс модели зеркала
+            record_ids: Номера (первичные ключи) записей
+
+        Returns:
+            Словарь найденных отсоединенных инстансов по номеру записи (пустой, если зеркало устарело)
+        """
+        if not self.is_fresh() or not record_ids:
+            return {}
+
+        from sqlalchemy import inspect
+        from app.core.services.cache import RecordCache
+        from app.extensions import db
+
+        try:
+            pk_column = inspect(mirror_model).primary_key[0]
+            records = db.session.execute(
+                db.select(mirror_model).where(pk_column.in_(record_ids))
+            ).scalars().all()
+            return {getattr(record, pk_column.key): RecordCache.detach(record) for record in records}
+        except Exception as e:
+            logging.error(f"Ошибка чтения зеркала ITSM {mirror_model.__tablename__}: {e}")
+            return {}
+
+    def sync_all(self) -> dict[str, int] | None:
+        """
+        Метод синхронизации всех зеркал под распределенной блокировкой.
+
+        Returns:
+            Количество синхронизированных записей по таблицам, или None, если синхронизацию выполняет другой процесс
+        """
+        from app.core.models.crq_raw import CRQSource, CRQSourceMirror
+        from app.core.models.inc_raw import Incidents, IncidentsMirror
+
+        lock = None
+        if self.redis_client is not None:
+            lock = self.redis_client.lock(self.sync_lock_key, timeout=max(self.interval * 5, 300))
+            if not lock.acquire(blocking=False):
+                return None
+
+        try:
+            result = {
+                CRQSourceMirror.__tablename__: self._sync_table(CRQSource, CRQSourceMirror),
+                IncidentsMirror.__tablename__: self._sync_table(Incidents, IncidentsMirror)
+            }
+
+            self._local_synced_at = time.time()
+            if self.redis_client is not None:
+                self.redis_client.set(self.synced_at_key, self._local_synced_at)
+
+            return result
+        finally:
+            if lock is not None:
+                try:
+                    lock.release()
+                except redis.exceptions.LockError:
+                    logging.warning("Блокировка синхронизации зеркала ITSM истекла до завершения синхронизации")
+
+    def _sync_table(self, source_model: type, mirror_model: type) -> int:
+        """
+        Внутренний метод инкрементальной синхронизации одной таблицы.
+
+        Записи читаются из ITSM пачками в порядке (дата изменения, номер) с keyset-пагинацией
+        и upsert'ятся в зеркало одним INSERT ... ON CONFLICT на пачку.
+
+        Args:
+            source_model: Класс модели таблицы ITSM
+            mirror_model: Класс модели зеркала с теми же атрибутами
+
+        Returns:
+            Количество синхронизированных записей
+        """
+        from sqlalchemy import and_, func, inspect, or_
+        from sqlalchemy.dialects.postgresql import insert
+        from app.extensions import db
+
+        keys = [attr.key for attr in inspect(mirror_model).column_attrs]
+        pk_key = inspect(mirror_model).primary_key[0].key
+        source_pk = getattr(source_model, pk_key)
+        source_modified = source_model.modified_date_unix
+
+        watermark = db.session.scalar(db.select(func.max(mirror_model.modified_date_unix)))
+        if watermark is None:
+            watermark = int(time.time()) - self.initial_days * 86400
+        else:
+            # Перекрытие на случай изменений в ITSM, зафиксированных с той же или более ранней датой изменения
+            watermark -= self.overlap
+
+        synced = 0
+        last_modified, last_pk = None, None
+
+        while not self._shutdown_event.is_set():
+            query = (
+                db.select(*[getattr(source_model, key) for key in keys])
+                .where(source_modified >= watermark)
+                .order_by(source_modified.asc(), source_pk.asc())
+                .limit(self.batch_size)
+            )
+            if last_modified is not None:
+                query = query.where(or_(
+                    source_modified > last_modified,
+                    and_(source_modified == last_modified, source_pk > last_pk)
+                ))
+
+            rows = [dict(row) for row in db.session.execute(query).mappings().all()]
+            if not rows:
+                break
+
+            try:
+                stmt = insert(mirror_model).values(rows)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[pk_key],
+                    set_={key: stmt.excluded[key] for key in keys if key != pk_key}
+                )
+                db.session.execute(stmt)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+            synced += len(rows)
+            if len(rows) < self.batch_size:
+                break
+
+            last_modified, last_pk = rows[-1]["modified_date_unix"], rows[-1][pk_key]
+
+        if synced:
+            logging.info(f"Зеркало ITSM {mirror_model.__tablename__}: синхронизировано записей - {synced}")
+
+        return synced
+
+    def _worker_loop(self) -> None:
+        """Основной цикл потока синхронизации"""
+        while not self._shutdown_event.is_set():
+            try:
+                with self.app.app_context():
+                    from app.extensions import db
+
+                    try:
+                        self.sync_all()
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                logging.error(f"Ошибка синхронизации зеркала ITSM: {e}")
+
+            self._shutdown_event.wait(self.interval)
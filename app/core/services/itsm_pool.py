@@ -0,0 +1,180 @@
+import logging
+import threading
+import time
+from typing import Any
+
+import oracledb
+from flask import Flask
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+
+class _ITSMConnection(oracledb.Connection):
+    """Соединение из пула ITSM, сообщающее менеджеру пула о возврате сессии."""
+
+    manager: "ITSMSessionPool | None" = None
+
+    def close(self) -> None:
+        super().close()
+        if self.manager is not None:
+            self.manager.record_state()
+
+
+class ITSMSessionPool:
+    """
+    Менеджер пула сессий oracledb для bind'а "itsm" - Flask Extension.
+
+    Пулом соединений с ITSM управляет oracledb (min/max сессий, кэш подготовленных выражений,
+    проверка соединений после простоя), а SQLAlchemy получает соединения через creator без собственного пула
+    (NullPool: закрытие соединения SQLAlchemy возвращает сессию в пул oracledb).
+    При старте приложения пул прогревается до минимального количества сессий в фоновом потоке.
+    Время ожидания сессии и состояние пула экспортируются в Prometheus.
+
+    Должен инициализироваться до db.init_app, так как подменяет настройки bind'а в SQLALCHEMY_BINDS.
+    """
+
+    bind_key: str = "itsm"
+
+    def __init__(self) -> None:
+        self.app: Flask | None = None
+        self.enabled: bool = False
+        self.min_sessions: int = 2
+        self.max_sessions: int = 10
+        self.increment: int = 1
+        self.stmt_cache_size: int = 50
+        self.wait_timeout: int = 10
+        self.idle_timeout: int = 300
+        self.ping_interval: int = 60
+        self.warmup: bool = True
+
+        self.pool: oracledb.ConnectionPool | None = None
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Инициализация расширения в контексте Flask app.
+
+        Args:
+            app: Экземпляр приложения Flask
+        """
+        self.app = app
+        self.enabled = app.config.get("ITSM_POOL_ENABLED", False)
+        self.min_sessions = app.config.get("ITSM_POOL_MIN", self.min_sessions)
+        self.max_sessions = app.config.get("ITSM_POOL_MAX", self.max_sessions)
+        self.increment = app.config.get("ITSM_POOL_INCREMENT", self.increment)
+        self.stmt_cache_size = app.config.get("ITSM_POOL_STMT_CACHE_SIZE", self.stmt_cache_size)
+        self.wait_timeout = app.config.get("ITSM_POOL_WAIT_TIMEOUT", self.wait_timeout)
+        self.idle_timeout = app.config.get("ITSM_POOL_IDLE_TIMEOUT", self.idle_timeout)
+        self.ping_interval = app.config.get("ITSM_POOL_PING_INTERVAL", self.ping_interval)
+        self.warmup = app.config.get("ITSM_POOL_WARMUP", self.warmup)
+        app.extensions["itsm_pool"] = self
+
+        binds = app.config.get("SQLALCHEMY_BINDS") or {}
+        url = binds.get(self.bind_key)
+        if not self.enabled or not isinstance(url, str):
+            return
+
+        try:
+            self.pool = self._create_pool(url)
+        except Exception as e:
+            logging.error(f"Ошибка создания пула сессий ITSM, используется пул SQLAlchemy: {e}")
+            return
+
+        # Копия словаря: SQLALCHEMY_BINDS - атрибут класса Config, общий для всех экземпляров приложения
+        app.config["SQLALCHEMY_BINDS"] = {**binds, self.bind_key: {
+            "url": url,
+            "creator": self.acquire,
+            "poolclass": NullPool
+        }}
+
+        if self.warmup:
+            threading.Thread(target=self._warmup, daemon=True, name="ITSMPoolWarmup").start()
+
+    def acquire(self) -> oracledb.Connection:
+        """
+        Метод получения сессии из пула (creator для SQLAlchemy) с записью метрик ожидания.
+
+        Returns:
+            Соединение oracledb
+        """
+        from app.extensions import prometheus_metrics
+
+        started_at = time.perf_counter()
+        try:
+            connection = self.pool.acquire()
+        except oracledb.Error as e:
+            error = e.args[0] if e.args else None
+            status = "timeout" if getattr(error, "full_code", None) == "DPY-4005" else "error"
+            prometheus_metrics.record_itsm_pool_checkout(time.perf_counter() - started_at, status)
+            raise
+
+        prometheus_metrics.record_itsm_pool_checkout(time.perf_counter() - started_at, "success")
+        self.record_state()
+
+        return connection
+
+    def record_state(self) -> None:
+        """Метод экспорта текущего состояния пула (занятые и открытые сессии) в Prometheus."""
+        from app.extensions import prometheus_metrics
+
+        if self.pool is None:
+            return
+
+        try:
+            prometheus_metrics.set_itsm_pool_state(self.pool.busy, self.pool.opened, self.pool.max)
+        except oracledb.Error:
+            # Пул закрыт при завершении процесса
+            pass
+
+    def _create_pool(self, url: str) -> oracledb.ConnectionPool:
+        """
+        Внутренний метод создания пула oracledb по URL bind'а.
+
+        Параметры подключения (пользователь, пароль, DSN) вычисляются диалектом SQLAlchemy,
+        поэтому поддерживаются те же форматы URL, что и без пула.
+
+        Args:
+            url: URL подключения SQLAlchemy (oracle+oracledb://...)
+
+        Returns:
+            Пул сессий oracledb
+        """
+        sa_url = make_url(url)
+        dialect = sa_url.get_dialect()()
+        dialect.dbapi = oracledb
+        _, connect_params = dialect.create_connect_args(sa_url)
+
+        _ITSMConnection.manager = self
+
+        return oracledb.create_pool(
+            **connect_params,
+            min=self.min_sessions,
+            max=self.max_sessions,
+            increment=self.increment,
+            connectiontype=_ITSMConnection,
+            getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+            wait_timeout=self.wait_timeout * 1000,
+            timeout=self.idle_timeout,
+            ping_interval=self.ping_interval,
+            stmtcachesize=self.stmt_cache_size
+        )
+
+    def _warmup(self) -> None:
+        """Внутренний метод прогрева пула: открытие минимального количества сессий и проверка каждой запросом"""
+        connections: list[Any] = []
+        try:
+            for _ in range(self.min_sessions):
+                connection = self.acquire()
+                connections.append(connection)
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1 FROM DUAL")
+                    cursor.fetchone()
+
+            logging.info(f"Пул сессий ITSM прогрет: открыто сессий - {self.pool.opened}")
+        except Exception as e:
+            logging.error(f"Ошибка прогрева пула сессий ITSM: {e}")
+        finally:
+            for connection in connections:
+                try:
+                    connection.close()
+                except oracledb.Error:
+                    pass
@@ -558,9 +558,26 @@ class NotificationTaskManager:
             if crq_number:
                 try:
                     from app.core.models.crq_processed import CRQProcessed
+                    from app.core.services.attachment_bundle import AttachmentBundleService
 
                     crq = CRQProcessed.get_by_filter(crq_number=crq_number)
-                    if crq and hasattr(crq, 'attachments') and crq.attachments:
+                    bundle_path = None
+                    if crq and crq.attachments and AttachmentBundleService.should_bundle(crq.attachments):
+                        try:
+                            bundle_path = AttachmentBundleService.get_bundle(crq.attachments)
+                        except Exception as e:
+                            logging.warning(f"Не удалось собрать архив вложений CRQ {crq_number}, "
+                                            f"файлы будут прикреплены по отдельности: {e}")
+
+                    if bundle_path:
+                        with open(bundle_path, 'rb') as f:
+                            msg.attach(
+                                filename=f"{crq.crq_number}_attachments.zip",
+                                content_type='application/zip',
+                                data=f.read()
+                            )
+                        logging.info(f"Прикреплен архив вложений CRQ {crq_number} к email")
+                    elif crq and hasattr(crq, 'attachments') and crq.attachments:
                         upload_folder = current_app.config.get("UPLOAD_FOLDER")
 
                         for attachment in crq.attachments:
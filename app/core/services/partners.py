@@ -1,20 +1,90 @@
 import logging
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
+from sqlalchemy import any_, bindparam, delete, func, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.monitoring.decorators import track_operation
 from app.core.models.partners_emails import PartnersEmails
 from app.core.models.partners_groups import  PartnerGroups
+from app.extensions import db, partners_cache
+
+MEMBERS_BATCH_SIZE = 1000
+GROUPS_SUMMARY_MAX_PER_PAGE = 500
+
+
+@dataclass(frozen=True)
+class PartnerRecipient:
+    """Получатель рассылки из группы партнеров (отвязан от сессии БД, безопасен для кэширования)."""
+
+    user_email: str
 
 
 class PartnersService:
     """Класс обработки операций над группами партнеров."""
 
+    @staticmethod
+    def get_cached_groups() -> list[str]:
+        """
+        Метод получения отсортированного списка имен групп партнеров через кэш.
+
+        Returns:
+            Список имен групп
+        """
+        def load_groups() -> list[str]:
+            partner_groups = PartnerGroups.get_all_ordered('partner_group_name', 'asc')
+            return [group.partner_group_name for group in partner_groups]
+
+        return partners_cache.get_or_load("groups", load_groups)
+
+    @staticmethod
+    def get_cached_group_emails(groupname: str) -> list[str] | None:
+        """
+        Метод получения отсортированного списка почтовых адресов группы через кэш.
+
+        Args:
+            groupname: Имя группы
+
+        Returns:
+            Список почтовых адресов, или None, если группа не найдена
+        """
+        def load_group_emails() -> list[str] | None:
+            partner_group = PartnerGroups.get_by_filter(partner_group_name=groupname)
+            if not partner_group:
+                return None
+
+            group_members = PartnersEmails.get_all_by_filter_ordered(
+                'partner_email', 'asc',
+                partner_group_id=partner_group.partner_group_id
+            )
+            return [group_member.partner_email for group_member in group_members]
+
+        return partners_cache.get_or_load(("members", groupname), load_group_emails)
+
+    @staticmethod
+    def get_group_recipients(groupname: str) -> list[PartnerRecipient] | None:
+        """
+        Метод получения списка получателей рассылки по группе партнеров.
+
+        Args:
+            groupname: Имя группы
+
+        Returns:
+            Список получателей, или None, если группа не найдена
+        """
+        emails = PartnersService.get_cached_group_emails(groupname)
+        if emails is None:
+            return None
+
+        return [PartnerRecipient(user_email=email) for email in emails]
+
     @staticmethod
     def get_partners_groups() -> dict[str, Any]:
         """Метод получения списка групп партнеров."""
         try:
-            partner_groups = PartnerGroups.get_all_ordered('partner_group_name', 'asc')
+            partner_groups = PartnersService.get_cached_groups()
             if not partner_groups:
                 return {
                     "status": "not_found",
@@ -22,8 +92,8 @@ class PartnersService:
                 }
 
             groups_list = []
-            for group in partner_groups:
-                group_item = {"groupname": group.partner_group_name}
+            for groupname in partner_groups:
+                group_item = {"groupname": groupname}
                 groups_list.append(group_item)
 
             return {
@@ -51,26 +121,22 @@ class PartnersService:
             Объект типа dict с данными об участниках группы, или данные об ошибке
         """
         try:
-            partner_group = PartnerGroups.get_by_filter(partner_group_name=groupname)
-            if not partner_group:
+            group_emails = PartnersService.get_cached_group_emails(groupname)
+            if group_emails is None:
                 return {
                     "status": "not_found",
                     "message": "Группа не найдена."
                 }
 
-            group_members = PartnersEmails.get_all_by_filter_ordered(
-                'partner_email', 'asc',
-                partner_group_id=partner_group.partner_group_id
-            )
-            if not group_members:
+            if not group_emails:
                 return {
                     "status": "not_found",
                     "message": "Список почтовых адресов группы партнеров пуст."
                 }
 
             members_emails = []
-            for group_member in group_members:
-                member_item = {"email": group_member.partner_email}
+            for email in group_emails:
+                member_item = {"email": email}
                 members_emails.append(member_item)
 
             return {
@@ -86,6 +152,108 @@ class PartnersService:
                 "message": f"Ошибка получения списка участников группы партнеров"
             }
 
+    @track_operation("partners-groups-summary", "partners")
+    @staticmethod
+    def get_groups_summary(prefix: str | None = None, page: int | None = None,
+                           per_page: int | None = None) -> dict[str, Any]:
+        """
+        Метод получения сводки по группам партнеров: количество участников и дата последнего изменения.
+
+        Сводка считается одним агрегирующим запросом (GROUP BY), общее количество групп -
+        оконной функцией в том же запросе. В кэше хранится только полный список групп без фильтра,
+        страницы которого выбираются из него; поиск по началу имени выполняется запросом без кэширования.
+
+        Args:
+            prefix: Начало имени группы для поиска (без учета регистра)
+            page: Номер страницы, начиная с 1 (опционально)
+            per_page: Количество групп на странице (опционально)
+
+        Returns:
+            Объект типа dict со списком групп и параметрами пагинации, или данные об ошибке
+        """
+        try:
+            if page is not None and page < 1:
+                return {"status": "rejected", "message": "Номер страницы должен быть больше нуля."}
+
+            if per_page is not None and not 1 <= per_page <= GROUPS_SUMMARY_MAX_PER_PAGE:
+                return {
+                    "status": "rejected",
+                    "message": f"Размер страницы должен быть от 1 до {GROUPS_SUMMARY_MAX_PER_PAGE}."
+                }
+
+            if page is not None and per_page is None:
+                per_page = GROUPS_SUMMARY_MAX_PER_PAGE
+
+            def load_summary(page: int | None = None, per_page: int | None = None) -> dict[str, Any]:
+                query = (
+                    db.select(
+                        PartnerGroups.partner_group_name,
+                        func.count(PartnersEmails.partner_id).label("members_count"),
+                        PartnerGroups.created_at,
+                        func.coalesce(PartnerGroups.updated_at, PartnerGroups.created_at).label("last_modified"),
+                        func.count().over().label("total")
+                    )
+                    .outerjoin(PartnersEmails, PartnersEmails.partner_group_id == PartnerGroups.partner_group_id)
+                    .group_by(PartnerGroups.partner_group_id)
+                    .order_by(PartnerGroups.partner_group_name.asc())
+                )
+
+                if prefix:
+                    query = query.where(PartnerGroups.partner_group_name.istartswith(prefix, autoescape=True))
+
+                if per_page is not None:
+                    query = query.limit(per_page).offset(((page or 1) - 1) * per_page)
+
+                rows = db.session.execute(query).all()
+
+                if rows:
+                    total = rows[0].total
+                elif page is not None and page > 1:
+                    count_query = db.select(func.count(PartnerGroups.partner_group_id))
+                    if prefix:
+                        count_query = count_query.where(
+                            PartnerGroups.partner_group_name.istartswith(prefix, autoescape=True)
+                        )
+                    total = db.session.execute(count_query).scalar_one()
+                else:
+                    total = 0
+
+                return {
+                    "total": total,
+                    "groups": [
+                        {
+                            "groupname": row.partner_group_name,
+                            "members_count": row.members_count,
+                            "created_at": row.created_at.isoformat() if row.created_at else None,
+                            "last_modified": row.last_modified.isoformat() if row.last_modified else None
+                        } for row in rows
+                    ]
+                }
+
+            if prefix:
+                summary = load_summary(page, per_page)
+            else:
+                summary = partners_cache.get_or_load(("summary",), load_summary)
+                if per_page is not None:
+                    offset = ((page or 1) - 1) * per_page
+                    summary = {"total": summary["total"], "groups": summary["groups"][offset:offset + per_page]}
+
+            return {
+                "status": "success",
+                "message": "Группы найдены." if summary["groups"] else "Группы не найдены.",
+                "groups": summary["groups"],
+                "total": summary["total"],
+                "page": page,
+                "per_page": per_page
+            }
+
+        except Exception as e:
+            logging.error(f"Ошибка получения сводки по группам партнеров: {e}")
+            return {
+                "status": "error",
+                "message": "Ошибка получения сводки по группам партнеров"
+            }
+
     @track_operation("partners-group-create", "partners")
     @staticmethod
     def add_new_group(data: dict[str, str]) -> dict[str, Any]:
@@ -109,6 +277,7 @@ class PartnersService:
                 partner_group_name=group_name,
                 created_at=datetime.now()
             )
+            partners_cache.invalidate()
 
             return {"status": "success","message": "Группа успешно создана"}
         except Exception as e:
@@ -133,6 +302,7 @@ class PartnersService:
                 }
 
             partner_group.delete()
+            partners_cache.invalidate()
 
             return {"status": "success", "message": "Группа успешно удалена"}
         except Exception as e:
@@ -157,7 +327,9 @@ class PartnersService:
                     "message": f"Группа {partner_group} не найдена."
                 }
 
-            PartnersEmails.create(partner_email=partner_email, partner_group_id=group_name.partner_group_id)
+            summary = PartnersService._apply_members_diff(group_name.partner_group_id, [partner_email], [])
+            if not summary["added_count"]:
+                return {"status": "success", "message": "Пользователь уже состоит в группе."}
 
             return {"status": "success", "message": "Пользователь успешно добавлен."}
         except Exception as e:
@@ -183,29 +355,14 @@ class PartnersService:
             if not group:
                 return {"status": "error", "message": f"Группа '{groupname}' не найдена"}
 
-            for email in removed_partners:
-                partner = PartnersEmails.get_by_filter(
-                    partner_email=email,
-                    partner_group_id=group.partner_group_id
-                )
-                if partner:
-                    partner.delete()
-                    logging.info(f"Удален партнер {email} из группы {groupname}")
-                else:
-                    logging.warning(f"Партнер {email} не найден в группе {groupname}")
-
-            existing_partners = PartnersEmails.get_all_by_filter(partner_group_id=group.partner_group_id)
-            existing_emails = {p.partner_email for p in existing_partners}
-
-            for email in current_partners:
-                if email not in existing_emails:
-                    PartnersEmails.create(
-                        partner_email=email,
-                        partner_group_id=group.partner_group_id
-                    )
-                    logging.info(f"Добавлен отсутствующий партнер {email} в группу {groupname}")
+            summary = PartnersService._apply_members_diff(
+                group.partner_group_id, current_partners, removed_partners
+            )
+            logging.info(
+                f"Группа {groupname}: добавлено {summary['added_count']}, удалено {summary['removed_count']}"
+            )
 
-            return {"status": "success", "message": "Изменения успешно сохранены"}
+            return {"status": "success", "message": "Изменения успешно сохранены", "summary": summary}
 
         except Exception as e:
             logging.error(f"Ошибка обновления списка участников группы: {e}")
@@ -214,6 +371,7 @@ class PartnersService:
                 "message": "Ошибка обновления информации о партнере"
             }
 
+    @track_operation("partners-group-members-upload", "partners")
     @staticmethod
     def update_partner_emails_from_file(data: dict[str, Any]) -> dict[str, Any]:
         """Метод добавления почтовых адресов по списку из входящего файла."""
@@ -233,34 +391,90 @@ class PartnersService:
             if not emails:
                 return {"status": "error", "message": "В файле не найдено корректных email адресов"}
 
-            existing_partners_result = PartnersService.get_group_members(groupname)
-            existing_emails = []
-
-            if existing_partners_result.get('partners'):
-                existing_emails = [p['email'] for p in existing_partners_result['partners']]
-
-            all_emails = list(set(existing_emails + emails))
-
-            update_data = {
-                "groupname": groupname,
-                "partners": all_emails,
-                "removed_partners": []
-            }
+            group = PartnerGroups.get_by_filter(partner_group_name=groupname)
+            if not group:
+                return {"status": "error", "message": f"Группа '{groupname}' не найдена"}
 
-            result = PartnersService.update_partner_info(update_data)
+            summary = PartnersService._apply_members_diff(group.partner_group_id, emails, [])
 
-            if result.get("status") == "success":
-                added_count = len(emails) - len([e for e in emails if e in existing_emails])
-                if added_count > 0:
-                    result["message"] = f"Добавлено новых пользователей: {added_count}"
-                else:
-                    result["message"] = "Все пользователи из файла уже существуют в группе"
+            if summary["added_count"] > 0:
+                message = f"Добавлено новых пользователей: {summary['added_count']}"
+            else:
+                message = "Все пользователи из файла уже существуют в группе"
 
-            return result
+            return {"status": "success", "message": message, "summary": summary}
 
         except Exception as e:
             logging.error(f"Ошибка загрузки файла: {e}")
             return {
                 "status": "error",
                 "message": "Ошибка загрузки файла"
-            }
\ No newline at end of file
+            }
+
+    @staticmethod
+    def _apply_members_diff(group_id: int, added_emails: list[str], removed_emails: list[str]) -> dict[str, Any]:
+        """
+        Внутренний метод пакетного изменения состава группы в одной транзакции.
+
+        Удаление выполняется одним запросом DELETE ... WHERE email = ANY(...), добавление -
+        INSERT ... ON CONFLICT DO NOTHING пачками по MEMBERS_BATCH_SIZE строк.
+
+        Args:
+            group_id: ID группы партнеров
+            added_emails: Почтовые адреса, которые должны присутствовать в группе
+            removed_emails: Почтовые адреса для удаления из группы
+
+        Returns:
+            Сводка изменений: добавленные, удаленные и пропущенные (уже существующие) адреса
+        """
+        removed_set = set(removed_emails)
+        to_add = list(dict.fromkeys(email for email in added_emails if email not in removed_set))
+        to_remove = list(removed_set)
+
+        removed = []
+        added = []
+
+        try:
+            if to_remove:
+                delete_stmt = (
+                    delete(PartnersEmails)
+                    .where(
+                        PartnersEmails.partner_group_id == group_id,
+                        PartnersEmails.partner_email == any_(bindparam("removed_emails", to_remove, type_=ARRAY(db.String)))
+                    )
+                    .returning(PartnersEmails.partner_email)
+                )
+                removed = list(db.session.execute(delete_stmt).scalars())
+
+            for i in range(0, len(to_add), MEMBERS_BATCH_SIZE):
+                batch = to_add[i:i + MEMBERS_BATCH_SIZE]
+                insert_stmt = (
+                    insert(PartnersEmails)
+                    .values([{"partner_email": email, "partner_group_id": group_id} for email in batch])
+                    .on_conflict_do_nothing(constraint="uq_sbs_partners_group_email")
+                    .returning(PartnersEmails.partner_email)
+                )
+                added.extend(db.session.execute(insert_stmt).scalars())
+
+            if added or removed:
+                db.session.execute(
+                    update(PartnerGroups)
+                    .where(PartnerGroups.partner_group_id == group_id)
+                    .values(updated_at=datetime.now())
+                )
+
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            raise
+        finally:
+            partners_cache.invalidate()
+
+        return {
+            "added": sorted(added),
+            "removed": sorted(removed),
+            "added_count": len(added),
+            "removed_count": len(removed),
+            "skipped_count": len(to_add) - len(added),
+            "not_found_count": len(to_remove) - len(removed)
+        }
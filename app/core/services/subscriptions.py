@@ -1,18 +1,79 @@
 import logging
+from dataclasses import dataclass, field
 from flask_login import current_user
 from typing import Any
 
 from app.core.monitoring.decorators import track_operation
 from app.core.models.subscriptions import Subscriptions
+from app.extensions import subscriptions_cache
+
+
+@dataclass(frozen=True)
+class SubscriptionItem:
+    """Элемент каталога подписок (отвязан от сессии БД, безопасен для кэширования)."""
+
+    sub_id: int
+    sub_name: str
+    sub_description: str
+
+
+@dataclass(frozen=True)
+class SubscriptionCatalog:
+    """Каталог подписок с индексами по имени и ID."""
+
+    items: tuple[SubscriptionItem, ...]
+    ids_by_name: dict[str, int] = field(default_factory=dict)
+    names_by_id: dict[int, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_items(cls, items: list[SubscriptionItem]) -> 'SubscriptionCatalog':
+        """Создает каталог из списка элементов с построением индексов."""
+        return cls(
+            items=tuple(items),
+            ids_by_name={item.sub_name: item.sub_id for item in items},
+            names_by_id={item.sub_id: item.sub_name for item in items}
+        )
+
+    def ids_for_names(self, names: list[str]) -> list[int]:
+        """
+        Метод получения ID подписок по списку имен.
+
+        Args:
+            names: Лист имен подписок
+
+        Returns:
+            Лист ID найденных подписок (неизвестные имена пропускаются)
+        """
+        return [self.ids_by_name[name] for name in names if name in self.ids_by_name]
 
 
 class SubscriptionsService:
     """Класс обработки операций над подписками."""
 
     @staticmethod
-    def get_all_subscriptions() -> list[Subscriptions]:
+    def get_catalog() -> SubscriptionCatalog:
+        """Метод получения каталога подписок через кэш."""
+        def load_catalog() -> SubscriptionCatalog:
+            subs = Subscriptions.get_all_ordered('sub_id', 'asc')
+            return SubscriptionCatalog.from_items([
+                SubscriptionItem(
+                    sub_id=sub.sub_id,
+                    sub_name=sub.sub_name,
+                    sub_description=sub.sub_description or ""
+                ) for sub in subs
+            ])
+
+        return subscriptions_cache.get_or_load("catalog", load_catalog)
+
+    @staticmethod
+    def invalidate_catalog() -> None:
+        """Метод инвалидации каталога подписок во всех процессах."""
+        subscriptions_cache.invalidate()
+
+    @staticmethod
+    def get_all_subscriptions() -> tuple[SubscriptionItem, ...]:
         """Метод получение списка доступных подписок."""
-        return Subscriptions.get_all()
+        return SubscriptionsService.get_catalog().items
 
     @staticmethod
     def get_subs_list() -> list | dict[str, Any]:
@@ -41,7 +102,7 @@ class SubscriptionsService:
     def load_user_subscriptions() -> dict[str, Any]:
         """Метод загрузки настроек подписок пользователя."""
         try:
-            subscriptions = Subscriptions.get_all()
+            subscriptions = SubscriptionsService.get_all_subscriptions()
 
             subscription_data = current_user.subscriptions
             off_hours = current_user.night_notifications_enabled
@@ -0,0 +1,230 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import redis
+from flask import Flask
+
+
+class UploadJanitor:
+    """
+    Менеджер фоновой очистки вложений - Flask Extension.
+
+    Фоновый поток по расписанию выполняет очистку каталога вложений:
+    - удаляет временные вложения (без привязки к CRQ) старше UPLOAD_TEMP_TTL пакетами по batch_size строк
+      (DELETE ... RETURNING), с освобождением файлов после коммита каждого пакета;
+    - сверяет файлы UPLOAD_FOLDER со строками CRQAttachments и удаляет файлы без ссылок (например, оставшиеся
+      после каскадного удаления CRQ или сбоя при сохранении вложения); файлы моложе grace_period не проверяются,
+      так как ссылка на них может быть еще не закоммичена;
+    - удаляет истекшие незавершенные загрузки по частям и архивы вложений, не использовавшиеся дольше bundle_ttl.
+    Одновременно очистку выполняет только один процесс (блокировка в Redis).
+    """
+
+    def __init__(self) -> None:
+        self.app: Flask | None = None
+        self.enabled: bool = False
+        self.interval: int = 3600
+        self.batch_size: int = 500
+        self.temp_ttl: int = 86400
+        self.grace_period: int = 3600
+        self.bundle_ttl: int = 7 * 86400
+        self.redis_client: redis.Redis | None = None
+
+        self.lock_key: str = "sbs_upload_janitor_lock"
+
+        self.worker_thread: threading.Thread | None = None
+        self._shutdown_event: threading.Event = threading.Event()
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Инициализация расширения в контексте Flask app.
+
+        Args:
+            app: Экземпляр приложения Flask
+        """
+        self.app = app
+        self.enabled = app.config.get("UPLOAD_JANITOR_ENABLED", False)
+        self.interval = app.config.get("UPLOAD_JANITOR_INTERVAL", self.interval)
+        self.batch_size = app.config.get("UPLOAD_JANITOR_BATCH_SIZE", self.batch_size)
+        self.temp_ttl = app.config.get("UPLOAD_TEMP_TTL", self.temp_ttl)
+        self.grace_period = app.config.get("UPLOAD_JANITOR_GRACE_PERIOD", self.grace_period)
+        self.bundle_ttl = app.config.get("ATTACHMENT_BUNDLE_TTL", self.bundle_ttl)
+        app.extensions["upload_janitor"] = self
+
+        try:
+            self.redis_client = redis.from_url(
+                app.config["REDIS_URL"],
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True,
+                health_check_interval=30
+            )
+            self.redis_client.ping()
+        except Exception as e:
+            logging.warning(f"Redis недоступен, очистка вложений выполняется без распределенной блокировки: {e}")
+            self.redis_client = None
+
+        if self.enabled:
+            self.start_worker()
+
+    def start_worker(self) -> None:
+        """Запуск потока очистки вложений в фоновом режиме"""
+        if self.worker_thread and self.worker_thread.is_alive():
+            return
+
+        self._shutdown_event.clear()
+        self.worker_thread = threading.Thread(
+            target=self._worker_loop,
+            daemon=True,
+            name="UploadJanitor"
+        )
+        self.worker_thread.start()
+        logging.info("Поток очистки вложений запущен")
+
+    def stop_worker(self) -> None:
+        """Завершение работы потока очистки вложений"""
+        self._shutdown_event.set()
+        if self.worker_thread and self.worker_thread.is_alive():
+            self.worker_thread.join(timeout=10)
+
+    def run(self) -> dict[str, int] | None:
+        """
+        Метод однократной очистки под распределенной блокировкой (без блокировки, если Redis недоступен).
+
+        Returns:
+            Количество удаленных временных вложений, файлов без ссылок, незавершенных загрузок и архивов,
+            или None, если очистку выполняет другой процесс
+        """
+        lock = None
+        if self.redis_client is not None:
+            lock = self.redis_client.lock(self.lock_key, timeout=max(self.interval, 600))
+            if not lock.acquire(blocking=False):
+                return None
+
+        try:
+            from app.core.services.attachment_bundle import AttachmentBundleService
+            from app.core.services.uploads import ChunkedUploadService
+
+            result = {
+                "temporary": self._purge_temporary_attachments(),
+                "orphaned": self._reconcile_files(),
+                "uploads": ChunkedUploadService.cleanup_expired(),
+                "bundles": AttachmentBundleService.cleanup_stale(self.bundle_ttl)
+            }
+
+            if any(result.values()):
+                logging.info(
+                    f"Очистка вложений: временных вложений - {result['temporary']}, "
+                    f"файлов без ссылок - {result['orphaned']}, незавершенных загрузок - {result['uploads']}, "
+                    f"архивов - {result['bundles']}"
+                )
+
+            return result
+        finally:
+            if lock is not None:
+                try:
+                    lock.release()
+                except redis.exceptions.LockError:
+                    logging.warning("Блокировка очистки вложений истекла до завершения очистки")
+
+    def _purge_temporary_attachments(self) -> int:
+        """
+        Внутренний метод пакетного удаления истекших временных вложений.
+
+        Каждый пакет удаляется отдельной короткой транзакцией; строки, заблокированные запросами
+        (например, привязываемые к CRQ), пропускаются до следующего запуска.
+
+        Returns:
+            Количество удаленных вложений
+        """
+        from app.core.models.crq_attachments import CRQAttachments
+        from app.core.services.attachment_store import AttachmentStore
+        from app.extensions import db
+
+        cutoff = datetime.now() - timedelta(seconds=self.temp_ttl)
+        deleted = 0
+
+        while not self._shutdown_event.is_set():
+            expired_ids = (
+                db.select(CRQAttachments.id)
+                .where(CRQAttachments.crq_number.is_(None), CRQAttachments.upload_date < cutoff)
+                .order_by(CRQAttachments.id.asc())
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+
+            encoded_filenames = db.session.execute(
+                db.delete(CRQAttachments)
+                .where(CRQAttachments.id.in_(expired_ids))
+                .returning(CRQAttachments.encoded_filename)
+                .execution_options(synchronize_session=False)
+            ).scalars().all()
+            db.session.commit()
+
+            if not encoded_filenames:
+                break
+
+            AttachmentStore.release(set(encoded_filenames))
+            db.session.commit()
+
+            deleted += len(encoded_filenames)
+            if len(encoded_filenames) < self.batch_size:
+                break
+
+        return deleted
+
+    def _reconcile_files(self) -> int:
+        """
+        Внутренний метод удаления файлов UPLOAD_FOLDER, на которые не ссылается ни одно вложение.
+
+        Returns:
+            Количество удаленных файлов
+        """
+        from app.core.services.attachment_store import AttachmentStore
+        from app.extensions import db
+
+        cutoff = time.time() - self.grace_period
+        removed = 0
+        batch: set[str] = set()
+
+        with os.scandir(self.app.config["UPLOAD_FOLDER"]) as entries:
+            for entry in entries:
+                if self._shutdown_event.is_set():
+                    break
+                # Служебные каталоги и файлы (незавершенные загрузки) обрабатываются отдельно
+                if entry.name.startswith(".") or not entry.is_file(follow_symlinks=False):
+                    continue
+                if entry.stat().st_mtime > cutoff:
+                    continue
+
+                batch.add(entry.name)
+                if len(batch) >= self.batch_size:
+                    removed += len(AttachmentStore.release(batch))
+                    db.session.commit()
+                    batch = set()
+
+        if batch:
+            removed += len(AttachmentStore.release(batch))
+            db.session.commit()
+
+        return removed
+
+    def _worker_loop(self) -> None:
+        """Основной цикл потока очистки вложений"""
+        while not self._shutdown_event.is_set():
+            try:
+                with self.app.app_context():
+                    from app.extensions import db
+
+                    try:
+                        self.run()
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                logging.error(f"Ошибка фоновой очистки вложений: {e}")
+
+            self._shutdown_event.wait(self.interval)
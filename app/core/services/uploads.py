@@ -0,0 +1,615 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, BinaryIO
+
+from flask import current_app
+from werkzeug.datastructures import FileStorage
+
+from app.core.models.crq_attachments import CRQAttachments
+from app.core.models.crq_processed import CRQProcessed
+from app.core.services.attachment_bundle import AttachmentBundleService
+from app.core.services.attachment_store import AttachmentStore
+from app.extensions import db, calendar_cache
+
+STREAM_BUFFER_SIZE = 64 * 1024
+UPLOADS_DIRECTORY = ".uploads"
+SHA256_PATTERN = re.compile(r"[0-9a-fA-F]{64}")
+
+# Состояние SHA-256 незавершенных загрузок процесса: upload_id -> (количество обработанных байт, хэш)
+_hashers: dict[str, tuple[int, Any]] = {}
+_hashers_lock = threading.Lock()
+
+
+class UploadLimitError(ValueError):
+    """Превышение ограничения на размер загружаемых данных."""
+
+
+def stream_to_file(stream: BinaryIO, file: BinaryIO, hasher: Any, max_size: int | None = None) -> int:
+    """
+    Метод потокового копирования данных в файл с инкрементальным вычислением хэша.
+
+    Данные читаются и записываются блоками по 64 КБ, поэтому загрузка не буферизуется в памяти целиком,
+    а чтение сокета отдает управление другим запросам eventlet.
+
+    Args:
+        stream: Источник данных
+        file: Файл, открытый на запись
+        hasher: Объект хэша (hashlib), обновляемый записанными данными
+        max_size: Максимальное количество байт (None - без ограничения)
+
+    Returns:
+        Количество записанных байт
+
+    Raises:
+        UploadLimitError: Данных больше, чем max_size
+    """
+    written = 0
+
+    while True:
+        buffer = stream.read(STREAM_BUFFER_SIZE)
+        if not buffer:
+            break
+
+        written += len(buffer)
+        if max_size is not None and written > max_size:
+            raise UploadLimitError("Превышен допустимый размер загружаемых данных.")
+
+        file.write(buffer)
+        hasher.update(buffer)
+
+    return written
+
+
+def save_uploaded_file(file: FileStorage) -> tuple[str, str, int]:
+    """
+    Метод потокового сохранения файла из формы в хранилище вложений с вычислением SHA-256.
+
+    Файл записывается во временный файл каталога незавершенных загрузок и переносится в хранилище;
+    если файл с тем же содержимым уже сохранен, возвращается его имя.
+
+    Args:
+        file: Файл из формы
+
+    Returns:
+        Имя сохраненного файла, SHA-256 содержимого и размер файла в байтах
+
+    Raises:
+        UploadLimitError: Файл превышает UPLOAD_MAX_FILE_SIZE
+    """
+    temp_path = os.path.join(_uploads_dir(), f"{uuid.uuid4().hex}.tmp")
+    hasher = hashlib.sha256()
+
+    try:
+        with open(temp_path, "wb") as f:
+            size = stream_to_file(file.stream, f, hasher, current_app.config["UPLOAD_MAX_FILE_SIZE"])
+
+        content_hash = hasher.hexdigest()
+        encoded_filename = AttachmentStore.store(temp_path, content_hash)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return encoded_filename, content_hash, size
+
+
+class ChunkedUploadService:
+    """
+    Класс сервиса возобновляемой загрузки вложений CRQ по частям.
+
+    Загрузка создается с указанием имени и размера файла, после чего клиент последовательно отправляет части
+    с указанием смещения. Части потоково дописываются в файл <UPLOAD_FOLDER>/.uploads/<id>.part, SHA-256
+    вычисляется инкрементально. После разрыва соединения клиент запрашивает текущее смещение и продолжает загрузку.
+    Завершенная загрузка переносится в хранилище вложений (AttachmentStore) и сохраняется как вложение CRQAttachments
+    (временное, либо сразу привязанное к CRQ). Повторно загруженное содержимое хранится одним файлом: поиск в хранилище
+    выполняется только по SHA-256, вычисленному сервером по полученным данным.
+    """
+
+    @staticmethod
+    def create_upload(filename: str, size: int, user_id: int, sha256: str | None = None) -> dict[str, Any]:
+        """
+        Метод создания загрузки.
+
+        Args:
+            filename: Исходное имя файла
+            size: Размер файла в байтах
+            user_id: ID пользователя, выполняющего загрузку
+            sha256: Ожидаемый SHA-256 файла для проверки при завершении (опционально)
+
+        Returns:
+            Объект типа словарь с ID загрузки, текущим смещением и рекомендуемым размером части
+        """
+        try:
+            filename = os.path.basename((filename if isinstance(filename, str) else "").replace("\\", "/")).strip()
+            if not filename:
+                return {
+                    "status": "rejected",
+                    "message": "Необходимо указать имя файла."
+                }
+            if not isinstance(size, int) or size < 0:
+                return {
+                    "status": "rejected",
+                    "message": "Необходимо указать размер файла в байтах."
+                }
+            if sha256 is not None and not (isinstance(sha256, str) and SHA256_PATTERN.fullmatch(sha256)):
+                return {
+                    "status": "rejected",
+                    "message": "SHA-256 файла должен быть строкой из 64 шестнадцатеричных символов."
+                }
+
+            max_file_size = current_app.config["UPLOAD_MAX_FILE_SIZE"]
+            if size > max_file_size:
+                return {
+                    "status": "too_large",
+                    "message": f"Файл превышает максимальный размер {max_file_size // (1024 * 1024)} МБ."
+                }
+
+            max_pending_size = current_app.config["UPLOAD_MAX_PENDING_SIZE"]
+            if ChunkedUploadService._pending_size() + size > max_pending_size:
+                return {
+                    "status": "too_large",
+                    "message": "Превышен общий объем незавершенных загрузок. Повторите попытку позже."
+                }
+
+            upload_id = uuid.uuid4().hex
+            meta = {
+                "upload_id": upload_id,
+                "filename": filename,
+                "size": size,
+                "sha256": sha256.lower() if sha256 else None,
+                "user_id": user_id,
+                "created_at": time.time()
+            }
+
+            uploads_dir = _uploads_dir()
+            with open(os.path.join(uploads_dir, f"{upload_id}.part"), "wb"):
+                pass
+            with open(os.path.join(uploads_dir, f"{upload_id}.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+
+            with _hashers_lock:
+                _hashers[upload_id] = (0, hashlib.sha256())
+
+            return {
+                "status": "success",
+                "upload_id": upload_id,
+                "offset": 0,
+                "size": size,
+                "chunk_size": current_app.config["UPLOAD_CHUNK_SIZE"]
+            }
+
+        except Exception as e:
+            logging.error(f"Ошибка создания загрузки файла: {e}")
+            db.session.rollback()
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
+    @staticmethod
+    def get_upload(upload_id: str, user_id: int) -> dict[str, Any]:
+        """
+        Метод получения состояния загрузки (для возобновления после разрыва соединения).
+
+        Args:
+            upload_id: ID загрузки
+            user_id: ID пользователя, выполняющего загрузку
+
+        Returns:
+            Объект типа словарь с текущим смещением и размером файла
+        """
+        meta = ChunkedUploadService._load_meta(upload_id, user_id)
+        if meta is None:
+            return {
+                "status": "not_found",
+                "message": "Загрузка не найдена."
+            }
+
+        return {
+            "status": "success",
+            "upload_id": upload_id,
+            "filename": meta["filename"],
+            "offset": os.path.getsize(_part_path(upload_id)),
+            "size": meta["size"]
+        }
+
+    @staticmethod
+    def append_chunk(upload_id: str, user_id: int, offset: int, stream: BinaryIO,
+                     content_length: int | None) -> dict[str, Any]:
+        """
+        Метод потоковой записи части файла.
+
+        Часть принимается только по текущему смещению загрузки; при несовпадении возвращается текущее смещение,
+        с которого клиент должен продолжить.
+
+        Args:
+            upload_id: ID загрузки
+            user_id: ID пользователя, выполняющего загрузку
+            offset: Смещение части в файле
+            stream: Поток тела запроса
+            content_length: Размер части в байтах
+
+        Returns:
+            Объект типа словарь с новым смещением загрузки
+        """
+        meta = ChunkedUploadService._load_meta(upload_id, user_id)
+        if meta is None:
+            return {
+                "status": "not_found",
+                "message": "Загрузка не найдена."
+            }
+
+        if content_length is None:
+            return {
+                "status": "rejected",
+                "message": "Необходимо указать размер части (Content-Length)."
+            }
+
+        max_chunk_size = current_app.config["UPLOAD_CHUNK_SIZE"] * 2
+        if content_length > max_chunk_size:
+            return {
+                "status": "too_large",
+                "message": f"Часть превышает максимальный размер {max_chunk_size} байт."
+            }
+
+        part_path = _part_path(upload_id)
+
+        try:
+            with open(part_path, "ab") as part_file:
+                try:
+                    fcntl.flock(part_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return {
+                        "status": "conflict",
+                        "message": "Часть этой загрузки уже записывается.",
+                        "offset": os.path.getsize(part_path)
+                    }
+
+                current_offset = part_file.seek(0, os.SEEK_END)
+                if offset != current_offset:
+                    return {
+                        "status": "conflict",
+                        "message": "Смещение части не совпадает с текущим смещением загрузки.",
+                        "offset": current_offset
+                    }
+
+                if current_offset + content_length > meta["size"]:
+                    return {
+                        "status": "too_large",
+                        "message": "Часть выходит за пределы заявленного размера файла."
+                    }
+
+                hasher = _get_hasher(upload_id, current_offset)
+                try:
+                    stream_to_file(stream, part_file, hasher, content_length)
+                    part_file.flush()
+                except Exception:
+                    # Частично записанная часть отбрасывается, чтобы клиент повторил ее целиком
+                    part_file.truncate(current_offset)
+                    with _hashers_lock:
+                        _hashers.pop(upload_id, None)
+                    raise
+
+                new_offset = part_file.tell()
+                with _hashers_lock:
+                    _hashers[upload_id] = (new_offset, hasher)
+
+            return {
+                "status": "success",
+                "upload_id": upload_id,
+                "offset": new_offset,
+                "size": meta["size"]
+            }
+
+        except Exception as e:
+            logging.error(f"Ошибка записи части загрузки {upload_id}: {e}")
+            return {
+                "status": "error",
+                "message": str(e),
+                "offset": os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            }
+
+    @staticmethod
+    def complete_upload(upload_id: str, user_id: int, crq_number: str | None = None) -> dict[str, Any]:
+        """
+        Метод завершения загрузки: проверка размера и хэша, перенос файла в хранилище и создание вложения.
+
+        Args:
+            upload_id: ID загрузки
+            user_id: ID пользователя, выполняющего загрузку
+            crq_number: Номер CRQ для привязки вложения (None - временное вложение)
+
+        Returns:
+            Объект типа словарь с данными созданного вложения
+        """
+        meta = ChunkedUploadService._load_meta(upload_id, user_id)
+        if meta is None:
+            return {
+                "status": "not_found",
+                "message": "Загрузка не найдена."
+            }
+
+        part_path = _part_path(upload_id)
+        offset = os.path.getsize(part_path)
+        if offset != meta["size"]:
+            return {
+                "status": "conflict",
+                "message": "Файл загружен не полностью.",
+                "offset": offset
+            }
+
+        try:
+            crq = None
+            if crq_number:
+                crq = CRQProcessed.get_by_filter(crq_number=crq_number)
+                if not crq:
+                    return {
+                        "status": "not_found",
+                        "message": "CRQ не найден."
+                    }
+
+            content_hash = _get_hasher(upload_id, offset).hexdigest()
+            if meta.get("sha256") and meta["sha256"] != content_hash:
+                ChunkedUploadService.abort_upload(upload_id, user_id)
+                return {
+                    "status": "rejected",
+                    "message": "Контрольная сумма файла не совпадает, загрузите файл повторно."
+                }
+
+            # Загруженная часть переносится в хранилище (или удаляется, если содержимое уже сохранено),
+            # поэтому после этого загрузку нельзя повторить
+            encoded_filename = AttachmentStore.store(part_path, content_hash)
+            ChunkedUploadService._discard(upload_id)
+
+            return {
+                "status": "success",
+                "data": ChunkedUploadService._create_attachment(
+                    meta["filename"], encoded_filename, content_hash, offset, crq
+                )
+            }
+
+        except Exception as e:
+            logging.error(f"Ошибка завершения загрузки {upload_id}: {e}")
+            db.session.rollback()
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
+    @staticmethod
+    def abort_upload(upload_id: str, user_id: int) -> dict[str, Any]:
+        """
+        Метод отмены загрузки с удалением загруженных частей.
+
+        Args:
+            upload_id: ID загрузки
+            user_id: ID пользователя, выполняющего загрузку
+
+        Returns:
+            Статус операции
+        """
+        if ChunkedUploadService._load_meta(upload_id, user_id) is None:
+            return {
+                "status": "not_found",
+                "message": "Загрузка не найдена."
+            }
+
+        ChunkedUploadService._discard(upload_id)
+        try:
+            os.remove(_part_path(upload_id))
+        except FileNotFoundError:
+            pass
+
+        return {
+            "status": "success",
+            "message": "Загрузка отменена"
+        }
+
+    @staticmethod
+    def cleanup_expired() -> int:
+        """
+        Метод удаления истекших незавершенных загрузок и оставшихся временных файлов.
+
+        Returns:
+            Количество удаленных загрузок
+        """
+        ttl = current_app.config["UPLOAD_SESSION_TTL"]
+        uploads_dir = _uploads_dir()
+        now = time.time()
+        removed = 0
+
+        for entry in os.scandir(uploads_dir):
+            upload_id, extension = os.path.splitext(entry.name)
+
+            if extension == ".json":
+                try:
+                    with open(entry.path, encoding="utf-8") as f:
+                        created_at = json.load(f).get("created_at", 0)
+                except (OSError, ValueError):
+                    created_at = entry.stat().st_mtime
+                if now - created_at <= ttl:
+                    continue
+
+                ChunkedUploadService._discard(upload_id)
+                try:
+                    os.remove(_part_path(upload_id))
+                except FileNotFoundError:
+                    pass
+                removed += 1
+
+            elif extension in (".part", ".tmp"):
+                # Файлы загрузок без метаданных и временные файлы прерванных загрузок из формы
+                if extension == ".part" and os.path.exists(os.path.join(uploads_dir, f"{upload_id}.json")):
+                    continue
+                try:
+                    if now - entry.stat().st_mtime > ttl:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+        return removed
+
+    @staticmethod
+    def _create_attachment(filename: str, encoded_filename: str, content_hash: str, size: int,
+                           crq: CRQProcessed | None) -> dict[str, Any]:
+        """
+        Внутренний метод создания вложения, ссылающегося на файл хранилища.
+
+        Коммит освобождает блокировку хранилища, взятую при размещении или поиске файла.
+
+        Args:
+            filename: Исходное имя файла
+            encoded_filename: Имя файла в хранилище
+            content_hash: SHA-256 содержимого
+            size: Размер файла в байтах
+            crq: CRQ для привязки вложения (None - временное вложение)
+
+        Returns:
+            Данные созданного вложения
+        """
+        attachment = CRQAttachments(
+            crq_number=crq.id if crq else None,
+            original_filename=filename,
+            encoded_filename=encoded_filename,
+            upload_date=datetime.now(),
+            content_hash=content_hash,
+            file_size=size
+        )
+        db.session.add(attachment)
+        db.session.commit()
+
+        if crq:
+            calendar_cache.invalidate([crq.crq_number])
+            AttachmentBundleService.schedule_build(crq.id)
+
+        return attachment.to_dict()
+
+    @staticmethod
+    def _load_meta(upload_id: str, user_id: int) -> dict[str, Any] | None:
+        """
+        Внутренний метод чтения метаданных загрузки с проверкой владельца.
+
+        Args:
+            upload_id: ID загрузки
+            user_id: ID пользователя, выполняющего загрузку
+
+        Returns:
+            Метаданные загрузки, или None если загрузка не найдена, истекла или принадлежит другому пользователю
+        """
+        if not upload_id or not upload_id.isalnum():
+            return None
+
+        try:
+            with open(os.path.join(_uploads_dir(), f"{upload_id}.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not os.path.exists(_part_path(upload_id)):
+            return None
+        if time.time() - meta["created_at"] > current_app.config["UPLOAD_SESSION_TTL"]:
+            return None
+
+        return meta if meta.get("user_id") == user_id else None
+
+    @staticmethod
+    def _pending_size() -> int:
+        """
+        Внутренний метод подсчета заявленного объема незавершенных загрузок.
+
+        Returns:
+            Суммарный размер файлов активных загрузок в байтах
+        """
+        ttl = current_app.config["UPLOAD_SESSION_TTL"]
+        uploads_dir = _uploads_dir()
+        total = 0
+
+        for entry in os.scandir(uploads_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path, encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            if time.time() - meta.get("created_at", 0) <= ttl:
+                total += meta.get("size", 0)
+
+        return total
+
+    @staticmethod
+    def _discard(upload_id: str) -> None:
+        """
+        Внутренний метод удаления метаданных и состояния хэша загрузки.
+
+        Args:
+            upload_id: ID загрузки
+        """
+        with _hashers_lock:
+            _hashers.pop(upload_id, None)
+
+        try:
+            os.remove(os.path.join(_uploads_dir(), f"{upload_id}.json"))
+        except FileNotFoundError:
+            pass
+
+
+def _uploads_dir() -> str:
+    """Метод получения (и создания при отсутствии) каталога незавершенных загрузок."""
+    uploads_dir = os.path.join(current_app.config["UPLOAD_FOLDER"], UPLOADS_DIRECTORY)
+    os.makedirs(uploads_dir, exist_ok=True)
+    return uploads_dir
+
+
+def _part_path(upload_id: str) -> str:
+    """
+    Метод получения пути к файлу загружаемых частей.
+
+    Args:
+        upload_id: ID загрузки
+
+    Returns:
+        Путь к файлу
+    """
+    return os.path.join(_uploads_dir(), f"{upload_id}.part")
+
+
+def _get_hasher(upload_id: str, offset: int) -> Any:
+    """
+    Метод получения состояния SHA-256 загрузки на указанном смещении.
+
+    Если загрузка продолжается в другом процессе или после перезапуска, хэш пересчитывается
+    по уже загруженной части файла.
+
+    Args:
+        upload_id: ID загрузки
+        offset: Текущее смещение загрузки
+
+    Returns:
+        Объект хэша SHA-256
+    """
+    with _hashers_lock:
+        cached = _hashers.get(upload_id)
+    if cached and cached[0] == offset:
+        return cached[1]
+
+    hasher = hashlib.sha256()
+    with open(_part_path(upload_id), "rb") as part_file:
+        remaining = offset
+        while remaining > 0:
+            buffer = part_file.read(min(STREAM_BUFFER_SIZE, remaining))
+            if not buffer:
+                break
+            hasher.update(buffer)
+            remaining -= len(buffer)
+
+    return hasher
@@ -0,0 +1,81 @@
+import functools
+import hashlib
+import json
+import time
+from typing import Any, Callable, TypeVar
+from flask import request, make_response, Response
+
+from app.core.services.cache import VersionedCache
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+
+def conditional_response(*caches: VersionedCache, extra: Callable[[], Any] | None = None):
+    """
+    Декоратор условных ответов (ETag / If-None-Match) для read-only JSON эндпоинтов.
+
+    ETag вычисляется до вызова обработчика из версий указанных кэшей, эндпоинта и параметров запроса,
+    поэтому при совпадении с If-None-Match ответ 304 отдается без обращения к БД и сериализации.
+
+    Args:
+        caches: Кэши, версии которых определяют актуальность ответа
+        extra: Функция получения дополнительных данных, влияющих на ответ (например, настроек пользователя)
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> Any:
+            etag = _compute_etag(caches, extra)
+
+            if request.if_none_match.contains(etag):
+                not_modified = Response(status=304)
+                _set_validators(not_modified, etag)
+                return not_modified
+
+            response = make_response(func(*args, **kwargs))
+            if response.status_code == 200:
+                _set_validators(response, etag)
+
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _compute_etag(caches: tuple[VersionedCache, ...], extra: Callable[[], Any] | None) -> str:
+    """
+    Метод вычисления сильного ETag по версиям кэшей и параметрам запроса.
+
+    Args:
+        caches: Кэши, версии которых определяют актуальность ответа
+        extra: Функция получения дополнительных данных, влияющих на ответ
+
+    Returns:
+        Значение ETag без кавычек
+    """
+    parts: list[Any] = [request.endpoint, sorted(request.view_args.items()) if request.view_args else []]
+    parts.append(sorted(request.args.items(multi=True)))
+
+    for cache in caches:
+        parts.append([cache.namespace, cache.version])
+        if cache.ttl:
+            parts.append(int(time.time() // cache.ttl))
+
+    if extra is not None:
+        parts.append(extra())
+
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _set_validators(response: Response, etag: str) -> None:
+    """
+    Метод установки заголовков валидации кэша в ответ.
+
+    Args:
+        response: Ответ на HTTP-запрос
+        etag: Значение ETag без кавычек
+    """
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
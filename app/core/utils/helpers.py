@@ -1,4 +1,6 @@
 from flask import current_app
+import base64
+import json
 import logging
 import re
 from datetime import datetime
@@ -33,6 +35,64 @@ def parse_text(text: str, patterns: dict[str, Any]) -> dict[str, Any] | None:
         logging.error(f"Ошибка парсинга текста детального описания: {e}")
         return None
 
+def parse_numbers_list(values: list[str] | str | None) -> list[str]:
+    """
+    Метод разбора списка номеров CRQ/INC, вставленного оператором.
+
+    Args:
+        values: Список номеров, либо строка с номерами, разделенными пробелами, запятыми или переносами строк
+
+    Returns:
+        Список уникальных номеров в исходном порядке
+    """
+    if not values:
+        return []
+    if isinstance(values, str):
+        values = re.split(r"[\s,;]+", values)
+
+    return list(dict.fromkeys(str(value).strip() for value in values if value and str(value).strip()))
+
+def encode_cursor(values: list[Any]) -> str:
+    """
+    Метод кодирования курсора keyset-пагинации в строку для передачи клиенту.
+
+    Args:
+        values: Значения ключа сортировки последней записи страницы
+
+    Returns:
+        Курсор в виде строки base64
+    """
+    return base64.urlsafe_b64encode(json.dumps(values, ensure_ascii=False).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str | None, types: tuple[type | tuple[type, ...], ...]) -> list[Any] | None:
+    """
+    Метод декодирования курсора keyset-пагинации.
+
+    Args:
+        cursor: Курсор, полученный клиентом с предыдущей страницей
+        types: Ожидаемые типы значений курсора по позициям
+
+    Returns:
+        Значения ключа сортировки, или None если курсор не передан
+
+    Raises:
+        ValueError: Курсор поврежден
+    """
+    if not cursor:
+        return None
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Некорректный курсор.") from e
+
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Некорректный курсор.")
+    # bool - подкласс int, но значением ключа сортировки не бывает
+    if any(isinstance(value, bool) or not isinstance(value, expected) for value, expected in zip(values, types)):
+        raise ValueError("Некорректный курсор.")
+    return values
+
 def safe_format_datetime(dt: datetime | None, tz: str = "Asia/Almaty", fmt: str = "%Y-%m-%d %H:%M") -> str | None:
     """
     Метод форматирования даты времени для элемента input type="datetime-local" формы.
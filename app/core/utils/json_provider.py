@@ -0,0 +1,136 @@
+import dataclasses
+import decimal
+import logging
+import uuid
+from datetime import date, time
+from typing import Any
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """
+    Функция сериализации типов, которые не поддерживаются JSON по умолчанию.
+
+    Даты сериализуются в формате RFC 822, как в стандартном провайдере Flask: фронтенд разбирает
+    naive даты ITSM именно в этом формате (строка ISO без смещения была бы прочитана в локальной зоне браузера).
+
+    Args:
+        obj: Сериализуемый объект
+
+    Returns:
+        Значение, поддерживаемое JSON
+    """
+    if isinstance(obj, date):
+        return http_date(obj)
+
+    if isinstance(obj, time):
+        return obj.isoformat()
+
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Класс JSON провайдера Flask на базе orjson.
+
+    Строки, числа, словари, UUID и датаклассы сериализуются orjson нативно, даты передаются в функцию
+    _default для сохранения формата стандартного провайдера. При отсутствии orjson, либо если вызов требует
+    параметров stdlib json (indent, cls и т.д.), используется стандартный провайдер с той же функцией сериализации.
+    """
+
+    default = staticmethod(_default)
+
+    @property
+    def available(self) -> bool:
+        """Признак использования orjson."""
+        return orjson is not None
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Метод сериализации объекта в строку JSON.
+
+        Args:
+            obj: Сериализуемый объект
+            kwargs: Параметры stdlib json.dumps (при их наличии используется stdlib)
+
+        Returns:
+            Строка JSON
+        """
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+
+        return self._dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        """
+        Метод десериализации строки JSON.
+
+        Args:
+            s: Строка или UTF-8 байты JSON
+            kwargs: Параметры stdlib json.loads (при их наличии используется stdlib)
+
+        Returns:
+            Десериализованный объект
+        """
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """
+        Метод формирования JSON ответа (используется jsonify).
+
+        Сериализованные orjson байты передаются в ответ напрямую, без промежуточного декодирования в строку.
+        """
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+
+        return self._app.response_class(self._dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
+
+    def _dumps_bytes(self, obj: Any, indent: bool = False) -> bytes:
+        """
+        Внутренний метод сериализации объекта в байты через orjson.
+
+        Args:
+            obj: Сериализуемый объект
+            indent: Форматировать вывод с отступами
+
+        Returns:
+            UTF-8 байты JSON
+        """
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+
+        try:
+            return orjson.dumps(obj, default=self.default, option=option)
+        except orjson.JSONEncodeError as e:
+            # orjson не поддерживает, например, целые числа больше 64 бит - отдаем такие объекты stdlib
+            logging.warning(f"orjson не смог сериализовать объект, используется stdlib json: {e}")
+            return super().dumps(obj, separators=(",", ":")).encode("utf-8")
@@ -7,9 +7,16 @@ from app.core.monitoring.metrics import PrometheusMetrics
 from app.core.monitoring.middleware import MetricsMiddleware
 from app.core.services.notification import NotificationTaskManager
 from app.core.services.crq_lock import CRQLockManager
+from app.core.services.cache import VersionedCache, RecordCache
+from app.core.services.itsm_mirror import ITSMMirrorManager
+from app.core.services.inc_watcher import IncidentWatcher
+from app.core.services.itsm_pool import ITSMSessionPool
+from app.core.services.autocomplete import NumbersAutocomplete
+from app.core.services.upload_janitor import UploadJanitor
 
 
 db = SQLAlchemy()
+itsm_pool = ITSMSessionPool()
 mail = Mail()
 login_manager = LoginManager()
 notification_manager = NotificationTaskManager()
@@ -20,6 +27,15 @@ metrics_middleware = MetricsMiddleware()
 
 lock_manager = CRQLockManager()
 
+partners_cache = VersionedCache("partners")
+subscriptions_cache = VersionedCache("subscriptions", ttl=3600)
+calendar_cache = VersionedCache("calendar")
+itsm_cache = RecordCache("itsm")
+itsm_mirror = ITSMMirrorManager()
+inc_watcher = IncidentWatcher()
+numbers_autocomplete = NumbersAutocomplete()
+upload_janitor = UploadJanitor()
+
 login_manager.login_view = "auth.login"
 login_manager.login_message = "Пожалуйста, войдите, чтобы получить доступ к этой странице."
 login_manager.login_message_category = "info"
\ No newline at end of file
@@ -291,9 +291,10 @@ export class CrqEditModal extends BaseModal {
         listItem.className = 'file-item';
         listItem.id = `existing_${fileInfo.id}`;
         
-        const fileNameSpan = document.createElement('span');
+        const fileNameSpan = document.createElement('a');
         fileNameSpan.textContent = fileInfo.original_filename;
         fileNameSpan.className = 'file-name';
+        fileNameSpan.href = this.api.getFileDownloadUrl(fileInfo.id);
         
         const removeButton = document.createElement('button');
         removeButton.type = 'button';
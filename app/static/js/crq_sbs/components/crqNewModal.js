@@ -70,6 +70,12 @@ export class CrqNewModal extends BaseModal {
             findButton.addEventListener('click', () => this.handleCrqSearch());
         }
 
+        // Bind one-click import from ITSM
+        const importButton = this.modal.querySelector('#importCrqFromItsm');
+        if (importButton) {
+            importButton.addEventListener('click', () => this.handleItsmImport());
+        }
+
         // Bind save functionality
         const saveButton = this.modal.querySelector('#addCrq');
         if (saveButton) {
@@ -121,6 +127,51 @@ export class CrqNewModal extends BaseModal {
         }
     }
 
+    async handleItsmImport() {
+        const crqNumberInput = this.modal.querySelector('#newCrqNumber');
+        const crqNumbers = crqNumberInput.value.trim();
+
+        if (!crqNumbers) {
+            this.showFieldError(crqNumberInput, 'Пожалуйста, введите номер плановых работ');
+            NotificationManager.showWarning('Пожалуйста, введите номер плановых работ');
+            return;
+        }
+
+        try {
+            // Поля, которых нет в ITSM, берутся из формы
+            const { crq_status, sub_names, crq_work_type, crq_comment } = this.getFormData('new');
+            const response = await this.api.importCrqsFromItsm(crqNumbers, {
+                crq_status, sub_names, crq_work_type, crq_comment
+            });
+            const { created, existing, not_found, rejected } = response.data;
+
+            created.forEach(crq => this.state.addCrq(crq));
+
+            if (existing.length > 0) {
+                NotificationManager.showWarning(`Уже существуют: ${existing.join(', ')}`);
+            }
+            if (not_found.length > 0) {
+                NotificationManager.showError(`Не найдены в ITSM: ${not_found.join(', ')}`);
+            }
+            rejected.forEach(({ crq_number, errors }) => {
+                NotificationManager.showError(`${crq_number}: ${errors.join(' ')}`);
+            });
+            if (created.length === 0) {
+                return;
+            }
+
+            this.close();
+
+            if (window.calendarComponent?.loadCalendarData) {
+                await window.calendarComponent.loadCalendarData();
+            }
+
+            NotificationManager.showSuccess(`Создано CRQ из ITSM: ${created.length}`);
+        } catch (error) {
+            NotificationManager.showError(`Ошибка создания CRQ из ITSM: ${error.message}`);
+        }
+    }
+
     populateFormFromCrqData(crqData) {
         const fieldMappings = {
             'newCrqNumber': crqData.crq_number,
@@ -278,8 +278,8 @@ export class BaseModal {
         fileInput.click();
     }
     
+    // Размер файла проверяет сервер при создании загрузки (UPLOAD_MAX_FILE_SIZE)
     validateFiles(files) {
-        const maxFileSize = 10 * 1024 * 1024; // 10MB
         const allowedTypes = [
             'application/pdf', 'application/msword', 
             'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
@@ -289,13 +289,6 @@ export class BaseModal {
         ];
 
         for (const file of files) {
-            if (file.size > maxFileSize) {
-                return {
-                    isValid: false,
-                    message: `Файл "${file.name}" превышает максимальный размер 10MB`
-                };
-            }
-            
             if (!allowedTypes.includes(file.type)) {
                 return {
                     isValid: false,
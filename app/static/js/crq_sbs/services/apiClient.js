@@ -57,6 +57,13 @@ export class ApiClient {
         });
     }
 
+    async importCrqsFromItsm(crqNumbers, crqData = {}) {
+        return this.request('/import/itsm', {
+            method: 'POST',
+            body: JSON.stringify({ ...crqData, crq_numbers: crqNumbers })
+        });
+    }
+
     async updateCrq(crqNumber, crqData) {
         return this.request(`/update/${crqNumber}`, {
             method: 'POST',
@@ -109,33 +116,65 @@ export class ApiClient {
 
     // Эндпоинты файловой системы
     async uploadFiles(uploadFilesData) {
-        const formData = new FormData();
-        
-        formData.append('crqNumber', uploadFilesData.crqNumber);
-        
-        uploadFilesData.files.forEach(file => {
-            formData.append('files', file);
-        });
-        
-        return this.request('/files/upload', {
-            method: 'POST',
-            headers: {},
-            body: formData
-        });
+        const data = [];
+
+        for (const file of uploadFilesData.files) {
+            data.push(await this.uploadFileChunked(file, uploadFilesData.crqNumber));
+        }
+
+        return { status: 'success', data };
     }
 
     async uploadTemporaryFiles(uploadFilesData) {
-        const formData = new FormData();
-        
-        uploadFilesData.files.forEach(file => {
-            formData.append('files', file);
+        return this.uploadFiles({ files: uploadFilesData.files, crqNumber: null });
+    }
+
+    // Загрузка файла по частям с продолжением с последнего принятого смещения после сбоя
+    async uploadFileChunked(file, crqNumber = null, maxRetries = 5) {
+        const upload = await this.request('/uploads', {
+            method: 'POST',
+            body: JSON.stringify({ filename: file.name, size: file.size })
         });
-        
-        return this.request('/files/upload', {
+
+        let offset = upload.offset;
+        let retries = 0;
+
+        while (offset < file.size) {
+            const chunk = file.slice(offset, offset + upload.chunk_size);
+
+            try {
+                const result = await this.request(`/uploads/${upload.upload_id}`, {
+                    method: 'PATCH',
+                    headers: {
+                        'Content-Type': 'application/offset+octet-stream',
+                        'Upload-Offset': String(offset),
+                        'X-Requested-With': 'XMLHttpRequest'
+                    },
+                    body: chunk
+                });
+                offset = result.offset;
+                retries = 0;
+            } catch (error) {
+                if (error.status === 413 || error.status === 404 || ++retries > maxRetries) {
+                    throw error;
+                }
+
+                await new Promise(resolve => setTimeout(resolve, 1000 * retries));
+                const state = await this.request(`/uploads/${upload.upload_id}`);
+                offset = state.offset;
+            }
+        }
+
+        const completed = await this.request(`/uploads/${upload.upload_id}/complete`, {
             method: 'POST',
-            headers: {},
-            body: formData
+            body: JSON.stringify({ crqNumber })
         });
+
+        return completed.data;
+    }
+
+    getFileDownloadUrl(fileId) {
+        return `${this.baseURL}/files/${fileId}/download`;
     }
 
     async deleteFile(fileId) {
@@ -12,7 +12,9 @@ const CONFIG = {
         sendSMSAsync: '/inc/api/sms/send_async',
         sendEmailAsync: '/inc/api/email/send_async',
         taskStatus: '/inc/api/task/status/',
-        allTasks: '/inc/api/tasks'
+        allTasks: '/inc/api/tasks',
+        drafts: '/inc/api/drafts',
+        autocomplete: '/inc/api/autocomplete'
     },
     POLLING: {
         interval: 2000,
@@ -381,6 +383,128 @@ class ApiService {
             method: 'GET'
         });
     }
+
+    static autocompleteIncident(prefix) {
+        return $.ajax({
+            url: CONFIG.API.autocomplete,
+            method: 'GET',
+            data: { q: prefix }
+        });
+    }
+
+    static getDrafts() {
+        return $.ajax({
+            url: CONFIG.API.drafts,
+            method: 'GET'
+        });
+    }
+
+    static dismissDraft(incNumber) {
+        return $.ajax({
+            url: `${CONFIG.API.drafts}/${encodeURIComponent(incNumber)}`,
+            method: 'DELETE'
+        });
+    }
+}
+
+/**
+ * Incident Drafts Panel
+ * Черновики нотификаций, подготовленные сервером по новым и изменившимся инцидентам
+ */
+class DraftsPanel {
+    constructor(onApply) {
+        this.onApply = onApply;
+        this.drafts = new Map();
+        this.socket = null;
+    }
+
+    init() {
+        ApiService.getDrafts()
+            .done(response => {
+                if (response.status !== 'success' || !response.enabled) {
+                    return;
+                }
+
+                response.drafts.slice().reverse().forEach(draft => this.drafts.set(draft.inc_number, draft));
+                this.render();
+                this.connect();
+            });
+
+        $('#draftsList').on('click', '.draft-apply', (e) => {
+            const draft = this.drafts.get($(e.currentTarget).data('inc'));
+            if (draft) {
+                this.onApply(draft);
+            }
+        });
+
+        $('#draftsList').on('click', '.draft-dismiss', (e) => {
+            const incNumber = $(e.currentTarget).data('inc');
+            ApiService.dismissDraft(incNumber).always(() => this.remove(incNumber));
+        });
+    }
+
+    connect() {
+        if (typeof io === 'undefined') {
+            return;
+        }
+
+        this.socket = io({ transports: ['polling', 'websocket'], reconnection: true });
+        this.socket.on('connect', () => this.socket.emit('subscribe_inc_drafts'));
+        this.socket.on('inc_draft', draft => {
+            this.drafts.delete(draft.inc_number);
+            this.drafts.set(draft.inc_number, draft);
+            this.render();
+        });
+        this.socket.on('inc_draft_dismissed', data => this.remove(data.inc_number));
+
+        window.addEventListener('beforeunload', () => this.socket.disconnect());
+    }
+
+    remove(incNumber) {
+        this.drafts.delete(incNumber);
+        this.render();
+    }
+
+    render() {
+        const list = $('#draftsList');
+        list.empty();
+
+        if (this.drafts.size === 0) {
+            $('#draftsPanel').hide();
+            return;
+        }
+
+        Array.from(this.drafts.values()).reverse().forEach(draft => {
+            const item = $(`
+                <div class="list-group-item d-flex justify-content-between align-items-center">
+                    <div>
+                        <strong class="draft-title"></strong>
+                        <span class="badge badge-warning ml-2 draft-state"></span>
+                        <div><small class="text-muted draft-message"></small></div>
+                        <div><small class="draft-audience"></small></div>
+                    </div>
+                    <div class="text-nowrap">
+                        <button type="button" class="btn btn-sm btn-custom draft-apply">Заполнить</button>
+                        <button type="button" class="btn btn-sm btn-secondary draft-dismiss">Скрыть</button>
+                    </div>
+                </div>
+            `);
+
+            item.find('.draft-title').text(`${draft.inc_number} (приоритет ${draft.inc_priority}, ${draft.inc_status})`);
+            item.find('.draft-state').text(draft.inc_state);
+            item.find('.draft-message').text(draft.message);
+            item.find('.draft-audience').text(
+                `Получателей: ${draft.audience.total}` +
+                (draft.audience.subscriptions.length ?
+                    ` (${draft.audience.subscriptions.map(sub => `${sub.name}: ${sub.recipients}`).join(', ')})` : '')
+            );
+            item.find('button').attr('data-inc', draft.inc_number);
+
+            list.append(item);
+        });
+
+        $('#draftsPanel').show();
+    }
 }
 
 /**
@@ -750,6 +874,7 @@ class IncidentManagementApp {
         this.progressDisplay = new ProgressDisplayManager();
         this.fieldManager = new FieldManager();
         this.taskDashboard = new TaskDashboard();
+        this.draftsPanel = new DraftsPanel(draft => this.applyDraft(draft));
         
         this.init();
     }
@@ -758,11 +883,21 @@ class IncidentManagementApp {
         this.setupEventListeners();
         this.loadInitialData();
         this.setupPageVisibilityHandlers();
+        this.draftsPanel.init();
     }
 
     setupEventListeners() {
         // Form submission
         $('#incidentSearchForm').on('submit', (e) => this.handleIncidentSearch(e));
+
+        // Incident number autocomplete
+        $('#incidentNumber').on('input', (e) => this.handleIncidentAutocomplete($(e.target).val().trim()));
+        $('#incidentNumber').on('blur', () => $('#incidentNumberOptions').removeClass('show'));
+        $('#incidentNumberOptions').on('mousedown', '.dropdown-item', (e) => {
+            e.preventDefault();
+            $('#incidentNumber').val($(e.currentTarget).text());
+            $('#incidentNumberOptions').removeClass('show');
+        });
         
         // Field status changes
         $('#incidentStatusFilter').on('change', (e) => {
@@ -866,6 +1001,26 @@ class IncidentManagementApp {
             });
     }
 
+    handleIncidentAutocomplete(prefix) {
+        if (this.autocompleteRequest) {
+            this.autocompleteRequest.abort();
+        }
+
+        const options = $('#incidentNumberOptions');
+        if (prefix.length < 2) {
+            options.empty().removeClass('show');
+            return;
+        }
+
+        this.autocompleteRequest = ApiService.autocompleteIncident(prefix)
+            .done(response => {
+                const items = response.items || [];
+                options.empty();
+                items.forEach(number => options.append($('<button type="button" class="dropdown-item">').text(number)));
+                options.toggleClass('show', items.length > 0);
+            });
+    }
+
     populateIncidentDetails(data) {
         const details = data.inc_details;
 
@@ -883,6 +1038,25 @@ class IncidentManagementApp {
         $('#textFields').show();
     }
 
+    applyDraft(draft) {
+        $('#incidentNumber').val(draft.inc_number);
+        $('#incidentStatusFilter').val(draft.inc_state).trigger('change');
+
+        this.populateIncidentDetails(draft.inc_data);
+        this.state.setCurrentIncident(draft.inc_data);
+
+        $('#generatedMessage').val(draft.message);
+        $('#emailSubject').val(draft.email_subject);
+
+        const audienceNames = draft.audience.subscriptions.map(sub => sub.name);
+        $('.email-checkbox').each(function() {
+            $(this).prop('checked', audienceNames.includes($(this).val()));
+        });
+        this.updateDropdownText();
+
+        UIUtils.showAlert(`Форма заполнена по черновику инцидента ${draft.inc_number}. Проверьте данные перед отправкой`, 'info');
+    }
+
     clearIncidentDetails() {
         $('.editable-field, .inctext').val('');
         $('#incidentDetailsContainer').hide();
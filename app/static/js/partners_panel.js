@@ -135,7 +135,7 @@ class PartnersManagementPanel {
 
     async loadGroups() {
         try {
-            const data = await this.apiCall('/admin/api/groups');
+            const data = await this.apiCall('/admin/api/groups/summary');
             this.groups = data.groups || [];
             this.updateGroupsDropdowns();
             this.updateGroupsTable();
@@ -151,6 +151,16 @@ class PartnersManagementPanel {
         }
     }
 
+    async refreshGroupsSummary() {
+        try {
+            const data = await this.apiCall('/admin/api/groups/summary');
+            this.groups = data.groups || [];
+            this.updateGroupsTable();
+        } catch (error) {
+            console.error('Error refreshing groups summary:', error);
+        }
+    }
+
     updateGroupsDropdowns() {
         const dropdowns = [
             document.getElementById('groupname'),
@@ -214,6 +224,7 @@ class PartnersManagementPanel {
                     title="Нажмите для выбора группы">
                     <td>
                         <strong>${this.escapeHtml(group.groupname)}</strong>
+                        <span class="badge badge-secondary ml-2" title="Участников в группе">${group.members_count ?? 0}</span>
                     </td>
                     <td onclick="event.stopPropagation();">
                         <button type="button"
@@ -291,7 +302,10 @@ class PartnersManagementPanel {
         }
 
         if (this.lastModified) {
-            this.lastModified.textContent = new Date().toLocaleString('ru-RU');
+            const group = this.groups.find(g => g.groupname === this.selectedGroup);
+            this.lastModified.textContent = group && group.last_modified
+                ? new Date(group.last_modified).toLocaleString('ru-RU')
+                : '—';
         }
 
         if (this.groupPartners.length > 0) {
@@ -349,6 +363,7 @@ class PartnersManagementPanel {
             this.showNotification('Изменения успешно сохранены!', 'success');
             this.removedPartners = [];
 
+            await this.refreshGroupsSummary();
             await this.selectGroup(this.selectedGroup);
         } catch (error) {
             console.error('Error saving changes:', error);
@@ -392,6 +407,7 @@ class PartnersManagementPanel {
             this.addUserModal.modal('hide');
 
             if (groupname === this.selectedGroup) {
+                await this.refreshGroupsSummary();
                 await this.selectGroup(this.selectedGroup);
             }
         } catch (error) {
@@ -497,6 +513,7 @@ class PartnersManagementPanel {
             this.uploadFileModal.modal('hide');
 
             if (groupname === this.selectedGroup) {
+                await this.refreshGroupsSummary();
                 await this.selectGroup(this.selectedGroup);
             }
         } catch (error) {
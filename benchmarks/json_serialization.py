@@ -0,0 +1,156 @@
+"""
+Микробенчмарк сериализации крупнейших JSON ответов приложения.
+
+Сравнивает стандартный провайдер Flask (stdlib json) и FastJSONProvider на синтетических данных
+той же структуры, что и ответы CrqService.get_calendar_data, CRQProcessed.to_dict и NotificationTask.to_dict.
+Приложение не создается (create_app не вызывается): используется пустое Flask-приложение, поэтому БД
+и фоновые потоки (прогрев пула ITSM, автодополнение, очистка вложений) не запускаются. Импорт моделей
+загружает пакет app, поэтому при импорте, как и для run.py, должен быть доступен Redis.
+
+Запуск из корня репозитория:
+    python -m benchmarks.json_serialization --items 2000 --repeat 20
+"""
+import argparse
+import timeit
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.core.models.crq_attachments import CRQAttachments
+from app.core.models.crq_processed import CRQProcessed
+from app.core.services.notification import NotificationTask, TaskStatus
+from app.core.utils.json_provider import FastJSONProvider
+
+DESCRIPTION = "Плановые работы на оборудовании ядра сети. " * 20
+
+
+def build_calendar_payload(items: int) -> dict[str, Any]:
+    """Ответ get_calendar_data: CRQ, сгруппированные по датам начала."""
+    started_at = datetime(2025, 1, 1, 9, 0)
+    grouped: dict[str, list[dict[str, Any]]] = {}
+
+    for i in range(items):
+        start_date = started_at + timedelta(hours=i * 3)
+        grouped.setdefault(start_date.strftime('%Y-%m-%d'), []).append({
+            'crq_number': f"CRQ{i:012d}",
+            'status': "Запланирован",
+            'work_type': "Плановая",
+            'service': "ТД",
+            'impact': "С влиянием",
+            'short_description': f"Работы №{i}",
+            'detailed_description': DESCRIPTION,
+            'cause': "Модернизация",
+            'impact_details': "Кратковременные перерывы связи",
+            'comments': "",
+            'start_date': start_date.strftime('%Y-%m-%d %H:%M'),
+            'end_date': (start_date + timedelta(hours=2)).strftime('%Y-%m-%d %H:%M'),
+            'sub_name': "maintenance",
+            'initiator': "ivanov_i",
+            'attachment': [{'id': i, 'name': f"plan_{i}.pdf"}]
+        })
+
+    return {
+        'status': "success",
+        'mode': "full",
+        'version': 1,
+        'dates': sorted(grouped),
+        'grouped_crq_list': grouped
+    }
+
+
+def build_crq_payload(items: int) -> list[dict[str, Any]]:
+    """Список CRQProcessed.to_dict(include_attachments=True)."""
+    started_at = datetime(2025, 1, 1, 9, 0)
+    result = []
+
+    for i in range(items):
+        crq = CRQProcessed(
+            id=i,
+            crq_number=f"CRQ{i:012d}",
+            direction="ТД",
+            impact_status="С влиянием",
+            impact_details="Кратковременные перерывы связи",
+            start_date=started_at + timedelta(hours=i),
+            end_date=started_at + timedelta(hours=i + 2),
+            short_description=f"Работы №{i}",
+            detailed_description=DESCRIPTION,
+            initiator="ivanov_i",
+            status="Запланирован",
+            sub_type="maintenance",
+            cause="Модернизация",
+            sent_date=started_at,
+            comments="",
+            crq_type="Плановая",
+            attachments=[CRQAttachments(id=i, original_filename=f"plan_{i}.pdf",
+                                        encoded_filename=f"{i}.pdf", upload_date=started_at)]
+        )
+        result.append(crq.to_dict(include_attachments=True))
+
+    return result
+
+
+def build_tasks_payload(items: int) -> list[dict[str, Any]]:
+    """Список NotificationTask.to_dict()."""
+    created_at = datetime(2025, 1, 1, 9, 0)
+
+    return [
+        NotificationTask(
+            task_id=f"task-{i}",
+            inc_number=f"INC{i:012d}",
+            notification_type="both",
+            total_recipients=500,
+            successful_sends=495,
+            failed_sends=5,
+            status=TaskStatus.COMPLETED,
+            created_at=created_at,
+            started_at=created_at,
+            completed_at=created_at + timedelta(minutes=3)
+        ).to_dict()
+        for i in range(items)
+    ]
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """Лучшее время одного вызова в миллисекундах."""
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000, help="Количество элементов в каждом ответе")
+    parser.add_argument("--repeat", type=int, default=20, help="Количество повторов замера")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    providers = {
+        "stdlib": DefaultJSONProvider(app),
+        "fast": app.json
+    }
+
+    with app.app_context():
+        payloads = {
+            "get_calendar_data": build_calendar_payload(args.items),
+            "CRQProcessed.to_dict": build_crq_payload(args.items),
+            "NotificationTask.to_dict": build_tasks_payload(args.items)
+        }
+
+        if not providers["fast"].available:
+            print("orjson не установлен: FastJSONProvider использует stdlib json")
+
+        print(f"{'payload':<26}{'size, KB':>10}{'stdlib, ms':>13}{'fast, ms':>11}{'speedup':>10}")
+        for name, payload in payloads.items():
+            timings = {
+                key: measure(lambda p=provider: p.response(payload), args.repeat)
+                for key, provider in providers.items()
+            }
+            size = len(providers["fast"].response(payload).get_data()) / 1024
+
+            print(f"{name:<26}{size:>10.1f}{timings['stdlib']:>13.2f}{timings['fast']:>11.2f}"
+                  f"{timings['stdlib'] / timings['fast']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()